@@ -5,6 +5,8 @@ from auto_graders.models import (
     UserProfile,
     TaskTests,
     TaskParameters,
+    GradingJob,
+    GradingRun,
 )
 
 admin.site.register(Submission)
@@ -47,6 +49,13 @@ class TaskAdmin(admin.ModelAdmin):
                     'id',
                     'title',
                     'description',
+                    'test_workers',
+                    'test_isolation',
+                    'grade_by_parameters',
+                    'static_rules',
+                    'run_timeout',
+                    'cpu_time_budget',
+                    'memory_budget',
                 )
             },
         ),
@@ -61,3 +70,90 @@ class TaskTestsAdmin(admin.ModelAdmin):
     ordering = ('-id',)
     search_fields = ('task__title',)
     fieldsets = ((None, {'fields': ('id', 'task', 'file_path')}),)
+
+
+@admin.register(GradingJob)
+class GradingJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'task',
+        'user',
+        'status',
+        'response_status',
+        'worker_id',
+        'attempts',
+        'created_at',
+        'finished_at',
+    )
+    list_filter = ('status', 'worker_id')
+    ordering = ('-id',)
+    search_fields = ('task__title', 'user__email')
+    readonly_fields = (
+        'created_at',
+        'started_at',
+        'heartbeat_at',
+        'finished_at',
+    )
+
+
+class SlowGradingRunFilter(admin.SimpleListFilter):
+    title = 'total duration'
+    parameter_name = 'slower_than'
+    THRESHOLDS = (1, 5, 10, 20)
+
+    def lookups(self, request, model_admin):
+        return [
+            (str(seconds), f'Over {seconds} s') for seconds in self.THRESHOLDS
+        ]
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+        return queryset.filter(total_duration__gt=float(self.value()))
+
+
+@admin.register(GradingRun)
+class GradingRunAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'task',
+        'total_duration',
+        'duration',
+        'run_timeout',
+        'success',
+        'outcome',
+        'timed_out',
+        'container_id',
+        'exit_code',
+        'created_at',
+    )
+    list_filter = (
+        SlowGradingRunFilter,
+        'created_at',
+        'success',
+        'outcome',
+        'timed_out',
+        'task',
+    )
+    date_hierarchy = 'created_at'
+    ordering = ('-id',)
+    search_fields = ('task__title', 'container_id')
+    readonly_fields = (
+        'task',
+        'duration',
+        'run_timeout',
+        'success',
+        'outcome',
+        'timed_out',
+        'total_duration',
+        'stages',
+        'container_id',
+        'exit_code',
+        'output_size',
+        'cpu_time',
+        'peak_memory',
+        'created_at',
+    )
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,8 @@
+numbers = []
+while True:
+    line = input()
+    if line == 'Exit':
+        break
+    for item in line.split():
+        numbers.append(int(item))
+print(f"Dynamic list: {numbers}")
@@ -0,0 +1,7 @@
+from string import ascii_lowercase
+
+text = input()
+if set(ascii_lowercase) <= set(text.lower()):
+    print("The string is a pangram.")
+else:
+    print("The string is not a pangram.")
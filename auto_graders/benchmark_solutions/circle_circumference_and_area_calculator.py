@@ -0,0 +1,5 @@
+from math import pi
+
+radius = float(input())
+print(f"Circumference: {2 * pi * radius:.2f}")
+print(f"Area: {pi * radius ** 2:.2f}")
@@ -0,0 +1,3 @@
+def filter_students(threshold, students):
+    names = [name for name, _, grade in students if grade >= threshold]
+    print(f"Students with an average grade above {threshold}: {names}")
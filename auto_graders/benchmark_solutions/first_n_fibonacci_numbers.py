@@ -0,0 +1,8 @@
+n = int(input())
+numbers = []
+a, b = 0, 1
+while len(numbers) < n:
+    numbers.append(a)
+    a, b = b, a + b
+if numbers:
+    print(f"The first {n} Fibonacci numbers: {', '.join(map(str, numbers))}")
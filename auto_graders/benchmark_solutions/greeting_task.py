@@ -0,0 +1,3 @@
+name = input()
+age = input()
+print(f"Hi, {name}! You are {age} years old.")
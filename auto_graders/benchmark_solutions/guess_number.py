@@ -0,0 +1,10 @@
+import random
+
+secret = random.randint(1, 100)
+guess = int(input("Guess the number between 1 and 100: "))
+while guess != secret:
+    if guess < secret:
+        guess = int(input("The actual number is higher. Try again: "))
+    else:
+        guess = int(input("The actual number is lower. Try again: "))
+print(f"Congratulations! You've guessed the number {secret}!")
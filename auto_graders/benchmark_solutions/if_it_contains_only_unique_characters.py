@@ -0,0 +1,9 @@
+text = input().lower()
+repeated = []
+for char in text:
+    if text.count(char) > 1 and char not in repeated:
+        repeated.append(char)
+if repeated:
+    print(f"The characters {', '.join(repeated)} are repeated.")
+else:
+    print("All characters in the string are unique.")
@@ -0,0 +1,10 @@
+number = int(input())
+original = number
+reversed_number = 0
+while number > 0:
+    reversed_number = reversed_number * 10 + number % 10
+    number //= 10
+if original >= 0 and original == reversed_number:
+    print("The number is a palindrome.")
+else:
+    print("The number is not a palindrome.")
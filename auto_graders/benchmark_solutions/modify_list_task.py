@@ -0,0 +1,3 @@
+numbers = [int(item) for item in input().split()]
+modified = [n // 2 if n % 2 == 0 else n * 2 for n in numbers]
+print(f"Modified list of numbers: {modified}")
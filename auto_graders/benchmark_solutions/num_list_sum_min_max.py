@@ -0,0 +1,9 @@
+def sum_min_max(numbers):
+    return sum(numbers), min(numbers), max(numbers)
+
+
+values = [int(item) for item in input().split(',')]
+total, minimum, maximum = sum_min_max(values)
+print(f"Sum of the numbers: {total}")
+print(f"Minimum value: {minimum}")
+print(f"Maximum value: {maximum}")
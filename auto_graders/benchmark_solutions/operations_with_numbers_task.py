@@ -0,0 +1,8 @@
+a = int(input())
+b = int(input())
+print(f"Sum: {a + b}")
+print(f"Difference: {a - b}")
+print(f"Product: {a * b}")
+print(f"Quotient: {a / b if b else 'undefined'}")
+print(f"Remainder: {a % b if b else 'undefined'}")
+print(f"First number raised to the power of the second number: {a ** b}")
@@ -0,0 +1,7 @@
+first = []
+for item in input().split():
+    first.append(int(item) if item.isdigit() else item)
+second = []
+for item in input().split():
+    second.append(int(item) if item.isdigit() else item)
+print(f"List of element pairs: {list(zip(first, second))}")
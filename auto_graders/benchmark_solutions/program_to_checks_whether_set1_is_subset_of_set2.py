@@ -0,0 +1,5 @@
+def is_subset(set1, set2):
+    for item in set1:
+        if item not in set2:
+            return False
+    return True
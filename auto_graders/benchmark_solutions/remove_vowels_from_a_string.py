@@ -0,0 +1,3 @@
+text = input()
+result = ''.join(char for char in text if char.lower() not in 'aeiou')
+print(f"Result: {result}")
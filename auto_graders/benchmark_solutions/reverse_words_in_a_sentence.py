@@ -0,0 +1,2 @@
+words = input().split()
+print(f"Reversed sentence: {' '.join(reversed(words))}")
@@ -0,0 +1,12 @@
+a = float(input())
+b = float(input())
+c = float(input())
+if a > b:
+    a, b = b, a
+if b > c:
+    b, c = c, b
+if a > b:
+    a, b = b, a
+else:
+    pass
+print(f"{a}, {b}, {c}")
@@ -0,0 +1,3 @@
+a = float(input())
+b = float(input())
+print(f"Sum and product of the numbers: ({a + b}, {a * b})")
@@ -0,0 +1,7 @@
+text = input().lower()
+vowels = sum(1 for char in text if char in 'aeiouy')
+consonants = sum(
+    1 for char in text if 'a' <= char <= 'z' and char not in 'aeiouy'
+)
+print(f"Number of vowels: {vowels}")
+print(f"Number of consonants: {consonants}")
@@ -0,0 +1,2 @@
+lengths = tuple(len(word) for word in input().split())
+print(f"Lengths of words in the sentence: {lengths}")
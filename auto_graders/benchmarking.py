@@ -0,0 +1,231 @@
+"""
+Latency statistics and stored results shared by the benchmark and load
+test commands. Results are JSON files, so the numbers of two builds can be
+compared with `compare_results`.
+"""
+
+import json
+import statistics
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+
+from auto_graders.run_timeouts import percentile
+
+# Reference solutions that pass the grading suites, by suite name:
+# `greeting_task.py` passes `tests/greeting_task_test.py`.
+BENCHMARK_SOLUTIONS_DIR = Path(__file__).resolve().parent / (
+    'benchmark_solutions'
+)
+TESTS_DIR = Path(__file__).resolve().parent / 'tests'
+# 'fake' answers test runs with passed tests after SANDBOX_FAKE_RUN_LATENCY,
+# 'local' runs the suites on this host, 'docker' uses the configured
+# sandbox as it is.
+SANDBOXES = ('fake', 'local', 'docker')
+
+
+def add_sandbox_arguments(parser, default: str = 'fake'):
+    parser.add_argument(
+        '--sandbox',
+        choices=SANDBOXES,
+        default=default,
+        help=(
+            'fake: a stand-in that sleeps instead of running the tests; '
+            'local: run the suites on this host; docker: the configured '
+            'sandbox.'
+        ),
+    )
+    parser.add_argument(
+        '--exec-latency',
+        type=float,
+        default=settings.SANDBOX_FAKE_EXEC_LATENCY,
+        help='Seconds every fake `docker exec` takes.',
+    )
+    parser.add_argument(
+        '--upload-latency',
+        type=float,
+        default=settings.SANDBOX_FAKE_UPLOAD_LATENCY,
+        help='Seconds every fake workspace upload takes.',
+    )
+    parser.add_argument(
+        '--run-latency',
+        type=float,
+        default=settings.SANDBOX_FAKE_RUN_LATENCY,
+        help='Seconds a test run takes in the fake sandbox.',
+    )
+    parser.add_argument(
+        '--pool-size',
+        type=int,
+        default=settings.SANDBOX_POOL_SIZE,
+        help='Number of fake sandbox containers.',
+    )
+    parser.add_argument(
+        '--container-concurrency',
+        type=int,
+        default=settings.SANDBOX_CONTAINER_CONCURRENCY,
+        help='Grading runs a fake container takes at once.',
+    )
+
+
+def get_sandbox_configuration(options: dict) -> dict:
+    """The sandbox options of a benchmark, as stored with its results."""
+    configuration = {'sandbox': options['sandbox']}
+    if options['sandbox'] != 'docker':
+        configuration.update(
+            {
+                name: options[name]
+                for name in (
+                    'exec_latency',
+                    'upload_latency',
+                    'run_latency',
+                    'pool_size',
+                    'container_concurrency',
+                )
+            }
+        )
+    return configuration
+
+
+def get_sandbox_settings(options: dict) -> dict:
+    """Settings that put the fake sandbox in place of Docker."""
+    if options['sandbox'] == 'docker':
+        return {}
+    return {
+        'SANDBOX_BACKEND': 'fake',
+        'SANDBOX_FAKE_RUN_TESTS': options['sandbox'] == 'local',
+        'SANDBOX_FAKE_EXEC_LATENCY': options['exec_latency'],
+        'SANDBOX_FAKE_UPLOAD_LATENCY': options['upload_latency'],
+        'SANDBOX_FAKE_RUN_LATENCY': options['run_latency'],
+        'SANDBOX_GRADING_SERVER': False,
+        'SANDBOX_CONTAINERS': [],
+        'SANDBOX_POOL_SIZE': options['pool_size'],
+        'SANDBOX_CONTAINER_CONCURRENCY': options['container_concurrency'],
+    }
+
+
+def get_benchmark_suites(names: list[str] | None = None) -> dict[str, Path]:
+    """Test files of the suites with a reference solution, by suite name."""
+    suites: dict[str, Path] = {
+        solution_path.stem: TESTS_DIR / f'{solution_path.stem}_test.py'
+        for solution_path in sorted(BENCHMARK_SOLUTIONS_DIR.glob('*.py'))
+    }
+    if not names:
+        return suites
+    unknown = sorted(set(names) - set(suites))
+    if unknown:
+        raise ValueError(f'No reference solution for {", ".join(unknown)}.')
+    return {name: suites[name] for name in names}
+
+
+def read_reference_solution(suite: str) -> str:
+    return (BENCHMARK_SOLUTIONS_DIR / f'{suite}.py').read_text()
+
+
+def summarize_latencies(seconds: list[float]) -> dict:
+    """Percentiles, mean and maximum of `seconds`, in milliseconds."""
+    if not seconds:
+        return {'count': 0}
+    return {
+        'count': len(seconds),
+        'p50': round(percentile(seconds, 50) * 1000, 3),
+        'p90': round(percentile(seconds, 90) * 1000, 3),
+        'p99': round(percentile(seconds, 99) * 1000, 3),
+        'mean': round(statistics.mean(seconds) * 1000, 3),
+        'max': round(max(seconds) * 1000, 3),
+    }
+
+
+class LatencyRecorder:
+    """
+    Collects latencies by name, e.g. grading stage, and outcomes from the
+    threads of a benchmark.
+    """
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.outcomes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self.latencies.setdefault(name, []).append(seconds)
+
+    def add_outcome(self, outcome: str):
+        with self._lock:
+            self.outcomes[outcome] += 1
+
+    def summary(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                name: summarize_latencies(seconds)
+                for name, seconds in sorted(self.latencies.items())
+            }
+
+
+def save_results(path: str, benchmark: str, configuration: dict, levels):
+    """
+    Store the results of a benchmark, one entry per concurrency level, for
+    a later `--compare`.
+    """
+    Path(path).write_text(
+        json.dumps(
+            {
+                'benchmark': benchmark,
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'configuration': configuration,
+                'levels': levels,
+            },
+            indent=2,
+        )
+    )
+
+
+def load_results(path: str, benchmark: str) -> dict:
+    try:
+        results = json.loads(Path(path).read_text())
+    except (OSError, ValueError) as err:
+        raise ValueError(f'Cannot read the results in {path}: {err}')
+    if results.get('benchmark') != benchmark:
+        raise ValueError(f'{path} holds no {benchmark} results.')
+    return results
+
+
+def relative_change(current: float, baseline: float) -> str:
+    if not baseline:
+        return 'n/a'
+    return f'{(current - baseline) / baseline * 100:+.1f}%'
+
+
+def compare_results(levels: list[dict], baseline: dict) -> list[str]:
+    """
+    Lines comparing the throughput and the p50 and p99 latencies of every
+    concurrency level with the same level of the `baseline` results.
+    Positive latency changes are slowdowns.
+    """
+    baseline_levels = {
+        level['concurrency']: level for level in baseline['levels']
+    }
+    lines: list[str] = [f'compared with the run of {baseline["created_at"]}']
+    for level in levels:
+        previous = baseline_levels.get(level['concurrency'])
+        if previous is None:
+            continue
+        lines.append(
+            f'concurrency {level["concurrency"]}: throughput '
+            f'{level["throughput"]:.2f}/s '
+            f'({relative_change(level["throughput"], previous["throughput"])})'
+        )
+        for name, latency in level['latencies'].items():
+            previous_latency = previous['latencies'].get(name, {})
+            if not (latency.get('count') and previous_latency.get('count')):
+                continue
+            lines.append(
+                f'  {name:<16} p50 {latency["p50"]:9.2f} ms '
+                f'({relative_change(latency["p50"], previous_latency["p50"])})'
+                f'  p99 {latency["p99"]:9.2f} ms '
+                f'({relative_change(latency["p99"], previous_latency["p99"])})'
+            )
+    return lines
@@ -0,0 +1,11 @@
+from enum import Enum
+
+
+class GradingJobStatusEnum(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+
+    @classmethod
+    def choices(cls):
+        return [(key.value, key.name) for key in cls]
@@ -0,0 +1,17 @@
+from enum import Enum
+
+from auto_graders.runner.records import (
+    ISOLATION_FORK,
+    ISOLATION_PROCESS,
+    ISOLATION_SHARED,
+)
+
+
+class TestIsolationEnum(Enum):
+    SHARED = ISOLATION_SHARED
+    FORK = ISOLATION_FORK
+    PROCESS = ISOLATION_PROCESS
+
+    @classmethod
+    def choices(cls):
+        return [(key.value, key.name) for key in cls]
@@ -0,0 +1,441 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, QuerySet
+from django.utils import timezone
+from rest_framework import status
+
+from auto_graders.choices.grading_job_status_choices import (
+    GradingJobStatusEnum,
+)
+from auto_graders.models import GradingJob, Submission, Task, TaskTests, User
+from auto_graders.result_cache import get_grading_result_cache
+from auto_graders.grading_runs import record_grading_run
+from auto_graders.grading_trace import GradingTrace, start_grading_trace
+from auto_graders.metrics import count_grading_outcome, observe_grading_stage
+from auto_graders.run_timeouts import get_task_run_timeout
+from auto_graders.static_checks import check_solution, rules_from_spec
+from auto_graders.utils import MEBIBYTE, run_tests_in_isolated_env
+
+logger = logging.getLogger(__name__)
+
+SERVICE_UNAVAILABLE_RESPONSE = {
+    'message': "В данный момент мы не можем обработать Ваш запрос :( Мы работаем над этой проблемой.",
+    'errors': "Service unavailable.",
+}
+
+
+def get_test_file_paths(task: Task) -> list[str]:
+    task_tests: list[TaskTests] = TaskTests.objects.filter(
+        task__exact=task
+    ).all()
+    return [test.file_path for test in task_tests]
+
+
+def get_task_parameter_cases(task: Task) -> list[tuple[str, str]]:
+    """
+    The task's (input_params, output_params) rows in one query, or none
+    when the task is not graded by its parameters.
+    """
+    if not task.grade_by_parameters:
+        return []
+    return list(
+        task.task_parameters.order_by('id').values_list(
+            'input_params', 'output_params'
+        )
+    )
+
+
+def check_static_rules(task: Task, solution_code: str) -> dict | None:
+    """
+    The failed test result of a solution that breaks the task's static
+    rules, or None when it keeps them and has to go to the sandbox.
+    """
+    if not task.static_rules:
+        return None
+    failed_rules = check_solution(
+        solution_code, rules_from_spec(task.static_rules)
+    )
+    if not failed_rules:
+        return None
+    return {
+        'success': False,
+        'errors': {
+            'general_info': 'static check failed',
+            'failed_rules': failed_rules,
+        },
+    }
+
+
+def get_task_test_budgets(task: Task) -> dict | None:
+    """The task's budgets in seconds and bytes, or None without any."""
+    if task.cpu_time_budget is None and task.memory_budget is None:
+        return None
+    return {
+        'cpu_time': task.cpu_time_budget,
+        'memory': (
+            task.memory_budget * MEBIBYTE
+            if task.memory_budget is not None
+            else None
+        ),
+    }
+
+
+def grade_solution(
+    task: Task, user: User, solution_code: str
+) -> tuple[dict, int]:
+    """
+    Run the task's tests against the solution, store a Submission when it
+    passes and return the response payload together with its HTTP status.
+    Every grading is recorded with its trace, also one that ended before
+    or without a sandbox run.
+    """
+    with start_grading_trace(observe_grading_stage) as trace:
+        test_result = run_grading_pipeline(task, solution_code, trace)
+        with trace.stage('response'):
+            response = build_grading_response(
+                task, user, solution_code, test_result
+            )
+        record_grading_run(task, test_result, trace)
+        return response
+
+
+def run_grading_pipeline(
+    task: Task, solution_code: str, trace: GradingTrace
+) -> dict:
+    """
+    The test result of the solution. A solution that breaks the task's
+    static rules is rejected without a sandbox run, and one graded before
+    against the same test files, parameter cases and test isolation is
+    answered from the grading result cache. Sandbox runs are stopped after the task's run
+    timeout, their duration and timeout are noted in `trace`.
+    """
+    with trace.stage('static_check'):
+        static_result = check_static_rules(task, solution_code)
+    if static_result is not None:
+        return static_result
+
+    tests_file_path: list[str] = get_test_file_paths(task)
+    parameter_cases = get_task_parameter_cases(task)
+    test_budgets = get_task_test_budgets(task)
+
+    result_cache = get_grading_result_cache()
+    test_result: dict | None = None
+    if result_cache is not None:
+        with trace.stage('cache_lookup'):
+            test_result = result_cache.get(
+                tests_file_path,
+                solution_code,
+                parameter_cases,
+                test_budgets,
+                task.test_isolation,
+                task.test_workers,
+            )
+
+    if test_result is None:
+        trace.run_timeout = get_task_run_timeout(task)
+        test_result = run_tests_in_isolated_env(
+            tests_file_path,
+            solution_code,
+            task.test_workers,
+            task.test_isolation,
+            parameter_cases,
+            trace.run_timeout,
+            test_budgets,
+        )
+        trace.duration = test_result.pop('duration', None)
+        if result_cache is not None:
+            result_cache.record_miss()
+            result_cache.set(
+                tests_file_path,
+                solution_code,
+                test_result,
+                parameter_cases,
+                test_budgets,
+                task.test_isolation,
+                task.test_workers,
+            )
+    return test_result
+
+
+def grade_solution_from_cache(
+    task: Task, user: User, solution_code: str
+) -> tuple[dict, int] | None:
+    """
+    Same as `grade_solution`, but only for static rule violations and
+    cached results: returns None instead of running the sandbox. Only a
+    cache shared with the grading workers is looked up, since only they
+    store results in the async mode.
+    """
+    static_result = check_static_rules(task, solution_code)
+    if static_result is not None:
+        return build_grading_response(task, user, solution_code, static_result)
+
+    result_cache = get_grading_result_cache()
+    if result_cache is None or not result_cache.is_shared:
+        return None
+    test_result = result_cache.get(
+        get_test_file_paths(task),
+        solution_code,
+        get_task_parameter_cases(task),
+        get_task_test_budgets(task),
+        task.test_isolation,
+        task.test_workers,
+    )
+    if test_result is None:
+        return None
+    return build_grading_response(task, user, solution_code, test_result)
+
+
+def build_grading_response(
+    task: Task, user: User, solution_code: str, test_result: dict
+) -> tuple[dict, int]:
+    count_grading_outcome(test_result)
+    if test_result.get('status_code') == status.HTTP_503_SERVICE_UNAVAILABLE:
+        return (
+            SERVICE_UNAVAILABLE_RESPONSE,
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    if test_result.get('status_code') == status.HTTP_504_GATEWAY_TIMEOUT:
+        return (
+            {
+                'message': "Запрос превысил максимально допустимое время выполнения. "
+                "Возможно присутствует вечный цикл в решении задачи. "
+                "Пожалуйста, попробуйте позже.",
+                'errors': "Gateway Timeout.",
+            },
+            status.HTTP_504_GATEWAY_TIMEOUT,
+        )
+
+    score = test_result.get('score')
+
+    if test_result['success']:
+        with transaction.atomic():
+            if Submission.objects.filter(task=task, user__id=user.id).exists():
+                return (
+                    {
+                        "message": f"{user.first_name} {user.last_name} has already solved this task."
+                    },
+                    status.HTTP_200_OK,
+                )
+            Submission.objects.create(
+                task=task,
+                user=user,
+                solution_code=solution_code,
+                score=score,
+            )
+
+        return (
+            {
+                'message': 'Задание выполнено верно!',
+                'score': score,
+            },
+            status.HTTP_200_OK,
+        )
+    else:
+        return (
+            {
+                'message': 'Задание не выполнено.',
+                'score': score,
+                'errors': test_result['errors'],
+            },
+            status.HTTP_200_OK,
+        )
+
+
+def enqueue_grading_job(
+    task: Task, user: User, solution_code: str
+) -> GradingJob:
+    return GradingJob.objects.create(
+        task=task, user=user, solution_code=solution_code
+    )
+
+
+def claim_next_grading_job(worker_id: str) -> GradingJob | None:
+    """
+    Move the oldest queued job to `running` on behalf of the worker and
+    return it. Databases with SKIP LOCKED (MySQL 8, PostgreSQL) let
+    concurrent workers pass over each other's rows instead of waiting for
+    them; elsewhere (SQLite) a conditional update decides the winner.
+    """
+    if connection.features.has_select_for_update_skip_locked:
+        return _claim_with_skip_locked(worker_id)
+    return _claim_with_conditional_update(worker_id)
+
+
+def _queued_jobs() -> QuerySet:
+    return GradingJob.objects.filter(
+        status=GradingJobStatusEnum.QUEUED.value
+    ).order_by('created_at', 'id')
+
+
+def _claim_with_skip_locked(worker_id: str) -> GradingJob | None:
+    with transaction.atomic():
+        job: GradingJob | None = (
+            _queued_jobs().select_for_update(skip_locked=True).first()
+        )
+        if job is None:
+            return None
+
+        now = timezone.now()
+        job.status = GradingJobStatusEnum.RUNNING.value
+        job.worker_id = worker_id
+        job.attempts += 1
+        job.started_at = now
+        job.heartbeat_at = now
+        job.save(
+            update_fields=[
+                'status',
+                'worker_id',
+                'attempts',
+                'started_at',
+                'heartbeat_at',
+            ]
+        )
+        return job
+
+
+def _claim_with_conditional_update(worker_id: str) -> GradingJob | None:
+    while True:
+        job: GradingJob | None = _queued_jobs().first()
+        if job is None:
+            return None
+
+        now = timezone.now()
+        is_claimed = GradingJob.objects.filter(
+            pk=job.pk, status=GradingJobStatusEnum.QUEUED.value
+        ).update(
+            status=GradingJobStatusEnum.RUNNING.value,
+            worker_id=worker_id,
+            attempts=F('attempts') + 1,
+            started_at=now,
+            heartbeat_at=now,
+        )
+        if is_claimed:
+            job.refresh_from_db()
+            return job
+
+
+def _owned_job(job: GradingJob, worker_id: str) -> QuerySet:
+    return GradingJob.objects.filter(
+        pk=job.pk,
+        status=GradingJobStatusEnum.RUNNING.value,
+        worker_id=worker_id,
+    )
+
+
+def send_grading_job_heartbeat(job: GradingJob, worker_id: str) -> bool:
+    """
+    Extend the worker's lease on the job. False means the lease has expired
+    and the job was handed to another worker.
+    """
+    return bool(_owned_job(job, worker_id).update(heartbeat_at=timezone.now()))
+
+
+class GradingJobHeartbeat:
+    """
+    Keeps the lease on a running job alive from a background thread while
+    the worker waits for the sandbox.
+    """
+
+    def __init__(self, job: GradingJob, worker_id: str, interval: float):
+        self.job: GradingJob = job
+        self.worker_id: str = worker_id
+        self.interval: float = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f'grading-job-{job.id}-heartbeat',
+            daemon=True,
+        )
+
+    def __enter__(self) -> 'GradingJobHeartbeat':
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        try:
+            while not self._stopped.wait(self.interval):
+                if not send_grading_job_heartbeat(self.job, self.worker_id):
+                    logger.warning(
+                        'Grading job %s lease expired while running.',
+                        self.job.id,
+                    )
+                    return
+        finally:
+            connection.close()
+
+
+def requeue_orphaned_grading_jobs() -> int:
+    """
+    Put running jobs whose worker stopped sending heartbeats back into the
+    queue. Jobs that already used up GRADING_JOB_MAX_ATTEMPTS are finished
+    with a 503 response instead, so a solution that keeps crashing workers
+    does not circulate forever.
+    """
+    now = timezone.now()
+    orphaned: QuerySet = GradingJob.objects.filter(
+        status=GradingJobStatusEnum.RUNNING.value,
+        heartbeat_at__lt=now
+        - timedelta(seconds=settings.GRADING_JOB_LEASE_SECONDS),
+    )
+    requeued = orphaned.filter(
+        attempts__lt=settings.GRADING_JOB_MAX_ATTEMPTS
+    ).update(
+        status=GradingJobStatusEnum.QUEUED.value,
+        worker_id='',
+        started_at=None,
+        heartbeat_at=None,
+    )
+    abandoned = orphaned.update(
+        status=GradingJobStatusEnum.DONE.value,
+        response_data=SERVICE_UNAVAILABLE_RESPONSE,
+        response_status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        finished_at=now,
+    )
+    if requeued or abandoned:
+        logger.warning(
+            'Requeued %s orphaned grading jobs, abandoned %s.',
+            requeued,
+            abandoned,
+        )
+    return requeued
+
+
+def process_grading_job(job: GradingJob, worker_id: str):
+    try:
+        with GradingJobHeartbeat(
+            job, worker_id, settings.GRADING_JOB_HEARTBEAT_INTERVAL
+        ):
+            response_data, response_status = grade_solution(
+                job.task, job.user, job.solution_code
+            )
+    except Exception:
+        logger.exception('Grading job %s crashed.', job.id)
+        response_data = {
+            **SERVICE_UNAVAILABLE_RESPONSE,
+            'errors': "Internal server error.",
+        }
+        response_status = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+    is_finished = _owned_job(job, worker_id).update(
+        status=GradingJobStatusEnum.DONE.value,
+        response_data=response_data,
+        response_status=response_status,
+        finished_at=timezone.now(),
+    )
+    if not is_finished:
+        logger.warning(
+            'Grading job %s was requeued while %s ran it, '
+            'the result is dropped.',
+            job.id,
+            worker_id,
+        )
@@ -0,0 +1,132 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from rest_framework import status
+
+from auto_graders.grading_trace import GradingTrace
+from auto_graders.metrics import grading_outcome
+from auto_graders.models import GradingRun, Task
+
+logger = logging.getLogger(__name__)
+
+
+class GradingRunWriter:
+    """
+    Saves grading runs in batches from a background thread, so the request
+    that graded a solution does not wait for the insert. A run that finds
+    the queue full is dropped with a warning instead of blocking.
+    """
+
+    def __init__(self, queue_size: int, batch_size: int):
+        self.batch_size: int = batch_size
+        self._queue: queue.Queue[GradingRun] = queue.Queue(queue_size)
+        self._pending: int = 0
+        self._idle = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name='grading-run-writer', daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.flush, settings.GRADING_RUN_FLUSH_TIMEOUT)
+
+    def submit(self, grading_run: GradingRun):
+        with self._idle:
+            self._pending += 1
+        try:
+            self._queue.put_nowait(grading_run)
+        except queue.Full:
+            self._done(1)
+            logger.warning(
+                'Grading run queue is full, a run of task %s is dropped.',
+                grading_run.task_id,
+            )
+
+    def flush(self, timeout: float) -> bool:
+        """Wait until the submitted runs are saved, at most `timeout`."""
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def _done(self, count: int):
+        with self._idle:
+            self._pending -= count
+            if not self._pending:
+                self._idle.notify_all()
+
+    def _run(self):
+        while True:
+            batch: list[GradingRun] = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                close_old_connections()
+                GradingRun.objects.bulk_create(batch)
+            except Exception:
+                logger.exception('Saving %s grading runs failed.', len(batch))
+                connection.close()
+            finally:
+                self._done(len(batch))
+
+
+_writer: GradingRunWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_grading_run_writer() -> GradingRunWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                writer = GradingRunWriter(
+                    queue_size=settings.GRADING_RUN_QUEUE_SIZE,
+                    batch_size=settings.GRADING_RUN_BATCH_SIZE,
+                )
+                writer.start()
+                _writer = writer
+    return _writer
+
+
+def record_grading_run(task: Task, test_result: dict, trace: GradingTrace):
+    """
+    Save the trace of a grading, in the background unless
+    GRADING_RUN_ASYNC_WRITES is off.
+    """
+    grading_run = GradingRun(
+        task=task,
+        duration=trace.duration,
+        run_timeout=trace.run_timeout,
+        success=bool(test_result.get('success')),
+        outcome=grading_outcome(test_result),
+        timed_out=bool(test_result.get('timed_out'))
+        or test_result.get('status_code') == status.HTTP_504_GATEWAY_TIMEOUT,
+        total_duration=round(trace.total_duration, 6),
+        stages=trace.stages,
+        container_id=trace.container_id,
+        exit_code=trace.exit_code,
+        output_size=trace.output_size,
+        cpu_time=trace.cpu_time,
+        peak_memory=trace.peak_memory,
+    )
+    if settings.GRADING_RUN_ASYNC_WRITES:
+        get_grading_run_writer().submit(grading_run)
+    else:
+        grading_run.save()
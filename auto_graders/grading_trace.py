@@ -0,0 +1,94 @@
+"""
+Flight recorder of a grading run.
+
+`grade_solution` opens a trace for every solution it grades. The code of
+the run's stages, down to the sandbox execution, times itself into the
+current trace with `trace_stage`, which does nothing outside of a trace,
+and notes what the sandbox reported. The trace ends up as a GradingRun,
+and every timed stage is also passed to the trace's `on_stage` callback.
+"""
+
+import time
+from collections.abc import Callable
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class GradingTrace:
+    def __init__(self, on_stage: Callable[[str, float], None] | None = None):
+        self.on_stage = on_stage
+        # Seconds spent in each stage, by stage name.
+        self.stages: dict[str, float] = {}
+        self.container_id: str = ''
+        # Wall-clock seconds of the sandbox run and the timeout it had.
+        self.duration: float | None = None
+        self.run_timeout: float | None = None
+        self.exit_code: int | None = None
+        # Bytes the run wrote, including those cut from the kept output.
+        self.output_size: int | None = None
+        # Measured by the runner inside the sandbox.
+        self.cpu_time: float | None = None
+        self.peak_memory: int | None = None
+        self._started_at: float = time.perf_counter()
+
+    @property
+    def total_duration(self) -> float:
+        return time.perf_counter() - self._started_at
+
+    @contextmanager
+    def stage(self, name: str):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started_at
+            self.stages[name] = round(self.stages.get(name, 0.0) + elapsed, 6)
+            if self.on_stage is not None:
+                self.on_stage(name, elapsed)
+
+
+_current_trace: ContextVar[GradingTrace | None] = ContextVar(
+    'grading_trace', default=None
+)
+
+
+@contextmanager
+def start_grading_trace(
+    on_stage: Callable[[str, float], None] | None = None,
+):
+    trace = GradingTrace(on_stage)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def current_grading_trace() -> GradingTrace | None:
+    return _current_trace.get()
+
+
+@contextmanager
+def trace_stage(name: str):
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    with trace.stage(name):
+        yield
+
+
+def trace_exec_result(result):
+    """Note the exit code and output bytes of a sandbox `ExecResult`."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.exit_code = result.exit_code
+        trace.output_size = result.output_size
+
+
+def trace_runner_usage(summary: dict):
+    """Note the CPU time and memory peak the runner's summary reports."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.cpu_time = summary.get('cpu_time')
+        trace.peak_memory = summary.get('peak_memory')
@@ -1,7 +1,148 @@
+import ast
+import io
+import types
 import unittest
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from auto_graders.constants import (
+    BUILTINS_INPUT,
+    COMPILE_MODE,
+    SOLUTION_FILE_NAME,
+    SYS_STDOUT,
+)
+from auto_graders.static_checks import SolutionIndex
+from auto_graders.test_budgets import (
+    BUDGET_CPU_TIME,
+    BUDGET_MEMORY,
+    BudgetExceeded,
+    measure_solution,
+    read_budgets,
+)
 
 
 class InformativeTestCase(unittest.TestCase):
+    """
+    Base class of the grading suites.
+
+    The solution is read, parsed and compiled once per test class and
+    shared by its tests: `run_solution` executes the compiled code with the
+    given input, `load_solution_module` runs it as a fresh module,
+    `solution_tree` returns the parsed AST and `solution_index` the node
+    types, calls and attributes it uses for structural checks.
+
+    Every run of the solution is held to `cpu_time_budget` seconds of CPU
+    time and `memory_budget` bytes of memory growth, or to the task's
+    budgets when the host sets them. A run over its budget fails the test
+    with `BudgetExceeded`.
+    """
+
+    solution_file_name: str = SOLUTION_FILE_NAME
+    cpu_time_budget: float | None = None
+    memory_budget: int | None = None
+    _solution_source: str | None = None
+    _solution_code: types.CodeType | None = None
+    _solution_tree: ast.Module | None = None
+    _solution_index: SolutionIndex | None = None
+
+    @classmethod
+    def solution_source(cls) -> str:
+        if cls._solution_source is None:
+            with open(cls.solution_file_name) as solution_file:
+                cls._solution_source = solution_file.read()
+        return cls._solution_source
+
+    @classmethod
+    def solution_code(cls) -> types.CodeType:
+        if cls._solution_code is None:
+            cls._solution_code = compile(
+                cls.solution_source(), cls.solution_file_name, COMPILE_MODE
+            )
+        return cls._solution_code
+
+    @classmethod
+    def solution_tree(cls) -> ast.Module:
+        """The parsed solution. Shared by all tests, so do not modify it."""
+        if cls._solution_tree is None:
+            cls._solution_tree = ast.parse(cls.solution_source())
+        return cls._solution_tree
+
+    @classmethod
+    def solution_index(cls) -> SolutionIndex:
+        if cls._solution_index is None:
+            cls._solution_index = SolutionIndex(cls.solution_tree())
+        return cls._solution_index
+
+    @classmethod
+    def preload_solution(cls):
+        """
+        Compile and parse the solution ahead of the tests, e.g. before the
+        runner forks a child per test. Errors are left to the tests.
+        """
+        try:
+            cls.solution_code()
+            cls.solution_index()
+        except (OSError, SyntaxError, ValueError):
+            pass
+
+    def capture_solution_output(self) -> str:
+        """
+        Execute the solution as a script and return what it printed. The
+        caller patches `input()`, see `run_solution`.
+        """
+        with patch(SYS_STDOUT, new_callable=io.StringIO) as mock_stdout:
+            with self.solution_budget():
+                exec(self.solution_code(), {'__name__': '__main__'})
+        return mock_stdout.getvalue()
+
+    def run_solution(self, *input_values: str, repeat_input=False) -> str:
+        """
+        Execute the solution with every `input()` call getting the next of
+        `input_values`, or always the first one with `repeat_input`, and
+        return what it printed.
+        """
+        if repeat_input:
+            input_patch = patch(BUILTINS_INPUT, return_value=input_values[0])
+        else:
+            input_patch = patch(BUILTINS_INPUT, side_effect=input_values)
+        with input_patch:
+            return self.capture_solution_output()
+
+    def load_solution_module(self, name: str = 'solution') -> types.ModuleType:
+        """Run the solution as a new module, e.g. to call its functions."""
+        module = types.ModuleType(name)
+        module.__file__ = self.solution_file_name
+        with self.solution_budget():
+            exec(self.solution_code(), module.__dict__)
+        return module
+
+    @contextmanager
+    def solution_budget(self):
+        """
+        Hold the code run in the block to the budgets, e.g. calls of the
+        functions of `load_solution_module`.
+        """
+        cpu_time_budget, memory_budget = read_budgets(
+            self.cpu_time_budget, self.memory_budget
+        )
+        if cpu_time_budget is None and memory_budget is None:
+            yield
+            return
+        with measure_solution(cpu_time_budget, memory_budget) as usage:
+            yield
+        self.assertWithinBudget(
+            BUDGET_CPU_TIME,
+            usage.cpu_time,
+            cpu_time_budget,
+            usage.limit_reached == BUDGET_CPU_TIME,
+        )
+        self.assertWithinBudget(
+            BUDGET_MEMORY,
+            usage.peak_memory,
+            memory_budget,
+            usage.limit_reached == BUDGET_MEMORY,
+        )
+
     def shortDescription(self):
         doc = self._testMethodDoc
         return (
@@ -13,9 +154,39 @@ class InformativeTestCase(unittest.TestCase):
     def assertTrue(self, expr, msg=None):
         if msg is None:
             msg = self.shortDescription()
-        super().assertTrue(expr, msg=msg)
+        try:
+            super().assertTrue(expr, msg=msg)
+        except AssertionError as err:
+            err.operands = {'method': 'assertTrue', 'expr': expr}
+            raise
+
+    def assertFalse(self, expr, msg=None):
+        if msg is None:
+            msg = self.shortDescription()
+        try:
+            super().assertFalse(expr, msg=msg)
+        except AssertionError as err:
+            err.operands = {'method': 'assertFalse', 'expr': expr}
+            raise
+
+    def assertWithinBudget(
+        self, budget, used, limit, limit_reached=False, msg=None
+    ):
+        if limit is None or (used <= limit and not limit_reached):
+            return
+        if msg is None:
+            msg = self.shortDescription()
+        raise BudgetExceeded(budget, used, limit, msg)
 
     def assertEqual(self, first, second, msg=None):
         if msg is None:
             msg = self.shortDescription()
-        super().assertEqual(first, second, msg=msg)
+        try:
+            super().assertEqual(first, second, msg=msg)
+        except AssertionError as err:
+            err.operands = {
+                'method': 'assertEqual',
+                'first': first,
+                'second': second,
+            }
+            raise
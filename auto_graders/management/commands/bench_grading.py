@@ -0,0 +1,172 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from auto_graders.benchmarking import (
+    LatencyRecorder,
+    add_sandbox_arguments,
+    compare_results,
+    get_benchmark_suites,
+    get_sandbox_configuration,
+    get_sandbox_settings,
+    load_results,
+    read_reference_solution,
+    save_results,
+)
+from auto_graders.grading_trace import start_grading_trace
+from auto_graders.metrics import grading_outcome
+from auto_graders.runner.records import ISOLATION_LEVELS, ISOLATION_SHARED
+from auto_graders.utils import run_tests_in_isolated_env
+
+BENCHMARK_NAME = 'bench_grading'
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the grading pipeline: grade the reference solutions of the '
+        'grading suites with `run_tests_in_isolated_env` at every '
+        'concurrency level and report p50 and p99 latencies per stage and '
+        'the submissions graded per second. Needs no Docker with the fake '
+        'and local sandboxes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'suites',
+            nargs='*',
+            help=(
+                'Suites to grade, e.g. greeting_task. All suites with a '
+                'reference solution by default.'
+            ),
+        )
+        add_sandbox_arguments(parser)
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            nargs='+',
+            default=[1, 4],
+            help='Numbers of submissions graded at once.',
+        )
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=3,
+            help='Number of times every suite is graded at each level.',
+        )
+        parser.add_argument(
+            '--isolation',
+            choices=ISOLATION_LEVELS,
+            default=ISOLATION_SHARED,
+            help='Test isolation level of the graded tasks.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of processes the tests of a run are spread over.',
+        )
+        parser.add_argument(
+            '--save', help='Store the results as JSON in this file.'
+        )
+        parser.add_argument(
+            '--compare',
+            help='Compare with the results stored by an earlier --save.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            suites = get_benchmark_suites(options['suites'])
+            baseline = (
+                load_results(options['compare'], BENCHMARK_NAME)
+                if options['compare']
+                else None
+            )
+        except ValueError as err:
+            raise CommandError(str(err))
+        submissions = [
+            (str(test_file_path), read_reference_solution(suite))
+            for suite, test_file_path in suites.items()
+        ]
+        configuration = {
+            **get_sandbox_configuration(options),
+            'suites': len(suites),
+            'rounds': options['rounds'],
+            'isolation': options['isolation'],
+            'workers': options['workers'],
+        }
+
+        levels: list[dict] = []
+        with override_settings(**get_sandbox_settings(options)):
+            for concurrency in options['concurrency']:
+                level = self.measure(
+                    submissions * options['rounds'],
+                    concurrency,
+                    options['isolation'],
+                    options['workers'],
+                )
+                self.report(level)
+                levels.append(level)
+
+        if baseline is not None:
+            for line in compare_results(levels, baseline):
+                self.stdout.write(line)
+        if options['save']:
+            save_results(
+                options['save'], BENCHMARK_NAME, configuration, levels
+            )
+            self.stdout.write(f'Results saved to {options["save"]}.')
+
+    def measure(
+        self,
+        submissions: list[tuple[str, str]],
+        concurrency: int,
+        isolation: str,
+        workers: int,
+    ) -> dict:
+        recorder = LatencyRecorder()
+
+        def grade(submission: tuple[str, str]):
+            test_file_path, solution_code = submission
+            with start_grading_trace() as trace:
+                test_result = run_tests_in_isolated_env(
+                    [test_file_path], solution_code, workers, isolation
+                )
+                total_duration = trace.total_duration
+            for stage, seconds in trace.stages.items():
+                recorder.add(stage, seconds)
+            recorder.add('total', total_duration)
+            recorder.add_outcome(grading_outcome(test_result))
+
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(grade, submissions))
+        seconds = time.perf_counter() - started_at
+        return {
+            'concurrency': concurrency,
+            'submissions': len(submissions),
+            'seconds': round(seconds, 3),
+            'throughput': round(len(submissions) / seconds, 3),
+            'outcomes': dict(recorder.outcomes),
+            'latencies': recorder.summary(),
+        }
+
+    def report(self, level: dict):
+        outcomes = ', '.join(
+            f'{outcome} {count}'
+            for outcome, count in sorted(level['outcomes'].items())
+        )
+        self.stdout.write(
+            f'concurrency {level["concurrency"]}: '
+            f'{level["submissions"]} submissions in {level["seconds"]:.2f} s, '
+            f'{level["throughput"]:.2f}/s ({outcomes})'
+        )
+        self.stdout.write(
+            f'  {"stage":<16} {"p50":>12} {"p99":>12} {"mean":>12}'
+        )
+        for stage, latency in level['latencies'].items():
+            self.stdout.write(
+                f'  {stage:<16} {latency["p50"]:>9.2f} ms '
+                f'{latency["p99"]:>9.2f} ms {latency["mean"]:>9.2f} ms'
+            )
@@ -0,0 +1,153 @@
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from auto_graders.constants import SOLUTION_FILE_NAME
+from auto_graders.management.commands.bench_test_loading import (
+    SAMPLE_SOLUTION,
+)
+from auto_graders.runner.records import (
+    ISOLATION_LEVELS,
+    RECORD_TOKEN_ENV,
+    TEST_ISOLATION_ENV,
+    TEST_TIMEOUT_ENV,
+    TEST_WORKERS_ENV,
+)
+from auto_graders.sandbox.execution import TEST_COMMAND
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure what every test isolation level costs: run the grading '
+        'suites with the structured runner in the shared interpreter, in a '
+        'forked child per test and in a fresh interpreter per test.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'suites',
+            nargs='*',
+            help=(
+                'Test files to run, e.g. greeting_task_test.py. All suites '
+                'by default.'
+            ),
+        )
+        parser.add_argument(
+            '--solution',
+            help=(
+                'Solution file to test. A short sample solution is used '
+                'by default; failing tests cost about as much as passing.'
+            ),
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=3,
+            help='Number of times every suite runs at each isolation level.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of processes the tests of a run are spread over.',
+        )
+
+    def handle(self, *args, **options):
+        tests_dir = Path(__file__).resolve().parents[2] / 'tests'
+        test_file_paths = [
+            tests_dir / suite for suite in options['suites']
+        ] or sorted(tests_dir.glob('*_test.py'))
+        for test_file_path in test_file_paths:
+            if not test_file_path.is_file():
+                raise CommandError(f'{test_file_path} is not a file.')
+        if options['solution']:
+            solution_code = Path(options['solution']).read_text()
+        else:
+            solution_code = SAMPLE_SOLUTION
+
+        self.stdout.write(
+            f'{"suite":<54} {"tests":>5} '
+            + ' '.join(f'{isolation:>10}' for isolation in ISOLATION_LEVELS)
+        )
+        totals = dict.fromkeys(ISOLATION_LEVELS, 0.0)
+        total_tests = 0
+        for test_file_path in test_file_paths:
+            with tempfile.TemporaryDirectory() as workspace:
+                shutil.copy(test_file_path, workspace)
+                Path(workspace, SOLUTION_FILE_NAME).write_text(solution_code)
+                durations = {
+                    isolation: self.measure(
+                        workspace,
+                        isolation,
+                        options['workers'],
+                        options['runs'],
+                    )
+                    for isolation in ISOLATION_LEVELS
+                }
+            tests = self.count_tests(test_file_path)
+            total_tests += tests
+            for isolation, duration in durations.items():
+                totals[isolation] += duration
+            self.stdout.write(
+                f'{test_file_path.stem:<54} {tests:>5} '
+                + ' '.join(
+                    f'{duration:>7.0f} ms' for duration in durations.values()
+                )
+            )
+        self.stdout.write(
+            f'{"total":<54} {"":>5} '
+            + ' '.join(f'{total:>7.0f} ms' for total in totals.values())
+        )
+        self.stdout.write(
+            f'{"per test":<54} {"":>5} '
+            + ' '.join(
+                f'{total / total_tests:>7.1f} ms' for total in totals.values()
+            )
+        )
+
+    def count_tests(self, test_file_path: Path) -> int:
+        return (
+            unittest.TestLoader()
+            .loadTestsFromName(f'auto_graders.tests.{test_file_path.stem}')
+            .countTestCases()
+        )
+
+    def measure(
+        self, workspace: str, isolation: str, workers: int, runs: int
+    ) -> float:
+        """Median wall time of a whole runner run, in milliseconds."""
+        environment = dict(os.environ)
+        environment.update(
+            {
+                'PYTHONPATH': str(settings.BASE_DIR),
+                TEST_TIMEOUT_ENV: str(settings.SANDBOX_TEST_TIMEOUT),
+                TEST_WORKERS_ENV: str(workers),
+                TEST_ISOLATION_ENV: isolation,
+            }
+        )
+        command = [sys.executable, *TEST_COMMAND[1:]]
+        durations: list[float] = []
+        for _ in range(runs):
+            environment[RECORD_TOKEN_ENV] = uuid.uuid4().hex
+            started_at = time.perf_counter()
+            subprocess.run(
+                command,
+                cwd=workspace,
+                env=environment,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=settings.SANDBOX_RUN_TIMEOUT * 10,
+            )
+            durations.append((time.perf_counter() - started_at) * 1000)
+        return statistics.median(durations)
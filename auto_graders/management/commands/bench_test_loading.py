@@ -0,0 +1,121 @@
+import statistics
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from auto_graders.constants import COMPILE_MODE, SOLUTION_FILE_NAME
+from auto_graders.informative_test_case import InformativeTestCase
+
+SAMPLE_SOLUTION = '''def read_numbers(prompt: str) -> list[int]:
+    raw_values = input(prompt).replace(',', ' ').split()
+    return [int(value) for value in raw_values]
+
+
+def summarize(numbers: list[int]) -> tuple[int, int, int]:
+    if not numbers:
+        return 0, 0, 0
+    return sum(numbers), min(numbers), max(numbers)
+
+
+def main():
+    numbers = read_numbers('Enter numbers: ')
+    total, smallest, largest = summarize(numbers)
+    print(f'Sum of the numbers: {total}')
+    print(f'Minimum value: {smallest}')
+    print(f'Maximum value: {largest}')
+
+
+main()
+'''
+
+
+def legacy_load(solution_path: str, tests: int):
+    """Every test reopens, reads and compiles the solution itself."""
+    for _ in range(tests):
+        with open(solution_path) as solution_file:
+            compile(solution_file.read(), SOLUTION_FILE_NAME, COMPILE_MODE)
+
+
+def cached_load(solution_path: str, tests: int):
+    """The suite's tests share one read, compile and parse of the class."""
+
+    class SuiteTestCase(InformativeTestCase):
+        solution_file_name = solution_path
+
+    for _ in range(tests):
+        SuiteTestCase.solution_code()
+    SuiteTestCase.solution_tree()
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the per-suite cost of loading the solution: a read and '
+        'compile in every test versus one read, compile and parse shared by '
+        'the tests of the suite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--solution',
+            help=(
+                'Solution file to load. A short sample solution is used '
+                'by default.'
+            ),
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=50,
+            help='Number of times every suite is loaded with each way.',
+        )
+
+    def handle(self, *args, **options):
+        if options['solution']:
+            solution_path = Path(options['solution']).resolve()
+            if not solution_path.is_file():
+                raise CommandError(f'{solution_path} is not a file.')
+            self.measure_suites(str(solution_path), options['runs'])
+            return
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            solution_path = Path(tempdir) / SOLUTION_FILE_NAME
+            solution_path.write_text(SAMPLE_SOLUTION)
+            self.measure_suites(str(solution_path), options['runs'])
+
+    def measure_suites(self, solution_path: str, runs: int):
+        tests_dir = Path(__file__).resolve().parents[2] / 'tests'
+        loader = unittest.TestLoader()
+        self.stdout.write(
+            f'{"suite":<54} {"tests":>5} {"per test":>10} '
+            f'{"once":>10} {"saved":>6}'
+        )
+        legacy_total = cached_total = 0.0
+        for test_file_path in sorted(tests_dir.glob('*_test.py')):
+            module_name = f'auto_graders.tests.{test_file_path.stem}'
+            tests = loader.loadTestsFromName(module_name).countTestCases()
+            legacy = self.measure(legacy_load, solution_path, tests, runs)
+            cached = self.measure(cached_load, solution_path, tests, runs)
+            legacy_total += legacy
+            cached_total += cached
+            self.stdout.write(
+                f'{test_file_path.stem:<54} {tests:>5} '
+                f'{legacy:>7.3f} ms {cached:>7.3f} ms '
+                f'{1 - cached / legacy:>6.0%}'
+            )
+        self.stdout.write(
+            f'{"total":<54} {"":>5} '
+            f'{legacy_total:>7.3f} ms {cached_total:>7.3f} ms '
+            f'{1 - cached_total / legacy_total:>6.0%}'
+        )
+
+    def measure(self, load, solution_path: str, tests: int, runs: int):
+        """Median duration of loading one suite, in milliseconds."""
+        durations: list[float] = []
+        for _ in range(runs):
+            started_at = time.perf_counter()
+            load(solution_path, tests)
+            durations.append((time.perf_counter() - started_at) * 1000)
+        return statistics.median(durations)
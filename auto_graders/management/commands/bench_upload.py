@@ -0,0 +1,146 @@
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from auto_graders.sandbox import upload_workspace, remove_workspace
+from auto_graders.utils import (
+    CONTAINER_APP_PATH,
+    collect_workspace_files,
+)
+
+FAKE_DOCKER_SCRIPT = '''#!/bin/sh
+if [ "$1" = "exec" ] && [ "$2" = "-i" ]; then
+    cat > /dev/null
+fi
+exit 0
+'''
+
+
+def legacy_upload_and_cleanup(container_id: str, files: dict[str, str]):
+    """
+    The per-file pipeline used before the tar upload: every file is written
+    to a host temp directory, copied with its own `docker cp` and removed
+    with its own `docker exec rm`.
+    """
+    copied_files: list[str] = []
+    with tempfile.TemporaryDirectory() as tempdir:
+        for file_name, content in files.items():
+            temp_file_path = os.path.join(tempdir, file_name)
+            with open(temp_file_path, 'w') as temp_file:
+                temp_file.write(content)
+            docker_file_path = f'{CONTAINER_APP_PATH}{file_name}'
+            copied_files.append(docker_file_path)
+            subprocess.run(
+                [
+                    'docker',
+                    'cp',
+                    temp_file_path,
+                    f'{container_id}:{docker_file_path}',
+                ],
+                stdin=subprocess.DEVNULL,
+            )
+    for docker_file_path in copied_files:
+        subprocess.run(
+            ['docker', 'exec', container_id, 'rm', '-rf', docker_file_path],
+            stdin=subprocess.DEVNULL,
+        )
+
+
+def tar_upload_and_cleanup(container_id: str, files: dict[str, str]):
+    workspace = upload_workspace(container_id, files)
+    remove_workspace(container_id, workspace)
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the per-submission overhead of uploading tests and the '
+        'solution into the sandbox: one `docker cp`/`docker exec rm` per '
+        'file versus a single in-memory tar stream.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--container',
+            default=settings.SANDBOX_CONTAINER_NAME,
+            help='Sandbox container to upload into.',
+        )
+        parser.add_argument(
+            '--test-files',
+            type=int,
+            default=5,
+            help='Number of test files uploaded with every submission.',
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=20,
+            help='Number of submissions to upload with each pipeline.',
+        )
+        parser.add_argument(
+            '--fake-docker',
+            action='store_true',
+            help=(
+                'Replace the docker CLI with a no-op script, so only the '
+                'process spawn cost is measured. Used automatically when '
+                'docker is not installed.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        tests_dir = Path(__file__).resolve().parents[2] / 'tests'
+        test_file_paths = sorted(
+            str(path) for path in tests_dir.glob('*_test.py')
+        )
+        test_file_paths = test_file_paths[: options['test_files']]
+        files = collect_workspace_files(test_file_paths, 'print("Hello")\n')
+
+        fake_docker = options['fake_docker'] or not shutil.which('docker')
+        original_path = os.environ['PATH']
+        with tempfile.TemporaryDirectory() as bin_dir:
+            if fake_docker:
+                self.install_fake_docker(bin_dir)
+            try:
+                self.compare_pipelines(
+                    options['container'], files, options['runs'], fake_docker
+                )
+            finally:
+                os.environ['PATH'] = original_path
+
+    def compare_pipelines(self, container_id, files, runs, fake_docker):
+        self.stdout.write(
+            f'{len(files)} files per submission, {runs} runs, '
+            f'{"fake" if fake_docker else "real"} docker'
+        )
+        for name, pipeline in (
+            ('per-file cp', legacy_upload_and_cleanup),
+            ('tar stream', tar_upload_and_cleanup),
+        ):
+            durations = self.measure(pipeline, container_id, files, runs)
+            self.stdout.write(
+                f'{name:>12}: '
+                f'mean {statistics.mean(durations):8.2f} ms, '
+                f'p50 {statistics.median(durations):8.2f} ms, '
+                f'max {max(durations):8.2f} ms'
+            )
+
+    def install_fake_docker(self, bin_dir: str):
+        fake_docker_path = os.path.join(bin_dir, 'docker')
+        with open(fake_docker_path, 'w') as fake_docker:
+            fake_docker.write(FAKE_DOCKER_SCRIPT)
+        os.chmod(fake_docker_path, 0o755)
+        os.environ['PATH'] = f'{bin_dir}{os.pathsep}{os.environ["PATH"]}'
+
+    def measure(self, pipeline, container_id, files, runs) -> list[float]:
+        durations: list[float] = []
+        for _ in range(runs):
+            started_at = time.perf_counter()
+            pipeline(container_id, files)
+            durations.append((time.perf_counter() - started_at) * 1000)
+        return durations
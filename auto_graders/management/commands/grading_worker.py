@@ -0,0 +1,71 @@
+import os
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from auto_graders.grading import (
+    claim_next_grading_job,
+    process_grading_job,
+    requeue_orphaned_grading_jobs,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Grade queued solutions (GRADING_ASYNC). Workers on any number of '
+        'hosts can share one database: every job is claimed by exactly one '
+        'of them, and jobs of a worker that stops sending heartbeats go '
+        'back to the queue.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--worker-id',
+            default=f'{socket.gethostname()}:{os.getpid()}',
+            help='Name the worker records on the jobs it claims.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.GRADING_WORKER_POLL_INTERVAL,
+            help='Seconds to sleep while the queue is empty.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue and exit instead of polling forever.',
+        )
+
+    def handle(self, *args, **options):
+        worker_id: str = options['worker_id']
+        poll_interval: float = options['poll_interval']
+        once: bool = options['once']
+        requeue_interval: float = settings.GRADING_JOB_HEARTBEAT_INTERVAL
+        next_requeue_at = 0.0
+        processed = 0
+
+        self.stdout.write(f'Grading worker {worker_id} started.')
+        try:
+            while True:
+                close_old_connections()
+                if time.monotonic() >= next_requeue_at:
+                    requeue_orphaned_grading_jobs()
+                    next_requeue_at = time.monotonic() + requeue_interval
+
+                job = claim_next_grading_job(worker_id)
+                if job is None:
+                    if once:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                process_grading_job(job, worker_id)
+                processed += 1
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(
+            f'Grading worker {worker_id} stopped, {processed} jobs done.'
+        )
@@ -0,0 +1,434 @@
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from auto_graders.benchmarking import (
+    LatencyRecorder,
+    add_sandbox_arguments,
+    compare_results,
+    get_benchmark_suites,
+    get_sandbox_configuration,
+    get_sandbox_settings,
+    load_results,
+    read_reference_solution,
+    save_results,
+    summarize_latencies,
+)
+from auto_graders.choices.grading_job_status_choices import (
+    GradingJobStatusEnum,
+)
+from auto_graders.models import Task, TaskTests, User
+
+BENCHMARK_NAME = 'loadtest'
+LOGIN_PATH = '/api/v1/login/'
+SOLVE_PATH = '/api/v1/tasks/{task_id}/solve/'
+# The reference solution of the task, or one of these.
+CORRECT_SOLUTION = 'correct'
+SOLUTIONS: dict[str, str | None] = {
+    CORRECT_SOLUTION: None,
+    'failing': 'pass\n',
+    'compile_error': 'def solve(:\n    pass\n',
+    'infinite_loop': 'while True:\n    pass\n',
+}
+DEFAULT_MIX = 'correct=70,failing=15,compile_error=10,infinite_loop=5'
+JOB_POLL_INTERVAL = 0.2
+
+
+def solution_mix(value: str) -> dict[str, float]:
+    """Parse `correct=70,failing=30` into the weights of solution kinds."""
+    mix: dict[str, float] = {}
+    for part in value.split(','):
+        kind, _, weight = part.partition('=')
+        kind = kind.strip()
+        if kind not in SOLUTIONS:
+            raise argparse.ArgumentTypeError(
+                f'Unknown solution kind "{kind}", use '
+                f'{", ".join(SOLUTIONS)}.'
+            )
+        try:
+            mix[kind] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f'Bad weight in "{part}".')
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError('The mix needs a positive weight.')
+    return mix
+
+
+def parse_body(body: bytes) -> dict:
+    try:
+        data = json.loads(body or b'{}')
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+class InProcessApiClient:
+    """Sends the requests of one student to this process' API."""
+
+    def __init__(self):
+        self.client = Client(raise_request_exception=False)
+
+    def request(self, method: str, path: str, data: dict | None = None):
+        if method == 'POST':
+            response = self.client.post(
+                path, data, content_type='application/json'
+            )
+        else:
+            response = self.client.get(path)
+        return response.status_code, parse_body(response.content)
+
+
+class HttpApiClient:
+    """Sends the requests of one student to a running deployment."""
+
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url: str = base_url.rstrip('/')
+        self.timeout: float = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(CookieJar())
+        )
+
+    def request(self, method: str, path: str, data: dict | None = None):
+        request = urllib.request.Request(
+            f'{self.base_url}{path}',
+            data=None if data is None else json.dumps(data).encode(),
+            headers={'Content-Type': 'application/json'},
+            method=method,
+        )
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                status_code, body = response.status, response.read()
+        except urllib.error.HTTPError as err:
+            status_code, body = err.code, err.read()
+        return status_code, parse_body(body)
+
+
+class Student:
+    def __init__(self, client, email: str, rng: random.Random):
+        self.client = client
+        self.email: str = email
+        self.rng: random.Random = rng
+
+
+class Command(BaseCommand):
+    help = (
+        'Simulate a class of students: create synthetic students and tasks, '
+        'log every student in through the login endpoint and send solutions '
+        'to the solve endpoint at every concurrency level, with a mix of '
+        'correct, failing, non-compiling and endless solutions. Reports '
+        'throughput, latency percentiles, error rates and the level at '
+        'which latency breaks down. The synthetic data is deleted '
+        'afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            help=(
+                'Base URL of a running deployment that uses the database of '
+                'this project, e.g. http://localhost:8000. By default the '
+                'requests go to the API inside this process.'
+            ),
+        )
+        add_sandbox_arguments(parser)
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            nargs='+',
+            default=[1, 2, 4, 8, 16],
+            help='Numbers of students sending solutions at once.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=5,
+            help='Number of solutions every student sends at each level.',
+        )
+        parser.add_argument(
+            '--suites',
+            nargs='+',
+            help=(
+                'Suites the synthetic tasks are graded with. All suites with '
+                'a reference solution by default.'
+            ),
+        )
+        parser.add_argument(
+            '--mix',
+            type=solution_mix,
+            default=DEFAULT_MIX,
+            help=f'Weights of the solution kinds, "{DEFAULT_MIX}" by default.',
+        )
+        parser.add_argument(
+            '--breakdown-factor',
+            type=float,
+            default=3.0,
+            help=(
+                'Latency breaks down at the first level whose median is that '
+                'many times the median of the lowest level.'
+            ),
+        )
+        parser.add_argument(
+            '--error-threshold',
+            type=float,
+            default=0.05,
+            help='Share of failed requests that also counts as a breakdown.',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=120.0,
+            help='Seconds to wait for the result of a single solution.',
+        )
+        parser.add_argument(
+            '--seed', type=int, help='Seed of the solution mix.'
+        )
+        parser.add_argument(
+            '--keep-data',
+            action='store_true',
+            help='Keep the synthetic students and tasks.',
+        )
+        parser.add_argument(
+            '--save', help='Store the results as JSON in this file.'
+        )
+        parser.add_argument(
+            '--compare',
+            help='Compare with the results stored by an earlier --save.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            suites = get_benchmark_suites(options['suites'])
+            baseline = (
+                load_results(options['compare'], BENCHMARK_NAME)
+                if options['compare']
+                else None
+            )
+        except ValueError as err:
+            raise CommandError(str(err))
+        if min(options['concurrency']) < 1 or options['requests'] < 1:
+            raise CommandError('Concurrency and requests must be positive.')
+
+        run_id = uuid.uuid4().hex[:8]
+        password = uuid.uuid4().hex
+        tasks = self.create_tasks(run_id, suites)
+        emails = self.create_students(
+            run_id, password, max(options['concurrency'])
+        )
+        overrides = {}
+        if not options['url']:
+            overrides = {
+                **get_sandbox_settings(options),
+                'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver'],
+            }
+        try:
+            with override_settings(**overrides):
+                levels = self.run_levels(options, tasks, emails, password)
+        finally:
+            if not options['keep_data']:
+                Task.objects.filter(
+                    title__startswith=f'loadtest {run_id}:'
+                ).delete()
+                User.objects.filter(group=f'loadtest-{run_id}').delete()
+
+        self.report_breakdown(levels, options)
+        if baseline is not None:
+            for line in compare_results(levels, baseline):
+                self.stdout.write(line)
+        if options['save']:
+            configuration = {
+                **get_sandbox_configuration(options),
+                'url': options['url'] or '',
+                'requests': options['requests'],
+                'suites': len(suites),
+                'mix': options['mix'],
+            }
+            save_results(
+                options['save'], BENCHMARK_NAME, configuration, levels
+            )
+            self.stdout.write(f'Results saved to {options["save"]}.')
+
+    def create_tasks(self, run_id: str, suites: dict) -> list[tuple]:
+        """The synthetic tasks with the reference solutions of their suites."""
+        tasks: list[tuple] = []
+        for suite, test_file_path in suites.items():
+            task = Task.objects.create(
+                title=f'loadtest {run_id}: {suite}',
+                description=f'Synthetic task graded with {suite}.',
+            )
+            TaskTests.objects.create(task=task, file_path=str(test_file_path))
+            tasks.append((task.id, read_reference_solution(suite)))
+        return tasks
+
+    def create_students(self, run_id: str, password: str, count: int):
+        # One hash for all of them: hashing is slow on purpose.
+        password_hash = make_password(password)
+        students = User.objects.bulk_create(
+            User(
+                email=f'loadtest-{run_id}-{number}@example.com',
+                first_name='Load',
+                last_name=f'Student {number}',
+                group=f'loadtest-{run_id}',
+                password=password_hash,
+            )
+            for number in range(1, count + 1)
+        )
+        return [student.email for student in students]
+
+    def new_client(self, options: dict):
+        if options['url']:
+            return HttpApiClient(options['url'], options['timeout'])
+        return InProcessApiClient()
+
+    def log_in(self, options: dict, emails: list[str], password: str):
+        rng = random.Random(options['seed'])
+        students: list[Student] = []
+        for email in emails:
+            client = self.new_client(options)
+            status_code, body = client.request(
+                'POST', LOGIN_PATH, {'email': email, 'password': password}
+            )
+            if status_code != 200:
+                raise CommandError(
+                    f'Logging in {email} failed with {status_code}: {body}'
+                )
+            students.append(
+                Student(client, email, random.Random(rng.random()))
+            )
+        return students
+
+    def run_levels(
+        self, options: dict, tasks: list, emails: list[str], password: str
+    ) -> list[dict]:
+        students = self.log_in(options, emails, password)
+        levels: list[dict] = []
+        for concurrency in options['concurrency']:
+            level = self.measure(students[:concurrency], tasks, options)
+            self.report(level)
+            levels.append(level)
+        return levels
+
+    def measure(self, students: list[Student], tasks: list, options) -> dict:
+        recorder = LatencyRecorder()
+        statuses: Counter = Counter()
+        lock = threading.Lock()
+        kinds = list(options['mix'])
+        weights = list(options['mix'].values())
+
+        def send_solutions(student: Student):
+            try:
+                for number in range(options['requests']):
+                    kind = student.rng.choices(kinds, weights)[0]
+                    task_id, reference_solution = student.rng.choice(tasks)
+                    status_code, seconds = self.solve(
+                        student,
+                        task_id,
+                        f'# {student.email} {number}\n'
+                        + (SOLUTIONS[kind] or reference_solution),
+                        options['timeout'],
+                    )
+                    recorder.add('request', seconds)
+                    recorder.add(kind, seconds)
+                    with lock:
+                        statuses[str(status_code)] += 1
+            finally:
+                connection.close()
+
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(students)) as executor:
+            list(executor.map(send_solutions, students))
+        seconds = time.perf_counter() - started_at
+        requests = sum(statuses.values())
+        failed = requests - statuses['200']
+        return {
+            'concurrency': len(students),
+            'submissions': requests,
+            'seconds': round(seconds, 3),
+            'throughput': round(requests / seconds, 3),
+            'error_rate': round(failed / requests, 4),
+            'statuses': dict(sorted(statuses.items())),
+            'latencies': recorder.summary(),
+        }
+
+    def solve(
+        self, student: Student, task_id: int, solution_code: str, timeout
+    ) -> tuple[int | str, float]:
+        """
+        Send a solution and wait for its result, also when it is graded
+        asynchronously. Returns the final status code, or `timeout` or
+        `connection_error`, and the seconds it took.
+        """
+        started_at = time.perf_counter()
+        deadline = time.monotonic() + timeout
+        status_url = ''
+        try:
+            status_code, body = student.client.request(
+                'POST',
+                SOLVE_PATH.format(task_id=task_id),
+                {'solution_code': solution_code},
+            )
+            while status_code == 202 or body.get('status') in (
+                GradingJobStatusEnum.QUEUED.value,
+                GradingJobStatusEnum.RUNNING.value,
+            ):
+                if time.monotonic() > deadline:
+                    status_code = 'timeout'
+                    break
+                time.sleep(JOB_POLL_INTERVAL)
+                status_url = body.get('status_url') or status_url
+                status_code, body = student.client.request(
+                    'GET', urlsplit(status_url).path
+                )
+        except OSError:
+            status_code = 'connection_error'
+        return status_code, time.perf_counter() - started_at
+
+    def report(self, level: dict):
+        latency = level['latencies'].get('request') or summarize_latencies([])
+        statuses = ', '.join(
+            f'{status_code} {count}'
+            for status_code, count in level['statuses'].items()
+        )
+        self.stdout.write(
+            f'{level["concurrency"]:>4} students: '
+            f'{level["submissions"]} solutions in {level["seconds"]:.2f} s, '
+            f'{level["throughput"]:.2f}/s, '
+            f'p50 {latency.get("p50", 0):.0f} ms, '
+            f'p90 {latency.get("p90", 0):.0f} ms, '
+            f'p99 {latency.get("p99", 0):.0f} ms, '
+            f'errors {level["error_rate"]:.1%} ({statuses})'
+        )
+
+    def report_breakdown(self, levels: list[dict], options: dict):
+        baseline_p50 = levels[0]['latencies']['request']['p50']
+        for level in levels:
+            p50 = level['latencies']['request']['p50']
+            if (
+                p50 > baseline_p50 * options['breakdown_factor']
+                or level['error_rate'] > options['error_threshold']
+            ):
+                self.stdout.write(
+                    f'Latency breaks down at {level["concurrency"]} '
+                    f'concurrent students (p50 {p50:.0f} ms, errors '
+                    f'{level["error_rate"]:.1%}).'
+                )
+                return
+        self.stdout.write(
+            f'No breakdown up to {levels[-1]["concurrency"]} concurrent '
+            f'students.'
+        )
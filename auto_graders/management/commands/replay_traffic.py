@@ -0,0 +1,311 @@
+import argparse
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from auto_graders.benchmarking import (
+    LatencyRecorder,
+    add_sandbox_arguments,
+    compare_results,
+    get_sandbox_configuration,
+    get_sandbox_settings,
+    load_results,
+    save_results,
+    summarize_latencies,
+)
+from auto_graders.grading import run_grading_pipeline
+from auto_graders.grading_trace import start_grading_trace
+from auto_graders.metrics import grading_outcome
+from auto_graders.models import Task
+from auto_graders.traffic_log import QUEUED_OUTCOME, read_traffic_log
+
+BENCHMARK_NAME = 'replay_traffic'
+# Changed records listed by name in the report.
+LISTED_CHANGES = 10
+
+
+def replay_speed(value: str) -> float | None:
+    """`--speed`: how many times faster than recorded, None for `max`."""
+    if value == 'max':
+        return None
+    if value == 'original':
+        return 1.0
+    try:
+        speed = float(value)
+    except ValueError:
+        speed = 0
+    if speed <= 0:
+        raise argparse.ArgumentTypeError(
+            f'{value!r} is neither max, original nor a positive factor.'
+        )
+    return speed
+
+
+def record_key(record: dict) -> str:
+    """Names a record in the stored results, the same in every replay."""
+    return f'{record["received_at"]:.6f}/{record["task_id"]}'
+
+
+def describe_record(key: str) -> str:
+    received_at, task_id = key.split('/')
+    moment = datetime.fromtimestamp(float(received_at), timezone.utc)
+    return f'task {task_id} at {moment.isoformat(timespec="seconds")}'
+
+
+def find_changes(
+    results: dict[str, dict], expected: dict[str, dict]
+) -> tuple[int, list[tuple[str, str, str]]]:
+    """
+    The number of records `expected` has an outcome for, and the records
+    whose outcome or score differs from it, as key, before and after.
+    Responses without a score (e.g. to a task already solved) are compared
+    by outcome only.
+    """
+    compared = 0
+    changes: list[tuple[str, str, str]] = []
+    for key, result in sorted(results.items()):
+        previous = expected.get(key)
+        if previous is None or previous['outcome'] == QUEUED_OUTCOME:
+            continue
+        compared += 1
+        if previous['outcome'] != result['outcome']:
+            changes.append((key, previous['outcome'], result['outcome']))
+        elif (
+            previous['score'] is not None
+            and previous['score'] != result['score']
+        ):
+            changes.append(
+                (
+                    key,
+                    f'score {previous["score"]}',
+                    f'score {result["score"]}',
+                )
+            )
+    return compared, changes
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay solve requests recorded with GRADING_TRAFFIC_LOG_DIR through '
+        'the grading pipeline (static checks, result cache and sandbox) '
+        'without saving submissions or grading runs. Reports throughput, '
+        'latencies and the records whose outcome differs from the recorded '
+        'one or, with --compare, from an earlier replay.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'logs',
+            nargs='+',
+            help='Traffic log files, or directories of them.',
+        )
+        # Recorded traffic is real student code: `local` runs it on this
+        # host without a sandbox.
+        add_sandbox_arguments(parser, default='docker')
+        parser.add_argument(
+            '--speed',
+            type=replay_speed,
+            default=None,
+            help=(
+                'max (the default): as fast as --concurrency allows; '
+                'original: with the recorded gaps between requests; a '
+                'number: that many times faster than recorded.'
+            ),
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=8,
+            help='Most solutions graded at once.',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Replay only the first LIMIT records.',
+        )
+        parser.add_argument(
+            '--use-cache',
+            action='store_true',
+            help=(
+                'Answer repeated solutions from the grading result cache, '
+                'as in production. Off by default, so every record is run.'
+            ),
+        )
+        parser.add_argument(
+            '--save', help='Store the results as JSON in this file.'
+        )
+        parser.add_argument(
+            '--compare',
+            help='Compare with the results stored by an earlier --save.',
+        )
+
+    def handle(self, *args, **options):
+        missing = [
+            path for path in options['logs'] if not os.path.exists(path)
+        ]
+        if missing:
+            raise CommandError(f'No such file: {", ".join(missing)}.')
+        try:
+            baseline = (
+                load_results(options['compare'], BENCHMARK_NAME)
+                if options['compare']
+                else None
+            )
+        except ValueError as err:
+            raise CommandError(str(err))
+
+        records = read_traffic_log(options['logs'])[: options['limit']]
+        tasks = Task.objects.in_bulk({record['task_id'] for record in records})
+        skipped = sum(record['task_id'] not in tasks for record in records)
+        records = [record for record in records if record['task_id'] in tasks]
+        if skipped:
+            self.stderr.write(
+                f'{skipped} records of tasks that no longer exist skipped.'
+            )
+        if not records:
+            raise CommandError('No records to replay.')
+
+        overrides = get_sandbox_settings(options)
+        if not options['use_cache']:
+            overrides['GRADING_RESULT_CACHE_ENABLED'] = False
+        with override_settings(**overrides):
+            level = self.replay(
+                records, tasks, options['speed'], options['concurrency']
+            )
+        self.report(level)
+
+        compared, changes = find_changes(
+            level['results'],
+            {
+                record_key(record): {
+                    'outcome': record['outcome'],
+                    'score': record['score'],
+                }
+                for record in records
+            },
+        )
+        self.report_changes('recorded', compared, changes)
+        if baseline is not None:
+            for line in compare_results([level], baseline):
+                self.stdout.write(line)
+            compared, changes = find_changes(
+                level['results'], baseline['levels'][0]['results']
+            )
+            self.report_changes('earlier replay', compared, changes)
+        if options['save']:
+            configuration = {
+                **get_sandbox_configuration(options),
+                'records': len(records),
+                'speed': options['speed'] or 'max',
+                'use_cache': options['use_cache'],
+            }
+            save_results(
+                options['save'], BENCHMARK_NAME, configuration, [level]
+            )
+            self.stdout.write(f'Results saved to {options["save"]}.')
+
+    def replay(
+        self,
+        records: list[dict],
+        tasks: dict[int, Task],
+        speed: float | None,
+        concurrency: int,
+    ) -> dict:
+        recorder = LatencyRecorder()
+        results: dict[str, dict] = {}
+
+        def grade(record: dict, scheduled_at: float):
+            if speed is not None:
+                recorder.add('lag', time.perf_counter() - scheduled_at)
+            try:
+                with start_grading_trace() as trace:
+                    test_result = run_grading_pipeline(
+                        tasks[record['task_id']],
+                        record['solution_code'],
+                        trace,
+                    )
+                    total_duration = trace.total_duration
+            finally:
+                connection.close()
+            for stage, seconds in trace.stages.items():
+                recorder.add(stage, seconds)
+            recorder.add('total', total_duration)
+            outcome = grading_outcome(test_result)
+            recorder.add_outcome(outcome)
+            results[record_key(record)] = {
+                'outcome': outcome,
+                'score': test_result.get('score'),
+            }
+
+        first_received_at = records[0]['received_at']
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = []
+            for record in records:
+                scheduled_at = time.perf_counter()
+                if speed is not None:
+                    scheduled_at = started_at + (
+                        (record['received_at'] - first_received_at) / speed
+                    )
+                    time.sleep(max(scheduled_at - time.perf_counter(), 0))
+                futures.append(executor.submit(grade, record, scheduled_at))
+            for future in futures:
+                future.result()
+        seconds = time.perf_counter() - started_at
+        return {
+            'concurrency': concurrency,
+            'submissions': len(records),
+            'seconds': round(seconds, 3),
+            'throughput': round(len(records) / seconds, 3),
+            'outcomes': dict(recorder.outcomes),
+            'recorded_latency': summarize_latencies(
+                [record['duration'] for record in records]
+            ),
+            'latencies': recorder.summary(),
+            'results': results,
+        }
+
+    def report(self, level: dict):
+        outcomes = ', '.join(
+            f'{outcome} {count}'
+            for outcome, count in sorted(level['outcomes'].items())
+        )
+        self.stdout.write(
+            f'{level["submissions"]} records replayed in '
+            f'{level["seconds"]:.2f} s, {level["throughput"]:.2f}/s '
+            f'({outcomes})'
+        )
+        self.stdout.write(
+            f'  {"stage":<16} {"p50":>12} {"p99":>12} {"mean":>12}'
+        )
+        latencies = {
+            'recorded': level['recorded_latency'],
+            **level['latencies'],
+        }
+        for stage, latency in latencies.items():
+            self.stdout.write(
+                f'  {stage:<16} {latency["p50"]:>9.2f} ms '
+                f'{latency["p99"]:>9.2f} ms {latency["mean"]:>9.2f} ms'
+            )
+
+    def report_changes(
+        self, name: str, compared: int, changes: list[tuple[str, str, str]]
+    ):
+        if not compared:
+            return
+        self.stdout.write(
+            f'{compared - len(changes)} of {compared} results as in the '
+            f'{name} run'
+        )
+        for (before, after), count in sorted(
+            Counter(change[1:] for change in changes).items()
+        ):
+            self.stdout.write(f'  {before} -> {after}: {count}')
+        for key, before, after in changes[:LISTED_CHANGES]:
+            self.stdout.write(f'  {describe_record(key)}: {before} -> {after}')
@@ -0,0 +1,362 @@
+"""
+In-process metrics registry exported in the Prometheus text format.
+
+Recording takes a lock and updates a dict, so it is cheap enough to stay
+on. With METRICS_MULTIPROCESS_DIR every process (e.g. each gunicorn
+worker) also writes a snapshot of its values to a file of its own in that
+directory every METRICS_FLUSH_INTERVAL seconds, and `/metrics` adds up the
+snapshots of all of them. Counters and histograms of exited processes are
+kept, so totals never go down; gauges only count live processes. Point
+the setting at a fresh directory on every deploy.
+"""
+
+import atexit
+import bisect
+import copy
+import glob
+import json
+import logging
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from rest_framework import status
+
+logger = logging.getLogger(__name__)
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+HISTOGRAM = 'histogram'
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    20.0,
+    30.0,
+    60.0,
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class MetricSpec:
+    def __init__(
+        self,
+        kind: str,
+        help_text: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = (),
+    ):
+        self.kind: str = kind
+        self.help_text: str = help_text
+        self.label_names: tuple[str, ...] = label_names
+        self.buckets: tuple[float, ...] = buckets
+
+
+METRICS: dict[str, MetricSpec] = {
+    'http_requests_total': MetricSpec(
+        COUNTER,
+        'API requests by view, method and response status.',
+        ('view', 'method', 'status'),
+    ),
+    'http_request_duration_seconds': MetricSpec(
+        HISTOGRAM,
+        'API request latency by view and method.',
+        ('view', 'method'),
+        LATENCY_BUCKETS,
+    ),
+    'http_request_db_queries': MetricSpec(
+        HISTOGRAM,
+        'Database queries per API request by view.',
+        ('view',),
+        QUERY_COUNT_BUCKETS,
+    ),
+    'grading_results_total': MetricSpec(
+        COUNTER,
+        'Graded solutions by outcome: pass, fail, compilation_error, '
+        'static_check_failed, 503 or 504.',
+        ('outcome',),
+    ),
+    'grading_stage_duration_seconds': MetricSpec(
+        HISTOGRAM,
+        'Time spent in each stage of grading a solution.',
+        ('stage',),
+        LATENCY_BUCKETS,
+    ),
+    'grading_sandbox_waiting': MetricSpec(
+        GAUGE, 'Grading runs waiting for a free sandbox container.'
+    ),
+    'grading_sandbox_runs_in_flight': MetricSpec(
+        GAUGE, 'Grading runs holding a sandbox container.'
+    ),
+}
+
+
+class MetricsRegistry:
+    def __init__(self, specs: dict[str, MetricSpec]):
+        self.specs: dict[str, MetricSpec] = specs
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        # Values by metric name and label values. A histogram value is its
+        # per-bucket counts, then the +Inf count and the sum.
+        self._values: dict[str, dict[tuple, float | list[float]]] = {
+            name: {} for name in self.specs
+        }
+        self._pid: int = os.getpid()
+        self._dirty: bool = False
+        self._writer: threading.Thread | None = None
+
+    def _check_process(self):
+        """Start over in a process forked from the one that recorded."""
+        if self._pid != os.getpid():
+            self._reset()
+        if self._writer is None and settings.METRICS_MULTIPROCESS_DIR:
+            self._start_writer()
+
+    def increment(self, name: str, *labels: str, amount: float = 1):
+        with self._lock:
+            self._check_process()
+            values = self._values[name]
+            values[labels] = values.get(labels, 0) + amount
+            self._dirty = True
+
+    def add(self, name: str, amount: float, *labels: str):
+        """Move a gauge by `amount`."""
+        self.increment(name, *labels, amount=amount)
+
+    def observe(self, name: str, value: float, *labels: str):
+        buckets = self.specs[name].buckets
+        with self._lock:
+            self._check_process()
+            values = self._values[name]
+            counts = values.get(labels)
+            if counts is None:
+                counts = values[labels] = [0] * (len(buckets) + 2)
+            counts[bisect.bisect_left(buckets, value)] += 1
+            counts[-1] += value
+            self._dirty = True
+
+    def snapshot(self) -> dict[str, list]:
+        with self._lock:
+            self._check_process()
+            return {
+                name: [
+                    [list(labels), copy.copy(value)]
+                    for labels, value in values.items()
+                ]
+                for name, values in self._values.items()
+            }
+
+    def _start_writer(self):
+        directory = settings.METRICS_MULTIPROCESS_DIR
+        os.makedirs(directory, exist_ok=True)
+        # The pid for the liveness check of gauges, and a random part so a
+        # later process with the same pid does not overwrite the file.
+        path = os.path.join(
+            directory, f'{self._pid}-{uuid.uuid4().hex[:8]}.json'
+        )
+        stopped = threading.Event()
+        self._writer = threading.Thread(
+            target=self._write_snapshots,
+            args=(path, stopped),
+            name='metrics-writer',
+            daemon=True,
+        )
+        self._writer.start()
+        atexit.register(self._write_snapshot, path)
+
+    def _write_snapshots(self, path: str, stopped: threading.Event):
+        pid = self._pid
+        while not stopped.wait(settings.METRICS_FLUSH_INTERVAL):
+            if pid != os.getpid():
+                return
+            if self._dirty:
+                self._write_snapshot(path)
+
+    def _write_snapshot(self, path: str):
+        if self._pid != os.getpid():
+            return
+        self._dirty = False
+        snapshot = {'pid': self._pid, 'metrics': self.snapshot()}
+        temporary_path = f'{path}.tmp'
+        try:
+            with open(temporary_path, 'w', encoding='utf-8') as snapshot_file:
+                json.dump(snapshot, snapshot_file)
+            os.replace(temporary_path, path)
+        except OSError:
+            logger.exception('Writing the metrics snapshot failed.')
+
+
+def is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def read_snapshots(directory: str, own_pid: int) -> list[tuple[int, dict]]:
+    """The snapshots of the other processes writing to `directory`."""
+    snapshots: list[tuple[int, dict]] = []
+    for path in glob.glob(os.path.join(directory, '*.json')):
+        try:
+            with open(path, encoding='utf-8') as snapshot_file:
+                snapshot = json.load(snapshot_file)
+        except (OSError, ValueError):
+            continue
+        if snapshot.get('pid') != own_pid:
+            snapshots.append((snapshot.get('pid'), snapshot['metrics']))
+    return snapshots
+
+
+def merge_snapshots(
+    specs: dict[str, MetricSpec], snapshots: list[tuple[int, dict]]
+) -> dict[str, dict[tuple, float | list[float]]]:
+    merged: dict[str, dict[tuple, float | list[float]]] = {
+        name: {} for name in specs
+    }
+    for pid, metrics in snapshots:
+        for name, samples in metrics.items():
+            spec = specs.get(name)
+            if spec is None:
+                continue
+            if spec.kind == GAUGE and not is_process_alive(pid):
+                continue
+            values = merged[name]
+            for labels, value in samples:
+                labels = tuple(labels)
+                if spec.kind == HISTOGRAM:
+                    counts = values.setdefault(labels, [0] * len(value))
+                    for index, count in enumerate(value):
+                        counts[index] += count
+                else:
+                    values[labels] = values.get(labels, 0) + value
+    return merged
+
+
+def format_labels(label_names: tuple, labels: tuple, extra: str = '') -> str:
+    pairs = [
+        '{}="{}"'.format(
+            name,
+            str(value)
+            .replace('\\', '\\\\')
+            .replace('"', '\\"')
+            .replace('\n', '\\n'),
+        )
+        for name, value in zip(label_names, labels)
+    ]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def format_number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_histogram(name: str, spec: MetricSpec, labels, counts) -> list:
+    lines: list[str] = []
+    cumulative = 0
+    for bound, count in zip(spec.buckets + (float('inf'),), counts[:-1]):
+        cumulative += count
+        bucket_labels = format_labels(
+            spec.label_names, labels, f'le="{format_number(float(bound))}"'
+        )
+        lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+    sample_labels = format_labels(spec.label_names, labels)
+    lines.append(f'{name}_sum{sample_labels} {format_number(counts[-1])}')
+    lines.append(f'{name}_count{sample_labels} {cumulative}')
+    return lines
+
+
+def render(
+    specs: dict[str, MetricSpec],
+    values: dict[str, dict[tuple, float | list[float]]],
+) -> str:
+    lines: list[str] = []
+    for name, spec in specs.items():
+        lines.append(f'# HELP {name} {spec.help_text}')
+        lines.append(f'# TYPE {name} {spec.kind}')
+        for labels, value in sorted(values[name].items()):
+            if spec.kind == HISTOGRAM:
+                lines.extend(render_histogram(name, spec, labels, value))
+            else:
+                sample_labels = format_labels(spec.label_names, labels)
+                lines.append(f'{name}{sample_labels} {format_number(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry(METRICS)
+
+
+@contextmanager
+def track_in_progress(name: str):
+    """Hold a gauge one higher while the block runs."""
+    registry.add(name, 1)
+    try:
+        yield
+    finally:
+        registry.add(name, -1)
+
+
+def observe_grading_stage(stage: str, seconds: float):
+    registry.observe('grading_stage_duration_seconds', seconds, stage)
+
+
+def grading_outcome(test_result: dict) -> str:
+    status_code = test_result.get('status_code')
+    if status_code in (
+        status.HTTP_503_SERVICE_UNAVAILABLE,
+        status.HTTP_504_GATEWAY_TIMEOUT,
+    ):
+        return str(status_code)
+    if test_result.get('success'):
+        return 'pass'
+    errors = test_result.get('errors')
+    if isinstance(errors, dict) and errors.get('general_info') in (
+        'compilation error',
+        'static check failed',
+    ):
+        return errors['general_info'].replace(' ', '_')
+    return 'fail'
+
+
+def count_grading_outcome(test_result: dict):
+    registry.increment('grading_results_total', grading_outcome(test_result))
+
+
+def render_metrics(extra_gauges: dict[str, tuple[str, float]] = None) -> str:
+    """
+    All metrics of this process, and of the other processes writing to
+    METRICS_MULTIPROCESS_DIR, in the Prometheus text format.
+    `extra_gauges` (name -> help text and value) are computed by the caller
+    at scrape time.
+    """
+    snapshots = [(os.getpid(), registry.snapshot())]
+    if settings.METRICS_MULTIPROCESS_DIR:
+        snapshots += read_snapshots(
+            settings.METRICS_MULTIPROCESS_DIR, os.getpid()
+        )
+    text = render(METRICS, merge_snapshots(METRICS, snapshots))
+    for name, (help_text, value) in (extra_gauges or {}).items():
+        text += (
+            f'# HELP {name} {help_text}\n# TYPE {name} {GAUGE}\n'
+            f'{name} {format_number(value)}\n'
+        )
+    return text
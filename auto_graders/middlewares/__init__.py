@@ -1,3 +1,6 @@
 from auto_graders.middlewares.automatic_jwt_token import (
     JWTAuthenticationMiddleware,
 )
+from auto_graders.middlewares.request_metrics import (
+    RequestMetricsMiddleware,
+)
@@ -0,0 +1,59 @@
+import time
+
+from django.db import connection
+from django.http import HttpRequest, HttpResponse
+
+from auto_graders.metrics import registry
+
+
+class QueryCounter:
+    """Database execute wrapper counting the queries of a request."""
+
+    def __init__(self):
+        self.count: int = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def view_name(request: HttpRequest) -> str:
+    """The class or function name of the view the request was routed to."""
+    resolver_match = getattr(request, 'resolver_match', None)
+    if resolver_match is None:
+        return 'unmatched'
+    view = resolver_match.func
+    view_class = getattr(view, 'view_class', None) or getattr(
+        view, 'cls', None
+    )
+    return (view_class or view).__name__
+
+
+class RequestMetricsMiddleware:
+    """
+    Records the latency, the response status and the number of database
+    queries of every request, by the view that handled it.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        query_counter = QueryCounter()
+        started_at = time.perf_counter()
+        with connection.execute_wrapper(query_counter):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started_at
+
+        view = view_name(request)
+        registry.increment(
+            'http_requests_total',
+            view,
+            request.method,
+            str(response.status_code),
+        )
+        registry.observe(
+            'http_request_duration_seconds', elapsed, view, request.method
+        )
+        registry.observe('http_request_db_queries', query_counter.count, view)
+        return response
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_graders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradingJob',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('solution_code', models.TextField()),
+                (
+                    'status',
+                    models.CharField(
+                        choices=[
+                            ('queued', 'QUEUED'),
+                            ('running', 'RUNNING'),
+                            ('done', 'DONE'),
+                        ],
+                        db_index=True,
+                        default='queued',
+                        max_length=10,
+                    ),
+                ),
+                ('response_data', models.JSONField(blank=True, null=True)),
+                (
+                    'response_status',
+                    models.PositiveSmallIntegerField(blank=True, null=True),
+                ),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                (
+                    'task',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='grading_jobs',
+                        to='auto_graders.task',
+                    ),
+                ),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='grading_jobs',
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Grading Job',
+                'verbose_name_plural': 'Grading Jobs',
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_graders', '0002_grading_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gradingjob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='gradingjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gradingjob',
+            name='worker_id',
+            field=models.CharField(blank=True, default='', max_length=150),
+        ),
+        migrations.AddIndex(
+            model_name='gradingjob',
+            index=models.Index(
+                fields=['status', 'created_at'], name='grading_job_queue_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='gradingjob',
+            index=models.Index(
+                fields=['status', 'heartbeat_at'], name='grading_job_lease_idx'
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:56
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_graders', '0003_grading_job_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='test_workers',
+            field=models.PositiveSmallIntegerField(
+                default=1,
+                validators=[
+                    django.core.validators.MinValueValidator(1),
+                    django.core.validators.MaxValueValidator(16),
+                ],
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_graders', '0004_task_test_workers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='test_isolation',
+            field=models.CharField(
+                choices=[
+                    ('shared', 'SHARED'),
+                    ('fork', 'FORK'),
+                    ('process', 'PROCESS'),
+                ],
+                default='shared',
+                max_length=10,
+            ),
+        ),
+    ]
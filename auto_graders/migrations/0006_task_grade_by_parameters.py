@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_graders', '0005_task_test_isolation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='grade_by_parameters',
+            field=models.BooleanField(default=False),
+        ),
+    ]
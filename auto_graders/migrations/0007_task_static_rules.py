@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:16
+
+import auto_graders.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_graders', '0006_task_grade_by_parameters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='static_rules',
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                validators=[auto_graders.models.validate_static_rules],
+            ),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:18
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_graders', '0007_task_static_rules'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='run_timeout',
+            field=models.FloatField(
+                blank=True,
+                null=True,
+                validators=[django.core.validators.MinValueValidator(0.5)],
+            ),
+        ),
+        migrations.CreateModel(
+            name='GradingRun',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('duration', models.FloatField()),
+                ('run_timeout', models.FloatField()),
+                ('success', models.BooleanField()),
+                ('timed_out', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                (
+                    'task',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='grading_runs',
+                        to='auto_graders.task',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Grading Run',
+                'verbose_name_plural': 'Grading Runs',
+                'ordering': ['created_at'],
+                'indexes': [
+                    models.Index(
+                        fields=['task', 'success', 'created_at'],
+                        name='grading_run_history_idx',
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:21
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_graders', '0008_grading_run'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='cpu_time_budget',
+            field=models.FloatField(
+                blank=True,
+                null=True,
+                validators=[django.core.validators.MinValueValidator(0.001)],
+            ),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='memory_budget',
+            field=models.PositiveIntegerField(
+                blank=True,
+                null=True,
+                validators=[django.core.validators.MinValueValidator(1)],
+            ),
+        ),
+    ]
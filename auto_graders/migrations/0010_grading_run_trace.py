@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_graders', '0009_task_test_budgets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gradingrun',
+            name='container_id',
+            field=models.CharField(blank=True, default='', max_length=150),
+        ),
+        migrations.AddField(
+            model_name='gradingrun',
+            name='cpu_time',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gradingrun',
+            name='exit_code',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gradingrun',
+            name='output_size',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gradingrun',
+            name='peak_memory',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gradingrun',
+            name='stages',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='gradingrun',
+            name='total_duration',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='gradingrun',
+            index=models.Index(
+                fields=['created_at', 'total_duration'],
+                name='grading_run_slow_idx',
+            ),
+        ),
+    ]
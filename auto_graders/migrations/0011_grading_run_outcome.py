@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auto_graders', '0010_grading_run_trace'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gradingrun',
+            name='outcome',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='gradingrun',
+            name='duration',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='gradingrun',
+            name='run_timeout',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
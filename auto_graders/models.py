@@ -1,11 +1,24 @@
 from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.auth.models import PermissionsMixin
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
 from auto_graders.choices.roles_choices import RoleEnum
+from auto_graders.choices.grading_job_status_choices import (
+    GradingJobStatusEnum,
+)
+from auto_graders.choices.test_isolation_choices import TestIsolationEnum
+from auto_graders.static_checks import rules_from_spec
 from auto_graders.utils import UserManager
 
 
+def validate_static_rules(value):
+    try:
+        rules_from_spec(value)
+    except ValueError as err:
+        raise ValidationError(str(err)) from err
+
+
 class UserProfile(models.Model):
     phone_number: int = models.CharField(max_length=32, null=True, blank=True)
     address: str = models.CharField(max_length=255, null=True, blank=True)
@@ -51,8 +64,44 @@ class User(AbstractBaseUser, PermissionsMixin):
 
 
 class Task(models.Model):
+    TEST_ISOLATION_CHOICES = TestIsolationEnum.choices()
+
     title = models.CharField(max_length=255)
     description = models.TextField()
+    # How many processes the sandbox runs the task's tests in; capped by
+    # SANDBOX_MAX_TEST_WORKERS.
+    test_workers = models.PositiveSmallIntegerField(
+        default=1, validators=[MinValueValidator(1), MaxValueValidator(16)]
+    )
+    # Whether the tests share the runner's interpreter, or every test gets
+    # a forked child or a fresh interpreter of its own.
+    test_isolation = models.CharField(
+        max_length=10,
+        choices=TEST_ISOLATION_CHOICES,
+        default=TestIsolationEnum.SHARED.value,
+    )
+    # Also check the solution against the task_parameters rows, each as
+    # stdin lines and the expected stdout.
+    grade_by_parameters = models.BooleanField(default=False)
+    # Structural rules, e.g. {"rule": "require", "kind": "node", "names":
+    # ["While"], "message": "..."}, checked on the API host before the
+    # sandbox runs the tests, see auto_graders.static_checks.
+    static_rules = models.JSONField(
+        default=list, blank=True, validators=[validate_static_rules]
+    )
+    # Seconds a sandbox run of the task may take. Empty lets the grader
+    # derive it from the durations of recent passing runs.
+    run_timeout = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(0.5)]
+    )
+    # Seconds of CPU time and MiB of memory every run of the solution in a
+    # test may use; a run over budget fails its test. Empty means no budget.
+    cpu_time_budget = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(0.001)]
+    )
+    memory_budget = models.PositiveIntegerField(
+        null=True, blank=True, validators=[MinValueValidator(1)]
+    )
 
     class Meta:
         verbose_name = "Task"
@@ -103,3 +152,98 @@ class Submission(models.Model):
 
     def __str__(self):
         return f"{self.user.email} - {self.task.title}"
+
+
+class GradingJob(models.Model):
+    STATUS_CHOICES = GradingJobStatusEnum.choices()
+
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name='grading_jobs'
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='grading_jobs'
+    )
+    solution_code = models.TextField()
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=GradingJobStatusEnum.QUEUED.value,
+        db_index=True,
+    )
+    response_data = models.JSONField(null=True, blank=True)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    worker_id = models.CharField(max_length=150, blank=True, default='')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Grading Job"
+        verbose_name_plural = "Grading Jobs"
+        ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['status', 'created_at'],
+                name='grading_job_queue_idx',
+            ),
+            models.Index(
+                fields=['status', 'heartbeat_at'],
+                name='grading_job_lease_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task.title} - {self.user.email} ({self.status})"
+
+
+class GradingRun(models.Model):
+    """
+    Trace of one grading of a task's solution: `duration` is the run in
+    the sandbox, `total_duration` the whole grading, and `stages` the
+    seconds spent in each of its stages. Gradings that ended without a
+    sandbox run (a static check or compilation failure, a cached result,
+    no free container) have no `duration`; `outcome` says how each ended.
+    """
+
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name='grading_runs'
+    )
+    duration = models.FloatField(null=True, blank=True)
+    run_timeout = models.FloatField(null=True, blank=True)
+    success = models.BooleanField()
+    # pass, fail, compilation_error, static_check_failed, 503 or 504, see
+    # auto_graders.metrics.grading_outcome.
+    outcome = models.CharField(max_length=32, blank=True, default='')
+    timed_out = models.BooleanField(default=False)
+    total_duration = models.FloatField(null=True, blank=True)
+    stages = models.JSONField(default=dict, blank=True)
+    container_id = models.CharField(max_length=150, blank=True, default='')
+    exit_code = models.SmallIntegerField(null=True, blank=True)
+    output_size = models.PositiveIntegerField(null=True, blank=True)
+    # CPU seconds and peak resident bytes of the runner and its test
+    # processes, measured inside the sandbox.
+    cpu_time = models.FloatField(null=True, blank=True)
+    peak_memory = models.PositiveBigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Grading Run"
+        verbose_name_plural = "Grading Runs"
+        ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['task', 'success', 'created_at'],
+                name='grading_run_history_idx',
+            ),
+            models.Index(
+                fields=['created_at', 'total_duration'],
+                name='grading_run_slow_idx',
+            ),
+        ]
+
+    def __str__(self):
+        if self.duration is None:
+            return f"{self.task.title} - {self.outcome}"
+        return f"{self.task.title} - {self.duration:.3f}s"
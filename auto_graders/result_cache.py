@@ -0,0 +1,220 @@
+import hashlib
+import os
+import re
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from auto_graders.runner.records import ISOLATION_SHARED
+from auto_graders.utils import load_tests_from_file
+
+GRADING_RESULT_CACHE_ALIAS = 'grading_results'
+# Bump when a change to the grading pipeline makes old results stale.
+GRADING_RESULT_CACHE_VERSION = 7
+TRAILING_BLANK_LINES_PATTERN = re.compile(r'(?:\n[ \t\f]*)+\Z')
+
+
+def normalize_solution_code(solution_code: str) -> str:
+    """
+    Drop differences that cannot change the outcome of a run: line endings
+    and blank lines after the code. Whitespace at the end of a line may be
+    part of a string, and blank lines before the code shift the line
+    numbers of tracebacks, so both are kept.
+    """
+    solution_code = solution_code.replace('\r\n', '\n').replace('\r', '\n')
+    return TRAILING_BLANK_LINES_PATTERN.sub('', solution_code)
+
+
+class TestFileHasher:
+    """
+    Content hashes of test files, recomputed only when a file's size or
+    modification time changes.
+    """
+
+    def __init__(self):
+        self._hashes: dict[str, tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+    def hash(self, test_file_path: str) -> str:
+        stat = os.stat(test_file_path)
+        with self._lock:
+            cached = self._hashes.get(test_file_path)
+        if cached is not None and cached[:2] == (
+            stat.st_mtime_ns,
+            stat.st_size,
+        ):
+            return cached[2]
+
+        content_hash = hashlib.sha256(
+            load_tests_from_file(test_file_path).encode()
+        ).hexdigest()
+        with self._lock:
+            self._hashes[test_file_path] = (
+                stat.st_mtime_ns,
+                stat.st_size,
+                content_hash,
+            )
+        return content_hash
+
+
+def depends_on_load(result: dict) -> bool:
+    """
+    Whether a run of the same solution could come out differently on a less
+    busy sandbox: the sandbox was unavailable, the run or a test ran out of
+    time, a test went over its CPU-time or memory budget, or the output was
+    cut short.
+    """
+    if (
+        'status_code' in result
+        or result.get('timed_out')
+        or result.get('output_truncated')
+    ):
+        return True
+    errors = result.get('errors')
+    if not isinstance(errors, dict):
+        return False
+    return bool(errors.get('over_budget_tests')) or any(
+        failed_test.get('timed_out') or failed_test.get('budget')
+        for failed_test in errors.get('failed_tests') or []
+    )
+
+
+class GradingResultCache:
+    """
+    Results of sandbox runs keyed by the normalized solution, the contents
+    of the test files, the task parameter cases and budgets it ran against
+    and the isolation and number of workers of its tests, which decide
+    what state the tests share. Editing a test file or a case, or changing
+    how the tests are run, makes the old entries unreachable.
+    Entries live in the `grading_results` Django cache, which evicts the
+    least recently used ones once MAX_ENTRIES is reached.
+
+    Only results that do not depend on the load of the sandbox are stored,
+    see `depends_on_load`.
+    """
+
+    def __init__(self, cache, hasher: TestFileHasher):
+        self.cache = cache
+        self.hasher: TestFileHasher = hasher
+        self.hits: int = 0
+        self.misses: int = 0
+        self.stores: int = 0
+        self._lock = threading.Lock()
+
+    def key(
+        self,
+        test_file_paths: list[str],
+        solution_code: str,
+        parameter_cases: list[tuple[str, str]] = (),
+        test_budgets: dict | None = None,
+        test_isolation: str = ISOLATION_SHARED,
+        test_workers: int = 1,
+    ) -> str:
+        digest = hashlib.sha256()
+        digest.update(f'v{GRADING_RESULT_CACHE_VERSION}\0'.encode())
+        for test_file_path in sorted(test_file_paths):
+            digest.update(os.path.basename(test_file_path).encode())
+            digest.update(b'\0')
+            digest.update(self.hasher.hash(test_file_path).encode())
+            digest.update(b'\0')
+        for input_params, output_params in parameter_cases:
+            digest.update(f'{input_params}\0{output_params}\0'.encode())
+        for name, value in sorted((test_budgets or {}).items()):
+            digest.update(f'{name}={value}\0'.encode())
+        digest.update(f'{test_isolation}\0{test_workers}\0'.encode())
+        digest.update(normalize_solution_code(solution_code).encode())
+        return f'grading-result:{digest.hexdigest()}'
+
+    def get(
+        self,
+        test_file_paths: list[str],
+        solution_code: str,
+        parameter_cases: list[tuple[str, str]] = (),
+        test_budgets: dict | None = None,
+        test_isolation: str = ISOLATION_SHARED,
+        test_workers: int = 1,
+    ) -> dict | None:
+        result = self.cache.get(
+            self.key(
+                test_file_paths,
+                solution_code,
+                parameter_cases,
+                test_budgets,
+                test_isolation,
+                test_workers,
+            )
+        )
+        if result is not None:
+            with self._lock:
+                self.hits += 1
+        return result
+
+    @property
+    def is_shared(self) -> bool:
+        """Whether other processes see the results this one stores."""
+        return not isinstance(self.cache, LocMemCache)
+
+    def record_miss(self):
+        """
+        Count a lookup that ended in a sandbox run. Misses are counted by
+        the caller, so a solution looked up again by the grading worker is
+        not counted twice.
+        """
+        with self._lock:
+            self.misses += 1
+
+    def set(
+        self,
+        test_file_paths: list[str],
+        solution_code: str,
+        result: dict,
+        parameter_cases: list[tuple[str, str]] = (),
+        test_budgets: dict | None = None,
+        test_isolation: str = ISOLATION_SHARED,
+        test_workers: int = 1,
+    ):
+        if depends_on_load(result):
+            return
+        self.cache.set(
+            self.key(
+                test_file_paths,
+                solution_code,
+                parameter_cases,
+                test_budgets,
+                test_isolation,
+                test_workers,
+            ),
+            result,
+        )
+        with self._lock:
+            self.stores += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'stores': self.stores,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+_result_cache: GradingResultCache | None = None
+_result_cache_lock = threading.Lock()
+
+
+def get_grading_result_cache() -> GradingResultCache | None:
+    if not settings.GRADING_RESULT_CACHE_ENABLED:
+        return None
+
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = GradingResultCache(
+                    caches[GRADING_RESULT_CACHE_ALIAS], TestFileHasher()
+                )
+    return _result_cache
@@ -0,0 +1,46 @@
+import math
+
+from django.conf import settings
+
+from auto_graders.models import GradingRun, Task
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = math.ceil(percent / 100 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+def adaptive_run_timeout(durations: list[float]) -> float:
+    timeout = (
+        percentile(durations, settings.GRADING_TIMEOUT_PERCENTILE)
+        * settings.GRADING_TIMEOUT_SAFETY_FACTOR
+    )
+    return min(
+        max(timeout, settings.GRADING_TIMEOUT_FLOOR),
+        settings.GRADING_TIMEOUT_CEILING,
+    )
+
+
+def get_task_run_timeout(task: Task) -> float:
+    """
+    Seconds a sandbox run of the task may take: the task's own
+    `run_timeout`, else learned from its recent passing sandbox runs once
+    there are enough of them, else SANDBOX_RUN_TIMEOUT.
+    """
+    if task.run_timeout:
+        return task.run_timeout
+    if not settings.GRADING_ADAPTIVE_TIMEOUT:
+        return settings.SANDBOX_RUN_TIMEOUT
+
+    durations: list[float] = list(
+        GradingRun.objects.filter(
+            task=task, success=True, duration__isnull=False
+        )
+        .order_by('-created_at')
+        .values_list('duration', flat=True)[: settings.GRADING_TIMEOUT_HISTORY]
+    )
+    if len(durations) < settings.GRADING_TIMEOUT_MIN_RUNS:
+        return settings.SANDBOX_RUN_TIMEOUT
+    return adaptive_run_timeout(durations)
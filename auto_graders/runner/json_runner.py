@@ -0,0 +1,725 @@
+"""
+unittest runner that reports every test as a JSON record instead of the
+human-readable TextTestRunner output, so the host reads the results without
+scraping text.
+
+    GRADING_RECORD_TOKEN=<token> GRADING_TEST_TIMEOUT=<seconds> \\
+        python3 -m auto_graders.runner.json_runner
+
+Records go to the process' original stdout. Everything the tests and the
+solution print is sent to stderr instead.
+
+A test running longer than GRADING_TEST_TIMEOUT seconds is interrupted and
+reported as timed out, and the run goes on with the next test.
+
+With GRADING_TEST_WORKERS greater than 1 the tests are handed out one at a
+time to that many forked worker processes. Their records are still written
+in discovery order, so the output does not depend on the scheduling.
+
+GRADING_TEST_ISOLATION decides how far the tests are kept apart: `shared`
+runs them all in the runner's interpreter, `fork` runs every test in a
+child forked from the runner after the tests are discovered and the
+solution is compiled, and `process` starts a fresh interpreter for every
+test. State a test leaves behind in the interpreter then cannot reach the
+next one, and a test that kills its process fails alone. Isolated tests
+also run in up to GRADING_TEST_WORKERS children at a time.
+
+With GRADING_PROCESS_GROUP_FILE the runner moves into a process group of its
+own and writes the group id to that file, so the host can kill the run and
+everything the solution started once it is over.
+"""
+
+import gc
+import linecache
+import multiprocessing
+import os
+import resource
+import select
+import signal
+import sys
+import time
+import traceback
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest.util import safe_repr
+
+from auto_graders.runner.records import (
+    ISOLATION_FORK,
+    ISOLATION_LEVELS,
+    ISOLATION_SHARED,
+    PROCESS_GROUP_FILE_ENV,
+    RECORD_TOKEN_ENV,
+    START_RECORD,
+    STATUS_ERROR,
+    STATUS_FAILED,
+    STATUS_OVER_BUDGET,
+    STATUS_PASSED,
+    STATUS_SKIPPED,
+    STATUS_TIMED_OUT,
+    SUMMARY_RECORD,
+    TEST_ID_ENV,
+    TEST_ISOLATION_ENV,
+    TEST_RECORD,
+    TEST_TIMEOUT_ENV,
+    TEST_WORKERS_ENV,
+    format_record,
+    parse_records,
+)
+
+TEST_FILE_PATTERN = '*_test.py'
+SOLUTION_FILE_NAME = 'solution.py'
+INPUT_VALUES_PREFIX = 'INPUT VALUES:'
+# Assertion messages embed the compared values; keep records small.
+MAX_MESSAGE_LENGTH = 2000
+# An isolated test still running this long after its own timeout ignored
+# the alarm and is killed.
+ISOLATED_TEST_KILL_GRACE = 2.0
+RUNNER_MODULE = 'auto_graders.runner.json_runner'
+PACKAGE_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+class TestTimeout(BaseException):
+    """
+    Raised inside a test that ran out of time. It is not an Exception, so a
+    broad `except Exception` in the solution cannot swallow it.
+    """
+
+
+def raise_test_timeout(signum, frame):
+    raise TestTimeout()
+
+
+def with_time_limit(test_method, timeout: float):
+    def timed_test_method(*args, **kwargs):
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            return test_method(*args, **kwargs)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    return timed_test_method
+
+
+def iterate_tests(suite):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from iterate_tests(test)
+        else:
+            yield test
+
+
+def limit_test_time(suite: unittest.TestSuite, timeout: float):
+    """Wrap every test method of the suite in a `timeout` seconds alarm."""
+    signal.signal(signal.SIGALRM, raise_test_timeout)
+    for test in iterate_tests(suite):
+        method_name = getattr(test, '_testMethodName', None)
+        test_method = getattr(test, method_name, None) if method_name else None
+        if test_method is not None:
+            setattr(test, method_name, with_time_limit(test_method, timeout))
+
+
+def parse_docstring(doc: str | None) -> tuple[str | None, str | None]:
+    """Split a test docstring into its description and INPUT VALUES line."""
+    if not doc:
+        return None, None
+    description_lines: list[str] = []
+    input_values: str | None = None
+    for line in doc.split('\n'):
+        line = line.strip()
+        if line.startswith(INPUT_VALUES_PREFIX):
+            input_values = line[len(INPUT_VALUES_PREFIX) :].strip()
+        elif line:
+            description_lines.append(line)
+    return ' '.join(description_lines) or None, input_values
+
+
+def find_solution_frame(exc_traceback) -> dict | None:
+    """The innermost traceback frame that belongs to the solution."""
+    solution_frame: dict | None = None
+    for frame, line_number in traceback.walk_tb(exc_traceback):
+        if os.path.basename(frame.f_code.co_filename) == SOLUTION_FILE_NAME:
+            solution_frame = {
+                'line': line_number,
+                'source': linecache.getline(
+                    frame.f_code.co_filename, line_number
+                ).strip(),
+            }
+    return solution_frame
+
+
+def describe_assertion(exc_value: BaseException) -> dict | None:
+    operands = getattr(exc_value, 'operands', None)
+    if operands is None:
+        return None
+    return {
+        'method': operands['method'],
+        **{
+            name: safe_repr(value, short=True)
+            for name, value in operands.items()
+            if name != 'method'
+        },
+    }
+
+
+class JsonLinesTestResult(unittest.TestResult):
+    def __init__(self, write_record):
+        super().__init__()
+        self.write_record = write_record
+        self.timed_out: int = 0
+        self._started_at: float = 0.0
+
+    def startTest(self, test):
+        super().startTest(test)
+        self._started_at = time.perf_counter()
+
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self.report(test, STATUS_PASSED)
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        if getattr(err[1], 'budget', None) is not None:
+            self.report(test, STATUS_OVER_BUDGET, err)
+        else:
+            self.report(test, STATUS_FAILED, err)
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        if issubclass(err[0], TestTimeout):
+            self.timed_out += 1
+            self.report(test, STATUS_TIMED_OUT)
+        else:
+            self.report(test, STATUS_ERROR, err)
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self.report(test, STATUS_SKIPPED)
+
+    def addExpectedFailure(self, test, err):
+        super().addExpectedFailure(test, err)
+        self.report(test, STATUS_PASSED)
+
+    def addUnexpectedSuccess(self, test):
+        super().addUnexpectedSuccess(test)
+        self.report(test, STATUS_FAILED)
+
+    def addSubTest(self, test, subtest, err):
+        super().addSubTest(test, subtest, err)
+        if err is not None:
+            status = (
+                STATUS_FAILED
+                if issubclass(err[0], test.failureException)
+                else STATUS_ERROR
+            )
+            self.report(subtest, status, err)
+
+    def report(self, test, status: str, err=None):
+        description, input_values = parse_docstring(
+            getattr(test, '_testMethodDoc', None)
+        )
+        record: dict = {
+            'type': TEST_RECORD,
+            'name': getattr(test, '_testMethodName', None) or test.id(),
+            'description': description,
+            'input_values': input_values,
+            'status': status,
+            'duration': round(time.perf_counter() - self._started_at, 6),
+        }
+        if err is not None:
+            exc_type, exc_value, exc_traceback = err
+            record.update(
+                error_type=exc_type.__name__,
+                message=str(exc_value)[:MAX_MESSAGE_LENGTH],
+                assertion=describe_assertion(exc_value),
+                solution_frame=find_solution_frame(exc_traceback),
+            )
+            budget = getattr(exc_value, 'budget', None)
+            if budget is not None:
+                record['budget'] = budget
+        self.write_record(record)
+
+
+OUTCOME_COUNTS = ('tests_run', 'failures', 'errors', 'timed_out', 'skipped')
+
+
+def count_outcomes(result: JsonLinesTestResult) -> dict:
+    return {
+        'tests_run': result.testsRun,
+        'failures': len(result.failures) + len(result.unexpectedSuccesses),
+        'errors': len(result.errors),
+        'timed_out': result.timed_out,
+        'skipped': len(result.skipped),
+    }
+
+
+def measure_usage() -> dict:
+    """
+    CPU seconds and peak resident bytes of the runner and of the test
+    processes it started and reaped.
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu_time = own.ru_utime + own.ru_stime
+    cpu_time += children.ru_utime + children.ru_stime
+    return {
+        'cpu_time': round(cpu_time, 6),
+        # ru_maxrss is in kilobytes on Linux.
+        'peak_memory': max(own.ru_maxrss, children.ru_maxrss) * 1024,
+    }
+
+
+class TestWorkerCrashed(Exception):
+    pass
+
+
+# The tests of a parallel run. Workers are forked, so they inherit the list
+# and only the index of a test has to be sent to them.
+_worker_tests: list[unittest.TestCase] = []
+
+
+def run_single_test(test: unittest.TestCase) -> tuple[list[dict], dict]:
+    records: list[dict] = []
+    result = JsonLinesTestResult(records.append)
+    # A suite of its own runs the class and module fixtures of the test.
+    unittest.TestSuite([test]).run(result)
+    return records, count_outcomes(result)
+
+
+def run_test_in_worker(index: int) -> tuple[list[dict], dict]:
+    return run_single_test(_worker_tests[index])
+
+
+def run_suite_in_parallel(
+    suite: unittest.TestSuite, workers: int, write_record
+) -> dict:
+    """
+    Run every test of the suite in a pool of `workers` forked processes and
+    write each test's records once the tests before it are written too.
+    Tests left over when a worker dies are reported as errors.
+    """
+    tests: list[unittest.TestCase] = list(iterate_tests(suite))
+    _worker_tests[:] = tests
+    crash_result = JsonLinesTestResult(write_record)
+    worker_counts: list[dict] = []
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('fork')
+    ) as executor:
+        futures = [
+            executor.submit(run_test_in_worker, index)
+            for index in range(len(tests))
+        ]
+        for test, future in zip(tests, futures):
+            try:
+                records, test_counts = future.result()
+            except BrokenProcessPool:
+                crash_result.startTest(test)
+                crash_result.addError(
+                    test,
+                    (
+                        TestWorkerCrashed,
+                        TestWorkerCrashed('The test worker exited.'),
+                        None,
+                    ),
+                )
+                continue
+            for record in records:
+                write_record(record)
+            worker_counts.append(test_counts)
+
+    counts: dict = count_outcomes(crash_result)
+    for test_counts in worker_counts:
+        for name, value in test_counts.items():
+            counts[name] += value
+    return counts
+
+
+def fork_test(test: unittest.TestCase, token: str) -> tuple[int, int]:
+    """
+    Run the test in a forked child that writes its records and a summary
+    to a pipe. Returns the child's pid and the read end of the pipe.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        exit_code = 2
+        try:
+            with os.fdopen(write_fd, 'w', encoding='utf-8') as record_stream:
+                records, counts = run_single_test(test)
+                for record in records:
+                    record_stream.write(format_record(token, record))
+                record_stream.write(
+                    format_record(token, {'type': SUMMARY_RECORD, **counts})
+                )
+            exit_code = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(exit_code)
+    os.close(write_fd)
+    return pid, read_fd
+
+
+def spawn_test_process(
+    test: unittest.TestCase, token: str, test_timeout: float | None
+) -> tuple[int, int]:
+    """
+    Run the test in a fresh interpreter started with this runner, which
+    writes its records to a pipe. Returns the child's pid and the read end
+    of the pipe.
+    """
+    environment = dict(os.environ)
+    environment.update(
+        {
+            RECORD_TOKEN_ENV: token,
+            TEST_ID_ENV: test.id(),
+            TEST_TIMEOUT_ENV: str(test_timeout or ''),
+            TEST_WORKERS_ENV: '1',
+            TEST_ISOLATION_ENV: ISOLATION_SHARED,
+            'PYTHONPATH': os.pathsep.join(
+                filter(None, [PACKAGE_ROOT, environment.get('PYTHONPATH')])
+            ),
+        }
+    )
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.close(read_fd)
+            os.dup2(write_fd, 1)
+            os.execve(
+                sys.executable,
+                [sys.executable, '-m', RUNNER_MODULE],
+                environment,
+            )
+        finally:
+            os._exit(127)
+    os.close(write_fd)
+    return pid, read_fd
+
+
+class IsolatedTest:
+    """A test running in a child process that reports over a pipe."""
+
+    def __init__(
+        self,
+        index: int,
+        test: unittest.TestCase,
+        pid: int,
+        record_fd: int,
+        deadline: float | None,
+    ):
+        self.index: int = index
+        self.test = test
+        self.pid: int = pid
+        self.record_fd: int = record_fd
+        self.deadline: float | None = deadline
+        self.output = bytearray()
+        self.killed: bool = False
+        # Reports the test when the child does not.
+        self.records: list[dict] = []
+        self.result = JsonLinesTestResult(self.records.append)
+        self.result.startTest(test)
+
+    def kill(self):
+        self.killed = True
+        try:
+            os.kill(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def finish(self, token: str) -> tuple[list[dict], dict]:
+        """Reap the child and return the test's records and counts."""
+        _, status = os.waitpid(self.pid, 0)
+        _, tests, summary = parse_records(
+            self.output.decode('utf-8', errors='replace'), token
+        )
+        if summary is not None:
+            return tests, {
+                name: summary.get(name, 0) for name in OUTCOME_COUNTS
+            }
+
+        if self.killed:
+            self.result.addError(self.test, (TestTimeout, TestTimeout(), None))
+        else:
+            exit_code = os.waitstatus_to_exitcode(status)
+            self.result.addError(
+                self.test,
+                (
+                    TestWorkerCrashed,
+                    TestWorkerCrashed(
+                        f'The test process exited with code {exit_code}.'
+                    ),
+                    None,
+                ),
+            )
+        return self.records, count_outcomes(self.result)
+
+
+def preload_solutions(tests: list[unittest.TestCase]):
+    """
+    Let the test classes compile the solution before the children are
+    forked, so every child starts from the same copy-on-write snapshot.
+    """
+    for test_class in {type(test) for test in tests}:
+        preload_solution = getattr(test_class, 'preload_solution', None)
+        if preload_solution is not None:
+            preload_solution()
+
+
+def start_isolated_test(
+    index: int,
+    test: unittest.TestCase,
+    isolation: str,
+    token: str,
+    test_timeout: float | None,
+) -> IsolatedTest:
+    if isolation == ISOLATION_FORK:
+        pid, record_fd = fork_test(test, token)
+    else:
+        pid, record_fd = spawn_test_process(test, token, test_timeout)
+    deadline = (
+        time.monotonic() + test_timeout + ISOLATED_TEST_KILL_GRACE
+        if test_timeout
+        else None
+    )
+    return IsolatedTest(index, test, pid, record_fd, deadline)
+
+
+def wait_for_isolated_tests(
+    running: dict[int, IsolatedTest],
+) -> list[IsolatedTest]:
+    """
+    Read the output of the running children until some of them close
+    their pipe or run out of time, and return those.
+    """
+    deadlines = [
+        child.deadline
+        for child in running.values()
+        if child.deadline is not None
+    ]
+    wait_seconds = (
+        max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+    )
+    ready, _, _ = select.select(list(running), [], [], wait_seconds)
+    finished: list[IsolatedTest] = []
+    for record_fd in ready:
+        chunk = os.read(record_fd, 65536)
+        if chunk:
+            running[record_fd].output += chunk
+        else:
+            finished.append(running[record_fd])
+    now = time.monotonic()
+    for child in running.values():
+        if child.deadline is not None and now >= child.deadline:
+            # Do not wait for the end of its output either: whatever the
+            # test started may still hold the pipe open.
+            child.kill()
+            if child not in finished:
+                finished.append(child)
+    return finished
+
+
+def run_suite_isolated(
+    suite: unittest.TestSuite,
+    isolation: str,
+    workers: int,
+    write_record,
+    token: str,
+    test_timeout: float | None = None,
+) -> dict:
+    """
+    Run every test of the suite in a child process of its own, up to
+    `workers` at a time, and write each test's records once the tests
+    before it are written too. A child that dies without reporting fails
+    its test, one that outlives its timeout is killed.
+    """
+    tests: list[unittest.TestCase] = list(iterate_tests(suite))
+    if isolation == ISOLATION_FORK:
+        preload_solutions(tests)
+        # Keep the collector from touching the inherited objects, which
+        # would copy their pages into every child.
+        gc.freeze()
+
+    outcomes: list[tuple[list[dict], dict] | None] = [None] * len(tests)
+    running: dict[int, IsolatedTest] = {}
+    counts: dict = dict.fromkeys(OUTCOME_COUNTS, 0)
+    next_index = written = 0
+    while written < len(tests):
+        while next_index < len(tests) and len(running) < workers:
+            child = start_isolated_test(
+                next_index, tests[next_index], isolation, token, test_timeout
+            )
+            running[child.record_fd] = child
+            next_index += 1
+
+        for child in wait_for_isolated_tests(running):
+            del running[child.record_fd]
+            os.close(child.record_fd)
+            outcomes[child.index] = child.finish(token)
+
+        while written < len(tests) and outcomes[written] is not None:
+            records, test_counts = outcomes[written]
+            for record in records:
+                write_record(record)
+            for name, value in test_counts.items():
+                counts[name] += value
+            outcomes[written] = None
+            written += 1
+    return counts
+
+
+def run_tests(
+    token: str,
+    record_stream,
+    test_timeout: float | None = None,
+    workers: int = 1,
+    start_dir: str = '.',
+    isolation: str = ISOLATION_SHARED,
+    test_id: str | None = None,
+) -> bool:
+    """
+    Discover and run the tests of `start_dir`, or only the one with
+    `test_id`, and write their records to `record_stream`.
+    """
+
+    def write_record(record: dict):
+        record_stream.write(format_record(token, record))
+        record_stream.flush()
+
+    suite = unittest.defaultTestLoader.discover(
+        start_dir, pattern=TEST_FILE_PATTERN
+    )
+    if test_id is not None:
+        suite = unittest.TestSuite(
+            test for test in iterate_tests(suite) if test.id() == test_id
+        )
+    if test_timeout:
+        limit_test_time(suite, test_timeout)
+    test_count = suite.countTestCases()
+    write_record({'type': START_RECORD, 'tests': test_count})
+
+    if isolation != ISOLATION_SHARED and test_count:
+        counts = run_suite_isolated(
+            suite, isolation, workers, write_record, token, test_timeout
+        )
+    elif workers > 1 and test_count > 1:
+        counts = run_suite_in_parallel(
+            suite, min(workers, test_count), write_record
+        )
+    else:
+        result = JsonLinesTestResult(write_record)
+        result.startTestRun()
+        try:
+            suite.run(result)
+        finally:
+            result.stopTestRun()
+        counts = count_outcomes(result)
+
+    successful = not (counts['failures'] or counts['errors'])
+    write_record(
+        {
+            'type': SUMMARY_RECORD,
+            **counts,
+            'successful': successful,
+            **measure_usage(),
+        }
+    )
+    return successful
+
+
+def start_process_group(process_group_file: str):
+    try:
+        os.setpgid(0, 0)
+    except OSError:
+        # Already the leader of its session, and so of its group.
+        pass
+    with open(process_group_file, 'w', encoding='utf-8') as group_file:
+        group_file.write(str(os.getpgid(0)))
+
+
+def kill_other_group_members():
+    """
+    Kill the processes the solution started and left running in the
+    runner's process group, which would keep the output pipes open. Only
+    for a runner that leads its own group.
+    """
+    group = os.getpgid(0)
+    if group != os.getpid():
+        return
+    try:
+        process_ids = [
+            entry for entry in os.listdir('/proc') if entry.isdigit()
+        ]
+    except FileNotFoundError:
+        return
+    for process_id in process_ids:
+        if int(process_id) == group:
+            continue
+        try:
+            with open(f'/proc/{process_id}/stat', encoding='utf-8') as stat:
+                # The process name in parentheses may contain spaces.
+                fields = stat.read().rsplit(')', 1)[-1].split()
+            if int(fields[2]) == group:
+                os.kill(int(process_id), signal.SIGKILL)
+        except (OSError, IndexError, ValueError):
+            continue
+
+
+def run_with_record_channel(
+    token: str,
+    test_timeout: float | None = None,
+    workers: int = 1,
+    isolation: str = ISOLATION_SHARED,
+    test_id: str | None = None,
+) -> int:
+    """
+    Keep the original stdout for the records and point file descriptor 1
+    and sys.stdout at stderr, then run the tests of the current directory.
+    """
+    record_stream = os.fdopen(os.dup(1), 'w', encoding='utf-8')
+    sys.stdout.flush()
+    os.dup2(2, 1)
+    try:
+        successful = run_tests(
+            token,
+            record_stream,
+            test_timeout,
+            workers,
+            isolation=isolation,
+            test_id=test_id,
+        )
+        return 0 if successful else 1
+    finally:
+        record_stream.close()
+
+
+def main():
+    token = os.environ.pop(RECORD_TOKEN_ENV, '')
+    if not token:
+        sys.exit(f'{RECORD_TOKEN_ENV} is not set.')
+    test_timeout = float(os.environ.get(TEST_TIMEOUT_ENV) or 0) or None
+    workers = int(os.environ.get(TEST_WORKERS_ENV) or 1)
+    isolation = os.environ.get(TEST_ISOLATION_ENV) or ISOLATION_SHARED
+    if isolation not in ISOLATION_LEVELS:
+        sys.exit(f'Unknown {TEST_ISOLATION_ENV} "{isolation}".')
+    test_id = os.environ.pop(TEST_ID_ENV, '') or None
+    process_group_file = os.environ.pop(PROCESS_GROUP_FILE_ENV, '')
+    if process_group_file:
+        start_process_group(process_group_file)
+    sys.path.insert(0, os.getcwd())
+    exit_code = run_with_record_channel(
+        token, test_timeout, workers, isolation, test_id
+    )
+    if process_group_file:
+        kill_other_group_members()
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
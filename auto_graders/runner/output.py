@@ -0,0 +1,108 @@
+"""
+Bounded capture of a grading run's output, shared by the host backends and
+the in-sandbox grading server.
+"""
+
+import os
+import selectors
+import time
+
+READ_CHUNK_SIZE = 65536
+
+TRUNCATION_MARKER = b'\n... [%d bytes truncated] ...\n'
+
+
+class BoundedOutputBuffer:
+    """
+    Keeps the first and the last `limit // 2` bytes written to it and
+    counts the rest, so memory stays bounded however much is written.
+    """
+
+    def __init__(self, limit: int):
+        self.head_limit: int = limit // 2
+        self.tail_limit: int = limit - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.size: int = 0
+
+    def write(self, data: bytes):
+        self.size += len(data)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data:
+            self.tail += data[-self.tail_limit :] if self.tail_limit else b''
+            overflow = len(self.tail) - self.tail_limit
+            if overflow > 0:
+                del self.tail[:overflow]
+
+    @property
+    def truncated(self) -> bool:
+        return self.size > len(self.head) + len(self.tail)
+
+    def getvalue(self) -> bytes:
+        if not self.truncated:
+            return bytes(self.head + self.tail)
+        skipped = self.size - len(self.head) - len(self.tail)
+        return bytes(self.head) + TRUNCATION_MARKER % skipped + self.tail
+
+
+class OutputCapture:
+    """
+    stdout and stderr of one run. Once more than `limit` bytes have been
+    written in total the capture is `exceeded` and the run should be
+    stopped; each stream keeps its head and tail within `limit // 2` bytes.
+    """
+
+    def __init__(self, limit: int):
+        self.limit: int = limit
+        self.stdout = BoundedOutputBuffer(limit // 2)
+        self.stderr = BoundedOutputBuffer(limit // 2)
+
+    @property
+    def size(self) -> int:
+        return self.stdout.size + self.stderr.size
+
+    @property
+    def exceeded(self) -> bool:
+        return self.size > self.limit
+
+    @property
+    def truncated(self) -> bool:
+        return self.exceeded or self.stdout.truncated or self.stderr.truncated
+
+
+def collect_output(
+    stdout_fd: int,
+    stderr_fd: int,
+    deadline: float | None,
+    capture: OutputCapture,
+) -> bool:
+    """
+    Read both pipes into `capture` until they are closed. Stops early when
+    the capture is exceeded; returns True when the deadline passed first.
+    """
+    buffers: dict[int, BoundedOutputBuffer] = {
+        stdout_fd: capture.stdout,
+        stderr_fd: capture.stderr,
+    }
+    with selectors.DefaultSelector() as selector:
+        for fd in buffers:
+            selector.register(fd, selectors.EVENT_READ)
+
+        remaining = None
+        while selector.get_map():
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return True
+            for key, _ in selector.select(remaining):
+                chunk = os.read(key.fd, READ_CHUNK_SIZE)
+                if chunk:
+                    buffers[key.fd].write(chunk)
+                else:
+                    selector.unregister(key.fd)
+            if capture.exceeded:
+                return False
+    return False
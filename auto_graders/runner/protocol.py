@@ -0,0 +1,50 @@
+import hashlib
+import hmac
+import json
+import socket
+import struct
+
+MESSAGE_HEADER = struct.Struct('>I')
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+# The daemon reads the secret shared with the API from this variable.
+SECRET_ENV = 'SANDBOX_GRADING_SERVER_SECRET'
+
+
+class ConnectionClosed(Exception):
+    pass
+
+
+def send_message(sock: socket.socket, message: dict):
+    data: bytes = json.dumps(message).encode('utf-8')
+    sock.sendall(MESSAGE_HEADER.pack(len(data)) + data)
+
+
+def receive_message(sock: socket.socket) -> dict:
+    (size,) = MESSAGE_HEADER.unpack(receive_exactly(sock, MESSAGE_HEADER.size))
+    if size > MAX_MESSAGE_SIZE:
+        raise ValueError(f'Message of {size} bytes is too large.')
+    return json.loads(receive_exactly(sock, size))
+
+
+def receive_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks: list[bytes] = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 65536))
+        if not chunk:
+            raise ConnectionClosed('The peer closed the connection.')
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def sign_message(message: dict, secret: str) -> str:
+    """The HMAC of a request, sent with it as its `token`."""
+    data: bytes = json.dumps(message, sort_keys=True).encode('utf-8')
+    return hmac.new(secret.encode('utf-8'), data, hashlib.sha256).hexdigest()
+
+
+def is_signed(message: dict, token, secret: str) -> bool:
+    return isinstance(token, str) and hmac.compare_digest(
+        token.encode('utf-8'), sign_message(message, secret).encode('utf-8')
+    )
@@ -0,0 +1,80 @@
+"""
+Line format of the structured test runner.
+
+Every record is a single line on the runner's record channel: the run's
+record token, a space and a JSON object. The token is a fresh random value
+per run, so output printed by the solution cannot pass for a record.
+"""
+
+import json
+
+RECORD_TOKEN_ENV = 'GRADING_RECORD_TOKEN'
+TEST_TIMEOUT_ENV = 'GRADING_TEST_TIMEOUT'
+TEST_WORKERS_ENV = 'GRADING_TEST_WORKERS'
+TEST_ISOLATION_ENV = 'GRADING_TEST_ISOLATION'
+TEST_ID_ENV = 'GRADING_TEST_ID'
+PROCESS_GROUP_FILE_ENV = 'GRADING_PROCESS_GROUP_FILE'
+# Per-run budgets of the solution: CPU seconds and bytes of memory.
+CPU_TIME_BUDGET_ENV = 'GRADING_CPU_TIME_BUDGET'
+MEMORY_BUDGET_ENV = 'GRADING_MEMORY_BUDGET'
+
+START_RECORD = 'start'
+TEST_RECORD = 'test'
+SUMMARY_RECORD = 'summary'
+
+STATUS_PASSED = 'passed'
+STATUS_FAILED = 'failed'
+STATUS_ERROR = 'error'
+STATUS_SKIPPED = 'skipped'
+STATUS_TIMED_OUT = 'timed_out'
+STATUS_OVER_BUDGET = 'over_budget'
+
+# All tests in the runner's interpreter, every test in a child forked from
+# it, or every test in a fresh interpreter.
+ISOLATION_SHARED = 'shared'
+ISOLATION_FORK = 'fork'
+ISOLATION_PROCESS = 'process'
+ISOLATION_LEVELS = (ISOLATION_SHARED, ISOLATION_FORK, ISOLATION_PROCESS)
+
+
+def budget_environment(test_budgets: dict | None) -> dict[str, str]:
+    """The runner's environment for `{'cpu_time': ..., 'memory': ...}`."""
+    test_budgets = test_budgets or {}
+    return {
+        CPU_TIME_BUDGET_ENV: str(test_budgets.get('cpu_time') or ''),
+        MEMORY_BUDGET_ENV: str(test_budgets.get('memory') or ''),
+    }
+
+
+def format_record(token: str, record: dict) -> str:
+    return f'{token} {json.dumps(record, ensure_ascii=False)}\n'
+
+
+def parse_records(
+    output: str, token: str
+) -> tuple[dict | None, list[dict], dict | None]:
+    """
+    Collect the start record, the test records and the summary record from
+    the runner output in a single pass. The summary is None when the run did
+    not finish, the start record when it did not even discover the tests.
+    """
+    prefix = f'{token} '
+    start: dict | None = None
+    tests: list[dict] = []
+    summary: dict | None = None
+    for line in output.splitlines():
+        if not line.startswith(prefix):
+            continue
+        try:
+            record = json.loads(line[len(prefix) :])
+        except ValueError:
+            continue
+        if not isinstance(record, dict):
+            continue
+        if record.get('type') == TEST_RECORD:
+            tests.append(record)
+        elif record.get('type') == START_RECORD:
+            start = record
+        elif record.get('type') == SUMMARY_RECORD:
+            summary = record
+    return start, tests, summary
@@ -0,0 +1,265 @@
+"""
+Long-lived grading daemon that runs inside the sandbox container.
+
+The test harness is imported once at start-up; every submission is then
+graded in a freshly forked child inside its own workspace, so runs stay
+isolated without paying for interpreter start-up and imports each time.
+
+    SANDBOX_GRADING_SERVER_SECRET=... python3 -m auto_graders.runner.server \
+        --port 8765 --workspace-root /sandbox
+
+Only requests signed with the secret shared with the API are served, since
+a `run` executes whatever files it is sent.
+"""
+
+import argparse
+import ast  # noqa: F401 (pre-imported for the test files)
+import importlib.util  # noqa: F401
+import io  # noqa: F401
+import ipaddress
+import os
+import shutil
+import signal
+import socket
+import socketserver
+import sys
+import time
+import traceback
+import unittest.mock  # noqa: F401
+import uuid
+
+import auto_graders.constants  # noqa: F401
+import auto_graders.informative_test_case  # noqa: F401
+from auto_graders.runner.json_runner import (
+    kill_other_group_members,
+    run_with_record_channel,
+)
+from auto_graders.runner.output import OutputCapture, collect_output
+from auto_graders.runner.protocol import (
+    SECRET_ENV,
+    ConnectionClosed,
+    is_signed,
+    receive_message,
+    send_message,
+)
+from auto_graders.runner.records import (
+    ISOLATION_LEVELS,
+    ISOLATION_SHARED,
+    budget_environment,
+)
+
+
+def run_in_child(
+    workspace: str,
+    record_token: str,
+    test_timeout: float | None,
+    test_workers: int,
+    test_isolation: str,
+    test_budgets: dict | None,
+) -> int:
+    exit_code = 2
+    try:
+        os.environ.update(budget_environment(test_budgets))
+        os.chdir(workspace)
+        sys.path.insert(0, workspace)
+        exit_code = run_with_record_channel(
+            record_token, test_timeout, test_workers, test_isolation
+        )
+        kill_other_group_members()
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    return exit_code
+
+
+def kill_process_group(process_group: int):
+    try:
+        os.killpg(process_group, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def grade_submission(
+    workspace: str,
+    timeout: float,
+    record_token: str,
+    output_limit: int,
+    test_timeout: float | None = None,
+    test_workers: int = 1,
+    test_isolation: str = ISOLATION_SHARED,
+    test_budgets: dict | None = None,
+) -> dict:
+    stdout_read, stdout_write = os.pipe()
+    stderr_read, stderr_write = os.pipe()
+
+    pid = os.fork()
+    if pid == 0:
+        os.setsid()
+        os.close(stdout_read)
+        os.close(stderr_read)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(stdout_write, 1)
+        os.dup2(stderr_write, 2)
+        # The solution must not get the daemon's listening socket or the
+        # API connection: it could take other submissions or answer for
+        # the daemon.
+        os.closerange(3, os.sysconf('SC_OPEN_MAX'))
+        os._exit(
+            run_in_child(
+                workspace,
+                record_token,
+                test_timeout,
+                test_workers,
+                test_isolation,
+                test_budgets,
+            )
+        )
+
+    os.close(stdout_write)
+    os.close(stderr_write)
+    capture = OutputCapture(output_limit)
+    try:
+        timed_out = collect_output(
+            stdout_read, stderr_read, time.monotonic() + timeout, capture
+        )
+    finally:
+        os.close(stdout_read)
+        os.close(stderr_read)
+
+    if timed_out or capture.exceeded:
+        kill_process_group(pid)
+    _, status = os.waitpid(pid, 0)
+    # Processes the solution left behind in the child's session.
+    kill_process_group(pid)
+
+    return {
+        'exit_code': os.waitstatus_to_exitcode(status),
+        'stdout': capture.stdout.getvalue().decode('utf-8', errors='replace'),
+        'stderr': capture.stderr.getvalue().decode('utf-8', errors='replace'),
+        'timed_out': timed_out,
+        'truncated': capture.truncated,
+        'output_size': capture.size,
+    }
+
+
+class GradingRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                request = receive_message(self.request)
+            except (ConnectionClosed, ConnectionError):
+                return
+            token = request.pop('token', None)
+            if not is_signed(request, token, self.server.secret):
+                send_message(
+                    self.request,
+                    {'error': 'The request is not signed with the secret.'},
+                )
+                return
+            try:
+                response = self.dispatch(request)
+            except Exception as err:
+                response = {'error': f'{type(err).__name__}: {err}'}
+            send_message(self.request, response)
+
+    def dispatch(self, request: dict) -> dict:
+        action = request.get('action')
+        if action == 'ping':
+            return {'ok': True}
+        if action == 'run':
+            return self.run(
+                request['files'],
+                float(request['timeout']),
+                request['record_token'],
+                int(request['output_limit']),
+                float(request.get('test_timeout') or 0) or None,
+                int(request.get('test_workers') or 1),
+                request.get('test_isolation') or ISOLATION_SHARED,
+                request.get('test_budgets'),
+            )
+        raise ValueError(f'Unknown action "{action}".')
+
+    def run(
+        self,
+        files: dict[str, str],
+        timeout: float,
+        record_token: str,
+        output_limit: int,
+        test_timeout: float | None,
+        test_workers: int,
+        test_isolation: str,
+        test_budgets: dict | None,
+    ) -> dict:
+        if test_isolation not in ISOLATION_LEVELS:
+            raise ValueError(f'Unknown test isolation "{test_isolation}".')
+        workspace = os.path.join(self.server.workspace_root, uuid.uuid4().hex)
+        os.makedirs(workspace)
+        try:
+            for file_name, content in files.items():
+                if os.path.basename(file_name) != file_name:
+                    raise ValueError(f'Invalid file name "{file_name}".')
+                with open(
+                    os.path.join(workspace, file_name), 'w', encoding='utf-8'
+                ) as workspace_file:
+                    workspace_file.write(content)
+            return grade_submission(
+                workspace,
+                timeout,
+                record_token,
+                output_limit,
+                test_timeout,
+                test_workers,
+                test_isolation,
+                test_budgets,
+            )
+        finally:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+
+class GradingServer(socketserver.ForkingTCPServer):
+    allow_reuse_address = True
+
+    def __init__(
+        self, address: tuple[str, int], workspace_root: str, secret: str
+    ):
+        super().__init__(address, GradingRequestHandler)
+        self.workspace_root: str = workspace_root
+        self.secret: str = secret
+
+
+def default_host() -> str:
+    """
+    The container's own address on its network, which the API reaches by
+    the container's name or through a published port, or the loopback
+    address when that address is not a private one.
+    """
+    try:
+        address = socket.gethostbyname(socket.gethostname())
+    except OSError:
+        return '127.0.0.1'
+    return address if ipaddress.ip_address(address).is_private else '127.0.0.1'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default=default_host())
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workspace-root', default='/sandbox')
+    args = parser.parse_args()
+    # Taken out of the environment, so the solutions do not inherit it.
+    secret = os.environ.pop(SECRET_ENV, '')
+    if not secret:
+        parser.error(f'{SECRET_ENV} is not set.')
+
+    os.makedirs(args.workspace_root, exist_ok=True)
+    with GradingServer(
+        (args.host, args.port), args.workspace_root, secret
+    ) as server:
+        server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+from auto_graders.sandbox.exceptions import (
+    SandboxUnavailable,
+    SandboxError,
+    SandboxTimeout,
+)
+from auto_graders.sandbox.containers import get_container_ids
+from auto_graders.sandbox.health import (
+    CircuitBreaker,
+    SandboxHealthMonitor,
+    get_sandbox_health_monitor,
+)
+from auto_graders.sandbox.locks import ContainerLocks
+from auto_graders.sandbox.supervisor import SandboxSupervisor
+from auto_graders.sandbox.pool import (
+    SandboxPool,
+    SandboxLease,
+    get_sandbox_pool,
+)
+from auto_graders.sandbox.backends import (
+    ExecResult,
+    ResourceUsage,
+    CliBackend,
+    EngineApiBackend,
+    FakeBackend,
+    get_sandbox_backend,
+)
+from auto_graders.sandbox.docker_api import DockerEngineClient
+from auto_graders.sandbox.workspace import (
+    build_workspace_archive,
+    upload_workspace,
+    remove_workspace,
+)
+from auto_graders.sandbox.grading_server import (
+    GradingServerClient,
+    get_grading_server_client,
+)
+from auto_graders.sandbox.execution import (
+    CONTAINER_APP_PATH,
+    execute_test_run,
+)
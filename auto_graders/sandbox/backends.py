@@ -0,0 +1,471 @@
+import glob
+import io
+import os
+import re
+import string
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from auto_graders.runner.output import OutputCapture, collect_output
+from auto_graders.runner.records import (
+    RECORD_TOKEN_ENV,
+    START_RECORD,
+    STATUS_PASSED,
+    SUMMARY_RECORD,
+    TEST_RECORD,
+    format_record,
+)
+from auto_graders.sandbox.docker_api import DockerEngineClient
+from auto_graders.sandbox.exceptions import SandboxError, SandboxTimeout
+
+EXTRACT_ARCHIVE_SCRIPT = 'mkdir -p "$1" && tar -x -C "$1"'
+# Seconds a restarted container gets to stop before it is killed. Nothing
+# in the sandbox needs a clean shutdown.
+RESTART_STOP_SECONDS = 1
+# The sandbox interpreter; the fake backend runs its commands with this
+# host's interpreter instead.
+PYTHON_COMMAND = 'python3'
+TEST_METHOD_PATTERN = re.compile(r'^\s+def (test\w*)\(self', re.MULTILINE)
+SIZE_UNITS: dict[str, int] = {
+    'B': 1,
+    'kB': 1000,
+    'KiB': 1024,
+    'MB': 1000**2,
+    'MiB': 1024**2,
+    'GB': 1000**3,
+    'GiB': 1024**3,
+    'TB': 1000**4,
+    'TiB': 1024**4,
+}
+
+
+class ExecResult:
+    def __init__(
+        self,
+        exit_code: int,
+        stdout: str,
+        stderr: str,
+        truncated: bool = False,
+        output_size: int | None = None,
+    ):
+        self.exit_code: int = exit_code
+        self.stdout: str = stdout
+        self.stderr: str = stderr
+        self.truncated: bool = truncated
+        # Bytes the run wrote, the truncated ones included.
+        self.output_size: int = (
+            output_size
+            if output_size is not None
+            else len(stdout.encode()) + len(stderr.encode())
+        )
+
+
+class ResourceUsage:
+    def __init__(self, cpu_percent: float, memory_bytes: int):
+        self.cpu_percent: float = cpu_percent
+        self.memory_bytes: int = memory_bytes
+
+
+def parse_size(size: str) -> int:
+    """Turn a size printed by `docker stats`, e.g. `12.5MiB`, into bytes."""
+    size = size.strip()
+    number_end = len(size.rstrip(string.ascii_letters))
+    return int(float(size[:number_end]) * SIZE_UNITS[size[number_end:]])
+
+
+def decode_output(output: bytes) -> str:
+    return output.decode('utf-8', errors='replace')
+
+
+def capture_to_result(exit_code: int, capture: OutputCapture) -> ExecResult:
+    return ExecResult(
+        exit_code,
+        decode_output(capture.stdout.getvalue()),
+        decode_output(capture.stderr.getvalue()),
+        truncated=capture.truncated,
+        output_size=capture.size,
+    )
+
+
+def run_process(
+    args: list[str],
+    name: str,
+    timeout: float | None = None,
+    output_limit: int | None = None,
+    cwd: str | None = None,
+    environment: dict[str, str] | None = None,
+) -> ExecResult:
+    """
+    Run a process to completion, reading its output as a stream. Raises
+    SandboxTimeout, with the output read so far, when it runs longer than
+    `timeout`.
+    """
+    capture = OutputCapture(output_limit or settings.SANDBOX_OUTPUT_LIMIT)
+    try:
+        process = subprocess.Popen(
+            args,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            env=environment,
+        )
+    except OSError as err:
+        raise SandboxError(f'Cannot run {args[0]}: {err}') from err
+
+    with process:
+        timed_out = collect_output(
+            process.stdout.fileno(),
+            process.stderr.fileno(),
+            None if timeout is None else time.monotonic() + timeout,
+            capture,
+        )
+        if timed_out or capture.exceeded:
+            process.kill()
+        exit_code = process.wait()
+
+    result = capture_to_result(exit_code, capture)
+    if timed_out:
+        raise SandboxTimeout(
+            f'{name} did not finish in {timeout} seconds.', result=result
+        )
+    return result
+
+
+class CliBackend:
+    """Drives the sandbox through `docker` CLI processes."""
+
+    def is_alive(self, container_id: str) -> bool:
+        try:
+            completed = subprocess.run(
+                ['docker', 'exec', container_id, 'true'],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=settings.SANDBOX_HEALTH_CHECK_TIMEOUT,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+        return completed.returncode == 0
+
+    def exec(
+        self,
+        container_id: str,
+        command: list[str],
+        workdir: str | None = None,
+        environment: dict[str, str] | None = None,
+        timeout: float | None = None,
+        output_limit: int | None = None,
+    ) -> ExecResult:
+        args: list[str] = ['docker', 'exec']
+        if workdir:
+            args += ['-w', workdir]
+        for name, value in (environment or {}).items():
+            args += ['-e', f'{name}={value}']
+        args += [container_id, *command]
+        return run_process(args, command[0], timeout, output_limit)
+
+    def resource_usage(self, container_id: str) -> ResourceUsage:
+        completed = self._run_docker(
+            [
+                'stats',
+                '--no-stream',
+                '--format',
+                '{{.CPUPerc}}\t{{.MemUsage}}',
+                container_id,
+            ]
+        )
+        try:
+            cpu_percent, memory_usage = completed.stdout.strip().split('\t')
+            return ResourceUsage(
+                float(cpu_percent.rstrip('%')),
+                parse_size(memory_usage.split('/')[0]),
+            )
+        except (KeyError, ValueError) as err:
+            raise SandboxError(
+                f'Unexpected docker stats output: {completed.stdout!r}'
+            ) from err
+
+    def restart(self, container_id: str):
+        self._run_docker(
+            ['restart', '-t', str(RESTART_STOP_SECONDS), container_id]
+        )
+
+    def _run_docker(self, args: list[str]) -> subprocess.CompletedProcess:
+        try:
+            completed = subprocess.run(
+                ['docker', *args], capture_output=True, text=True
+            )
+        except OSError as err:
+            raise SandboxError(f'Cannot run docker: {err}') from err
+        if completed.returncode != 0:
+            raise SandboxError(
+                f'docker {args[0]} failed: {completed.stderr.strip()}'
+            )
+        return completed
+
+    def upload_archive(self, container_id: str, path: str, archive: bytes):
+        try:
+            completed = subprocess.run(
+                [
+                    'docker',
+                    'exec',
+                    '-i',
+                    container_id,
+                    'sh',
+                    '-c',
+                    EXTRACT_ARCHIVE_SCRIPT,
+                    'sh',
+                    path,
+                ],
+                input=archive,
+                capture_output=True,
+            )
+        except OSError as err:
+            raise SandboxError(f'Cannot run docker: {err}') from err
+        if completed.returncode != 0:
+            raise SandboxError(
+                f'Upload to {container_id}:{path} failed: '
+                f'{decode_output(completed.stderr)}'
+            )
+
+
+class EngineApiBackend:
+    """Drives the sandbox through the Docker Engine API on a unix socket."""
+
+    def __init__(self, client: DockerEngineClient):
+        self.client: DockerEngineClient = client
+
+    def is_alive(self, container_id: str) -> bool:
+        return self.client.is_container_running(container_id)
+
+    def exec(
+        self,
+        container_id: str,
+        command: list[str],
+        workdir: str | None = None,
+        environment: dict[str, str] | None = None,
+        timeout: float | None = None,
+        output_limit: int | None = None,
+    ) -> ExecResult:
+        exec_id = self.client.exec_create(
+            container_id, command, workdir=workdir, environment=environment
+        )
+        capture = OutputCapture(output_limit or settings.SANDBOX_OUTPUT_LIMIT)
+        try:
+            self.client.exec_start(exec_id, capture, timeout=timeout)
+        except SandboxTimeout as err:
+            raise SandboxTimeout(
+                str(err), result=capture_to_result(-1, capture)
+            ) from err
+        exit_code = self.client.exec_inspect(exec_id).get('ExitCode')
+        return capture_to_result(
+            exit_code if exit_code is not None else -1, capture
+        )
+
+    def resource_usage(self, container_id: str) -> ResourceUsage:
+        stats = self.client.container_stats(container_id)
+        try:
+            cpu_stats = stats['cpu_stats']
+            precpu_stats = stats['precpu_stats']
+            cpu_delta = (
+                cpu_stats['cpu_usage']['total_usage']
+                - precpu_stats['cpu_usage']['total_usage']
+            )
+            system_delta = cpu_stats.get(
+                'system_cpu_usage', 0
+            ) - precpu_stats.get('system_cpu_usage', 0)
+            online_cpus = cpu_stats.get('online_cpus') or len(
+                cpu_stats['cpu_usage'].get('percpu_usage') or [None]
+            )
+            memory = stats['memory_stats']
+            # The same figure `docker stats` shows: usage without the page
+            # cache that can be dropped.
+            memory_bytes = memory.get('usage', 0) - memory.get(
+                'stats', {}
+            ).get('inactive_file', 0)
+        except (KeyError, TypeError) as err:
+            raise SandboxError(f'Unexpected container stats: {err}') from err
+        cpu_percent = 0.0
+        if cpu_delta > 0 and system_delta > 0:
+            cpu_percent = cpu_delta / system_delta * online_cpus * 100
+        return ResourceUsage(cpu_percent, max(memory_bytes, 0))
+
+    def restart(self, container_id: str):
+        self.client.restart_container(container_id, RESTART_STOP_SECONDS)
+
+    def upload_archive(self, container_id: str, path: str, archive: bytes):
+        self.client.put_archive(container_id, path, archive)
+
+
+class FakeBackend:
+    """
+    Stands in for Docker on a host without a daemon, for benchmarks and
+    load tests. Every exec and upload first sleeps for the latency of a
+    `docker exec` or `docker cp`. The workspaces are unpacked under `root`,
+    a directory per container, and the commands run on this host.
+
+    The test runner only runs for real with `run_tests`: it then executes
+    the solutions on the host, without any isolation, so use it only with
+    trusted code. Otherwise the run takes `run_latency` seconds and reports
+    every test of the uploaded suites as passed.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        exec_latency: float = 0.0,
+        upload_latency: float = 0.0,
+        run_latency: float = 0.0,
+        run_tests: bool = False,
+    ):
+        self.root: str = root
+        self.exec_latency: float = exec_latency
+        self.upload_latency: float = upload_latency
+        self.run_latency: float = run_latency
+        self.run_tests: bool = run_tests
+
+    def host_path(self, container_id: str, path: str) -> str:
+        return os.path.join(self.root, container_id, path.lstrip('/'))
+
+    def host_argument(self, container_id: str, argument: str) -> str:
+        if argument.startswith(settings.SANDBOX_WORKSPACE_ROOT):
+            return self.host_path(container_id, argument)
+        return argument
+
+    def is_alive(self, container_id: str) -> bool:
+        return True
+
+    def exec(
+        self,
+        container_id: str,
+        command: list[str],
+        workdir: str | None = None,
+        environment: dict[str, str] | None = None,
+        timeout: float | None = None,
+        output_limit: int | None = None,
+    ) -> ExecResult:
+        time.sleep(self.exec_latency)
+        environment = dict(environment or {})
+        if workdir:
+            workdir = self.host_path(container_id, workdir)
+            os.makedirs(workdir, exist_ok=True)
+        is_python = command[0] == PYTHON_COMMAND
+        if is_python and not self.run_tests:
+            return self.report_passed_tests(
+                workdir or '.', environment.get(RECORD_TOKEN_ENV, ''), timeout
+            )
+        if 'PYTHONPATH' in environment:
+            environment['PYTHONPATH'] = str(settings.BASE_DIR)
+        return run_process(
+            [
+                sys.executable if is_python else command[0],
+                *(
+                    self.host_argument(container_id, argument)
+                    for argument in command[1:]
+                ),
+            ],
+            command[0],
+            timeout,
+            output_limit,
+            cwd=workdir,
+            environment={**os.environ, **environment},
+        )
+
+    def report_passed_tests(
+        self, workdir: str, record_token: str, timeout: float | None
+    ) -> ExecResult:
+        """The records of a runner that passed every test in `workdir`."""
+        test_names: list[str] = []
+        for test_file_path in sorted(
+            glob.glob(os.path.join(workdir, '*_test.py'))
+        ):
+            with open(test_file_path, encoding='utf-8') as test_file:
+                test_names += TEST_METHOD_PATTERN.findall(test_file.read())
+        if timeout is not None and self.run_latency > timeout:
+            time.sleep(timeout)
+            raise SandboxTimeout(
+                f'{PYTHON_COMMAND} did not finish in {timeout} seconds.',
+                result=ExecResult(-1, '', ''),
+            )
+        time.sleep(self.run_latency)
+        records = [{'type': START_RECORD, 'tests': len(test_names)}]
+        records += [
+            {'type': TEST_RECORD, 'name': name, 'status': STATUS_PASSED}
+            for name in test_names
+        ]
+        records.append(
+            {
+                'type': SUMMARY_RECORD,
+                'tests_run': len(test_names),
+                'failures': 0,
+                'errors': 0,
+                'successful': True,
+            }
+        )
+        return ExecResult(
+            0,
+            ''.join(format_record(record_token, record) for record in records),
+            '',
+        )
+
+    def resource_usage(self, container_id: str) -> ResourceUsage:
+        return ResourceUsage(0.0, 0)
+
+    def restart(self, container_id: str):
+        time.sleep(self.exec_latency)
+
+    def upload_archive(self, container_id: str, path: str, archive: bytes):
+        time.sleep(self.upload_latency)
+        directory = self.host_path(container_id, path)
+        os.makedirs(directory, exist_ok=True)
+        try:
+            with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+                tar.extractall(directory, filter='data')
+        except (tarfile.TarError, OSError) as err:
+            raise SandboxError(
+                f'Upload to {container_id}:{path} failed: {err}'
+            ) from err
+
+
+def create_sandbox_backend(name: str):
+    if name == 'cli':
+        return CliBackend()
+    if name == 'engine_api':
+        return EngineApiBackend(
+            DockerEngineClient(
+                settings.DOCKER_SOCKET_PATH,
+                pool_size=settings.DOCKER_API_POOL_SIZE,
+                timeout=settings.DOCKER_API_TIMEOUT,
+            )
+        )
+    if name == 'fake':
+        return FakeBackend(
+            settings.SANDBOX_FAKE_ROOT
+            or tempfile.mkdtemp(prefix='fake-sandbox-'),
+            exec_latency=settings.SANDBOX_FAKE_EXEC_LATENCY,
+            upload_latency=settings.SANDBOX_FAKE_UPLOAD_LATENCY,
+            run_latency=settings.SANDBOX_FAKE_RUN_LATENCY,
+            run_tests=settings.SANDBOX_FAKE_RUN_TESTS,
+        )
+    raise ImproperlyConfigured(f'Unknown SANDBOX_BACKEND "{name}".')
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_sandbox_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_sandbox_backend(settings.SANDBOX_BACKEND)
+    return _backend
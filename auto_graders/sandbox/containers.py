@@ -0,0 +1,12 @@
+from django.conf import settings
+
+
+def get_container_ids() -> list[str]:
+    if settings.SANDBOX_CONTAINERS:
+        return list(settings.SANDBOX_CONTAINERS)
+    if settings.SANDBOX_POOL_SIZE <= 1:
+        return [settings.SANDBOX_CONTAINER_NAME]
+    return [
+        f'{settings.SANDBOX_CONTAINER_NAME}_{number}'
+        for number in range(1, settings.SANDBOX_POOL_SIZE + 1)
+    ]
@@ -0,0 +1,303 @@
+import http.client
+import json
+import queue
+import socket
+import struct
+import time
+from urllib.parse import quote, urlencode
+
+from auto_graders.runner.output import READ_CHUNK_SIZE, OutputCapture
+from auto_graders.sandbox.exceptions import SandboxError, SandboxTimeout
+
+DOCKER_API_VERSION = 'v1.41'
+STREAM_HEADER = struct.Struct('>BxxxL')
+STDOUT_STREAM = 1
+STDERR_STREAM = 2
+# Shortest wait for exec output, so that a read past the deadline still
+# times out instead of blocking.
+MIN_READ_TIMEOUT = 0.01
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path: str = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class StreamDemultiplexer:
+    """
+    Splits the multiplexed output of a non-TTY exec into stdout and stderr
+    as it arrives.
+
+    Every frame starts with an 8-byte header: the stream type, three
+    padding bytes and the big-endian length of the payload.
+    """
+
+    def __init__(self, capture: OutputCapture):
+        self.capture: OutputCapture = capture
+        self._pending = bytearray()
+        self._payload_left: int = 0
+        self._stream_type: int = STDOUT_STREAM
+
+    def feed(self, data: bytes):
+        self._pending += data
+        while self._pending:
+            if self._payload_left == 0:
+                if len(self._pending) < STREAM_HEADER.size:
+                    return
+                self._stream_type, self._payload_left = (
+                    STREAM_HEADER.unpack_from(self._pending)
+                )
+                del self._pending[: STREAM_HEADER.size]
+                continue
+
+            payload = self._pending[: self._payload_left]
+            del self._pending[: len(payload)]
+            self._payload_left -= len(payload)
+            if self._stream_type == STDERR_STREAM:
+                self.capture.stderr.write(payload)
+            else:
+                self.capture.stdout.write(payload)
+
+
+class DockerEngineClient:
+    """
+    Minimal Docker Engine API client talking HTTP/1.1 over the daemon's
+    unix socket. Keep-alive connections are reused through a small pool,
+    so a grading run costs a few requests instead of several CLI processes.
+    """
+
+    def __init__(self, socket_path: str, pool_size: int, timeout: float):
+        self.socket_path: str = socket_path
+        self.timeout: float = timeout
+        self._idle: queue.LifoQueue[UnixHTTPConnection] = queue.LifoQueue(
+            maxsize=pool_size
+        )
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float | None = None,
+        consume=None,
+    ) -> tuple[int, bytes]:
+        """
+        `consume(response, sock)` may read the body itself from the
+        connection's socket and return the data and whether the body was
+        read to the end; a partly read connection is closed instead of
+        going back to the pool.
+        """
+        url = f'/{DOCKER_API_VERSION}{path}'
+        for attempt in range(2):
+            connection = self._checkout()
+            is_reused = connection.sock is not None
+            self._set_timeout(connection, timeout or self.timeout)
+            try:
+                connection.request(
+                    method, url, body=body, headers=headers or {}
+                )
+                # The connection lets go of its socket once the response
+                # says it will close.
+                sock = connection.sock
+                response = connection.getresponse()
+                if consume is None or response.status >= 300:
+                    data, is_complete = response.read(), True
+                else:
+                    data, is_complete = consume(response, sock)
+            except TimeoutError as err:
+                connection.close()
+                raise SandboxTimeout(f'{method} {path} timed out.') from err
+            except (http.client.HTTPException, OSError) as err:
+                connection.close()
+                if is_reused and attempt == 0:
+                    # The daemon closed an idle keep-alive connection.
+                    continue
+                raise SandboxError(f'{method} {path} failed: {err}') from err
+
+            if response.will_close or not is_complete:
+                connection.close()
+            else:
+                self._checkin(connection)
+            return response.status, data
+
+    def request_json(
+        self,
+        method: str,
+        path: str,
+        payload: dict | None = None,
+        timeout: float | None = None,
+    ) -> dict:
+        body = None
+        headers = {}
+        if payload is not None:
+            body = json.dumps(payload).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+
+        status_code, data = self.request(
+            method, path, body=body, headers=headers, timeout=timeout
+        )
+        if status_code >= 300:
+            raise SandboxError(self._error_message(method, path, data))
+        return json.loads(data) if data else {}
+
+    def ping(self) -> bool:
+        try:
+            status_code, _ = self.request('GET', '/_ping')
+        except SandboxError:
+            return False
+        return status_code == 200
+
+    def inspect_container(self, container_id: str) -> dict:
+        return self.request_json(
+            'GET', f'/containers/{quote(container_id)}/json'
+        )
+
+    def is_container_running(self, container_id: str) -> bool:
+        try:
+            container = self.inspect_container(container_id)
+        except SandboxError:
+            return False
+        return bool(container.get('State', {}).get('Running'))
+
+    def container_stats(self, container_id: str) -> dict:
+        """
+        A single stats sample. Docker waits for a second CPU reading, so
+        `precpu_stats` covers the last second.
+        """
+        return self.request_json(
+            'GET', f'/containers/{quote(container_id)}/stats?stream=false'
+        )
+
+    def restart_container(self, container_id: str, stop_timeout: int):
+        query = urlencode({'t': stop_timeout})
+        self.request_json(
+            'POST',
+            f'/containers/{quote(container_id)}/restart?{query}',
+            timeout=self.timeout + stop_timeout,
+        )
+
+    def exec_create(
+        self,
+        container_id: str,
+        command: list[str],
+        workdir: str | None = None,
+        environment: dict[str, str] | None = None,
+    ) -> str:
+        payload = {
+            'Cmd': command,
+            'AttachStdout': True,
+            'AttachStderr': True,
+            'Tty': False,
+        }
+        if workdir:
+            payload['WorkingDir'] = workdir
+        if environment:
+            payload['Env'] = [
+                f'{name}={value}' for name, value in environment.items()
+            ]
+        response = self.request_json(
+            'POST', f'/containers/{quote(container_id)}/exec', payload
+        )
+        return response['Id']
+
+    def exec_start(
+        self,
+        exec_id: str,
+        capture: OutputCapture,
+        timeout: float | None = None,
+    ):
+        """
+        Stream the exec's output into `capture` until it ends, the capture is
+        exceeded or `timeout` seconds pass.
+        """
+        timeout = timeout or self.timeout
+        deadline = time.monotonic() + timeout
+
+        def read_output(response, sock) -> tuple[bytes, bool]:
+            demultiplexer = StreamDemultiplexer(capture)
+            while True:
+                # Every read waits only until the deadline, so a quiet exec
+                # cannot hold the run past it.
+                sock.settimeout(
+                    max(deadline - time.monotonic(), MIN_READ_TIMEOUT)
+                )
+                chunk = response.read1(READ_CHUNK_SIZE)
+                if not chunk:
+                    return b'', True
+                demultiplexer.feed(chunk)
+                if capture.exceeded:
+                    return b'', False
+                if time.monotonic() > deadline:
+                    raise TimeoutError
+
+        status_code, data = self.request(
+            'POST',
+            f'/exec/{exec_id}/start',
+            body=json.dumps({'Detach': False, 'Tty': False}).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            timeout=timeout,
+            consume=read_output,
+        )
+        if status_code >= 300:
+            raise SandboxError(
+                self._error_message('POST', f'/exec/{exec_id}/start', data)
+            )
+
+    def exec_inspect(self, exec_id: str) -> dict:
+        return self.request_json('GET', f'/exec/{exec_id}/json')
+
+    def put_archive(self, container_id: str, path: str, archive: bytes):
+        query = urlencode({'path': path})
+        status_code, data = self.request(
+            'PUT',
+            f'/containers/{quote(container_id)}/archive?{query}',
+            body=archive,
+            headers={'Content-Type': 'application/x-tar'},
+        )
+        if status_code >= 300:
+            raise SandboxError(
+                self._error_message('PUT', f'archive {path}', data)
+            )
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _checkout(self) -> UnixHTTPConnection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return UnixHTTPConnection(self.socket_path, self.timeout)
+
+    def _checkin(self, connection: UnixHTTPConnection):
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def _set_timeout(self, connection: UnixHTTPConnection, timeout: float):
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+
+    def _error_message(self, method: str, path: str, data: bytes) -> str:
+        try:
+            message = json.loads(data).get('message', '')
+        except ValueError:
+            message = data.decode('utf-8', errors='replace')
+        return f'{method} {path} failed: {message}'
@@ -0,0 +1,19 @@
+class SandboxUnavailable(Exception):
+    pass
+
+
+class SandboxError(Exception):
+    pass
+
+
+class SandboxTimeout(SandboxError):
+    """
+    The run did not finish in time. `result` holds the output it wrote
+    before it was stopped, when the backend could keep it. `stopped` is
+    False when the run may still be going in the container.
+    """
+
+    def __init__(self, message: str, result=None, stopped: bool = True):
+        super().__init__(message)
+        self.result = result
+        self.stopped: bool = stopped
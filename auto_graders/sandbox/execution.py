@@ -0,0 +1,98 @@
+from django.conf import settings
+
+from auto_graders.grading_trace import trace_stage
+from auto_graders.runner.records import (
+    ISOLATION_SHARED,
+    PROCESS_GROUP_FILE_ENV,
+    RECORD_TOKEN_ENV,
+    TEST_ISOLATION_ENV,
+    TEST_TIMEOUT_ENV,
+    TEST_WORKERS_ENV,
+    budget_environment,
+)
+from auto_graders.sandbox.backends import (
+    PYTHON_COMMAND,
+    ExecResult,
+    get_sandbox_backend,
+)
+from auto_graders.sandbox.exceptions import SandboxTimeout
+from auto_graders.sandbox.grading_server import get_grading_server_client
+from auto_graders.sandbox.workspace import (
+    PROCESS_GROUP_FILE_NAME,
+    remove_workspace,
+    upload_workspace,
+)
+
+CONTAINER_APP_PATH = "/usr/src/app/"
+TEST_COMMAND = [PYTHON_COMMAND, '-m', 'auto_graders.runner.json_runner']
+
+
+def execute_test_run(
+    container_id: str,
+    files: dict[str, str],
+    timeout: float,
+    record_token: str,
+    test_timeout: float | None = None,
+    test_workers: int = 1,
+    test_isolation: str = ISOLATION_SHARED,
+    test_budgets: dict | None = None,
+) -> ExecResult:
+    """
+    Run the test files against the solution in `files` inside the container,
+    either through the in-container grading server or with `docker exec`.
+    The structured runner prefixes its records with `record_token`, stops
+    any single test after `test_timeout` seconds, spreads the tests over
+    `test_workers` processes and keeps them apart as `test_isolation` says.
+    `test_budgets` are the CPU-time and memory budgets of a solution run.
+
+    Raises SandboxTimeout when the whole run exceeds `timeout` and
+    SandboxError when the sandbox cannot be reached. A run that timed out
+    has its process group killed; when that fails, the SandboxTimeout is
+    not `stopped`.
+    """
+    if settings.SANDBOX_GRADING_SERVER:
+        # The server writes the workspace itself, so uploading is part of
+        # the run.
+        with trace_stage('run'):
+            return get_grading_server_client().run(
+                container_id,
+                files,
+                timeout,
+                record_token,
+                settings.SANDBOX_OUTPUT_LIMIT,
+                test_timeout=test_timeout,
+                test_workers=test_workers,
+                test_isolation=test_isolation,
+                test_budgets=test_budgets,
+            )
+
+    backend = get_sandbox_backend()
+    with trace_stage('upload'):
+        workspace: str = upload_workspace(container_id, files)
+    try:
+        try:
+            with trace_stage('run'):
+                return backend.exec(
+                    container_id,
+                    TEST_COMMAND,
+                    workdir=workspace,
+                    environment={
+                        'PYTHONPATH': CONTAINER_APP_PATH,
+                        RECORD_TOKEN_ENV: record_token,
+                        TEST_TIMEOUT_ENV: str(test_timeout or ''),
+                        TEST_WORKERS_ENV: str(test_workers),
+                        TEST_ISOLATION_ENV: test_isolation,
+                        PROCESS_GROUP_FILE_ENV: PROCESS_GROUP_FILE_NAME,
+                        **budget_environment(test_budgets),
+                    },
+                    timeout=timeout,
+                    output_limit=settings.SANDBOX_OUTPUT_LIMIT,
+                )
+        finally:
+            with trace_stage('cleanup'):
+                is_cleaned_up = remove_workspace(container_id, workspace)
+    except SandboxTimeout as err:
+        # Stopping the `docker exec` leaves the run going in the container
+        # until the cleanup kills its process group.
+        err.stopped = is_cleaned_up
+        raise
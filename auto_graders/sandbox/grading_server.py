@@ -0,0 +1,165 @@
+import socket
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from auto_graders.runner.protocol import (
+    ConnectionClosed,
+    receive_message,
+    send_message,
+    sign_message,
+)
+from auto_graders.runner.records import ISOLATION_SHARED
+from auto_graders.sandbox.backends import ExecResult
+from auto_graders.sandbox.exceptions import SandboxError, SandboxTimeout
+
+RESPONSE_GRACE_SECONDS = 5.0
+
+
+class GradingServerClient:
+    """
+    Talks to the grading daemon (`auto_graders.runner.server`) running in
+    each sandbox container over persistent TCP connections, one idle stack
+    of connections per container. Every request is signed with `secret`.
+    """
+
+    def __init__(
+        self,
+        port: int,
+        addresses: dict[str, str],
+        connect_timeout: float,
+        secret: str,
+    ):
+        self.port: int = port
+        self.addresses: dict[str, str] = addresses
+        self.connect_timeout: float = connect_timeout
+        self.secret: str = secret
+        self._idle: dict[str, list[socket.socket]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def address(self, container_id: str) -> tuple[str, int]:
+        address = self.addresses.get(container_id, container_id)
+        host, _, port = address.partition(':')
+        return host, int(port) if port else self.port
+
+    def ping(self, container_id: str) -> bool:
+        try:
+            response = self.call(container_id, {'action': 'ping'})
+        except SandboxError:
+            return False
+        return bool(response.get('ok'))
+
+    def run(
+        self,
+        container_id: str,
+        files: dict[str, str],
+        timeout: float,
+        record_token: str,
+        output_limit: int,
+        test_timeout: float | None = None,
+        test_workers: int = 1,
+        test_isolation: str = ISOLATION_SHARED,
+        test_budgets: dict | None = None,
+    ) -> ExecResult:
+        response = self.call(
+            container_id,
+            {
+                'action': 'run',
+                'files': files,
+                'timeout': timeout,
+                'test_timeout': test_timeout,
+                'test_workers': test_workers,
+                'test_isolation': test_isolation,
+                'test_budgets': test_budgets,
+                'record_token': record_token,
+                'output_limit': output_limit,
+            },
+            timeout=timeout + RESPONSE_GRACE_SECONDS,
+        )
+        result = ExecResult(
+            response['exit_code'],
+            response['stdout'],
+            response['stderr'],
+            truncated=response.get('truncated', False),
+            output_size=response.get('output_size'),
+        )
+        if response.get('timed_out'):
+            raise SandboxTimeout(
+                f'The run did not finish in {timeout} seconds.', result=result
+            )
+        return result
+
+    def call(
+        self, container_id: str, request: dict, timeout: float | None = None
+    ) -> dict:
+        request = {**request, 'token': sign_message(request, self.secret)}
+        for attempt in range(2):
+            connection, is_reused = self._checkout(container_id)
+            connection.settimeout(timeout or self.connect_timeout)
+            try:
+                send_message(connection, request)
+                response = receive_message(connection)
+            except TimeoutError as err:
+                connection.close()
+                # The server stops runs itself; one that does not answer
+                # may have left the run going.
+                raise SandboxTimeout(
+                    f'The grading server in {container_id} did not answer.',
+                    stopped=False,
+                ) from err
+            except (ConnectionClosed, OSError, ValueError) as err:
+                connection.close()
+                if is_reused and attempt == 0:
+                    # The server dropped an idle connection.
+                    continue
+                raise SandboxError(
+                    f'The grading server in {container_id} failed: {err}'
+                ) from err
+
+            self._checkin(container_id, connection)
+            if 'error' in response:
+                raise SandboxError(response['error'])
+            return response
+
+    def _checkout(self, container_id: str) -> tuple[socket.socket, bool]:
+        with self._lock:
+            if self._idle[container_id]:
+                return self._idle[container_id].pop(), True
+        try:
+            connection = socket.create_connection(
+                self.address(container_id), timeout=self.connect_timeout
+            )
+        except OSError as err:
+            raise SandboxError(
+                f'Cannot reach the grading server in {container_id}: {err}'
+            ) from err
+        return connection, False
+
+    def _checkin(self, container_id: str, connection: socket.socket):
+        with self._lock:
+            self._idle[container_id].append(connection)
+
+
+_client: GradingServerClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_grading_server_client() -> GradingServerClient:
+    if not settings.SANDBOX_GRADING_SERVER_SECRET:
+        raise ImproperlyConfigured(
+            'SANDBOX_GRADING_SERVER needs SANDBOX_GRADING_SERVER_SECRET.'
+        )
+
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GradingServerClient(
+                    port=settings.SANDBOX_GRADING_SERVER_PORT,
+                    addresses=settings.SANDBOX_GRADING_SERVER_ADDRESSES,
+                    connect_timeout=settings.SANDBOX_GRADING_SERVER_TIMEOUT,
+                    secret=settings.SANDBOX_GRADING_SERVER_SECRET,
+                )
+    return _client
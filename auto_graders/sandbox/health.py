@@ -0,0 +1,226 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+from auto_graders.sandbox.backends import get_sandbox_backend
+from auto_graders.sandbox.grading_server import get_grading_server_client
+from auto_graders.sandbox.containers import get_container_ids
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Stops sending work to a container after `failure_threshold` failures in
+    a row. Once `reset_timeout` seconds have passed the circuit half-opens
+    and lets a single trial through: its success closes the circuit again,
+    its failure opens it for another `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self.state: str = CIRCUIT_CLOSED
+        self.consecutive_failures: int = 0
+        self.opened_at: float | None = None
+        self._trial_started_at: float | None = None
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == CIRCUIT_CLOSED:
+                return True
+
+            now = time.monotonic()
+            if self.state == CIRCUIT_OPEN:
+                if now - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = CIRCUIT_HALF_OPEN
+                self._trial_started_at = None
+
+            # A trial that never reported back must not keep the circuit
+            # half-open forever.
+            if (
+                self._trial_started_at is not None
+                and now - self._trial_started_at < self.reset_timeout
+            ):
+                return False
+            self._trial_started_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = CIRCUIT_CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._trial_started_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if (
+                self.state == CIRCUIT_HALF_OPEN
+                or self.consecutive_failures >= self.failure_threshold
+            ):
+                self.state = CIRCUIT_OPEN
+                self.opened_at = time.monotonic()
+                self._trial_started_at = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == CIRCUIT_OPEN
+
+
+class ContainerHealth:
+    def __init__(self, container_id: str, breaker: CircuitBreaker):
+        self.container_id: str = container_id
+        self.breaker: CircuitBreaker = breaker
+        self.healthy: bool | None = None
+        self.checked_at: datetime | None = None
+        self.probe_seconds: float | None = None
+
+    def as_dict(self) -> dict:
+        return {
+            'container_id': self.container_id,
+            'healthy': self.healthy,
+            'circuit': self.breaker.state,
+            'consecutive_failures': self.breaker.consecutive_failures,
+            'checked_at': self.checked_at,
+            'probe_seconds': (
+                None
+                if self.probe_seconds is None
+                else round(self.probe_seconds, 3)
+            ),
+        }
+
+
+class SandboxHealthMonitor:
+    """
+    Probes every sandbox container from a background thread and keeps the
+    result, so grading runs and readiness checks read cached state instead
+    of paying for a probe themselves.
+
+    Grading runs report their own outcome too: a sandbox error counts as a
+    failed probe, any answer from the sandbox as a successful one.
+    """
+
+    def __init__(
+        self,
+        container_ids: list[str],
+        probe,
+        interval: float,
+        failure_threshold: int,
+        reset_timeout: float,
+    ):
+        self.probe = probe
+        self.interval: float = interval
+        self._health: dict[str, ContainerHealth] = {
+            container_id: ContainerHealth(
+                container_id,
+                CircuitBreaker(failure_threshold, reset_timeout),
+            )
+            for container_id in container_ids
+        }
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name='sandbox-health-monitor', daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def is_available(self, container_id: str) -> bool:
+        """
+        False while the container's circuit is open. In the half-open state
+        only one caller gets True, and it must report the outcome.
+        """
+        return self._health[container_id].breaker.allow_request()
+
+    def report_success(self, container_id: str):
+        self._health[container_id].breaker.record_success()
+
+    def report_failure(self, container_id: str):
+        breaker = self._health[container_id].breaker
+        was_open = breaker.is_open
+        breaker.record_failure()
+        if breaker.is_open and not was_open:
+            logger.warning(
+                'Sandbox container %s circuit opened.', container_id
+            )
+
+    def is_ready(self) -> bool:
+        return any(
+            not health.breaker.is_open for health in self._health.values()
+        )
+
+    def stats(self) -> list[dict]:
+        return [health.as_dict() for health in self._health.values()]
+
+    def probe_all(self):
+        for container_id, health in self._health.items():
+            if not health.breaker.allow_request():
+                continue
+
+            started_at = time.perf_counter()
+            try:
+                healthy = bool(self.probe(container_id))
+            except Exception:
+                logger.exception('Probing container %s failed.', container_id)
+                healthy = False
+            health.probe_seconds = time.perf_counter() - started_at
+            health.healthy = healthy
+            health.checked_at = datetime.now(timezone.utc)
+
+            if healthy:
+                self.report_success(container_id)
+            else:
+                self.report_failure(container_id)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.probe_all()
+            self._stopped.wait(self.interval)
+
+
+def probe_container(container_id: str) -> bool:
+    if settings.SANDBOX_GRADING_SERVER:
+        return get_grading_server_client().ping(container_id)
+    return get_sandbox_backend().is_alive(container_id)
+
+
+_monitor: SandboxHealthMonitor | None = None
+_monitor_lock = threading.Lock()
+
+
+def get_sandbox_health_monitor() -> SandboxHealthMonitor:
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                monitor = SandboxHealthMonitor(
+                    get_container_ids(),
+                    probe_container,
+                    interval=settings.SANDBOX_HEALTH_CHECK_INTERVAL,
+                    failure_threshold=settings.SANDBOX_CIRCUIT_FAILURE_THRESHOLD,
+                    reset_timeout=settings.SANDBOX_CIRCUIT_RESET_SECONDS,
+                )
+                monitor.start()
+                _monitor = monitor
+    return _monitor
@@ -0,0 +1,101 @@
+import fcntl
+import os
+from contextlib import contextmanager
+
+
+class ContainerLocks:
+    """
+    Coordinates the processes of this host that grade in the same sandbox
+    containers (every gunicorn and grading worker has a pool of its own)
+    through files in `directory`.
+
+    A run holds a shared lock on its container's lock file, and the
+    supervisor restarts or samples a container only under the exclusive
+    one, i.e. while no process grades in it. The runs since the last
+    restart are counted in a file per container, and the time of the
+    restart is kept, so a recycle another process asked for is not done
+    twice.
+    """
+
+    def __init__(self, directory: str):
+        self.directory: str = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, container_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f'{container_id}.{suffix}')
+
+    def hold_run(self, container_id: str) -> int | None:
+        """
+        Take a shared lock on the container for a run, without waiting.
+        None while it is being restarted or sampled.
+        """
+        descriptor = os.open(
+            self.path(container_id, 'lock'), os.O_RDONLY | os.O_CREAT, 0o644
+        )
+        try:
+            fcntl.flock(descriptor, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(descriptor)
+            return None
+        return descriptor
+
+    def release_run(self, descriptor: int):
+        os.close(descriptor)
+
+    @contextmanager
+    def exclusive(self, container_id: str):
+        """Yield whether no process runs in the container, and keep it so."""
+        descriptor = os.open(
+            self.path(container_id, 'lock'), os.O_RDONLY | os.O_CREAT, 0o644
+        )
+        try:
+            try:
+                fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+            else:
+                yield True
+        finally:
+            os.close(descriptor)
+
+    def count_run(self, container_id: str) -> int:
+        """Count a finished run; the runs since the last restart."""
+        with self._counter(container_id) as counter:
+            runs = self._read_count(counter) + 1
+            self._write_count(counter, runs)
+        return runs
+
+    def mark_restarted(self, container_id: str):
+        """Reset the run counter of a container that was just restarted."""
+        with self._counter(container_id) as counter:
+            self._write_count(counter, 0)
+        with open(self.path(container_id, 'restarted'), 'w'):
+            pass
+
+    def restarted_at(self, container_id: str) -> float:
+        """When any process last restarted the container, 0 if never."""
+        try:
+            return os.stat(self.path(container_id, 'restarted')).st_mtime
+        except FileNotFoundError:
+            return 0.0
+
+    @contextmanager
+    def _counter(self, container_id: str):
+        descriptor = os.open(
+            self.path(container_id, 'runs'), os.O_RDWR | os.O_CREAT, 0o644
+        )
+        try:
+            fcntl.flock(descriptor, fcntl.LOCK_EX)
+            yield descriptor
+        finally:
+            os.close(descriptor)
+
+    def _read_count(self, descriptor: int) -> int:
+        try:
+            return int(os.pread(descriptor, 32, 0) or 0)
+        except ValueError:
+            return 0
+
+    def _write_count(self, descriptor: int, runs: int):
+        os.ftruncate(descriptor, 0)
+        os.pwrite(descriptor, str(runs).encode(), 0)
@@ -0,0 +1,387 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+from auto_graders.sandbox.backends import get_sandbox_backend
+from auto_graders.sandbox.containers import get_container_ids
+from auto_graders.sandbox.exceptions import SandboxUnavailable
+from auto_graders.sandbox.health import (
+    SandboxHealthMonitor,
+    get_sandbox_health_monitor,
+)
+from auto_graders.sandbox.locks import ContainerLocks
+from auto_graders.sandbox.supervisor import SandboxSupervisor
+
+logger = logging.getLogger(__name__)
+
+# How long to wait before looking again when every idle container is
+# unhealthy but some circuit is half-open or closed.
+UNHEALTHY_RETRY_SECONDS = 0.5
+
+
+class ContainerStats:
+    def __init__(self, container_id: str):
+        self.container_id: str = container_id
+        self.runs: int = 0
+        self.failures: int = 0
+        self.busy_seconds: float = 0.0
+        self.active_runs: int = 0
+        self.last_released_at: datetime | None = None
+        self.quarantined_until: float | None = None
+        self.runs_since_recycle: int = 0
+        self.recycles: int = 0
+        self.recycling: bool = False
+        self.recycle_requested_at: float | None = None
+
+    def as_dict(self) -> dict:
+        quarantine_left = 0.0
+        if self.quarantined_until is not None:
+            quarantine_left = max(
+                self.quarantined_until - time.monotonic(), 0.0
+            )
+        return {
+            'container_id': self.container_id,
+            'runs': self.runs,
+            'failures': self.failures,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'active_runs': self.active_runs,
+            'quarantined': quarantine_left > 0,
+            'quarantine_seconds_left': round(quarantine_left, 3),
+            'last_released_at': self.last_released_at,
+            'runs_since_recycle': self.runs_since_recycle,
+            'recycles': self.recycles,
+            'recycling': self.recycling,
+        }
+
+
+class SandboxLease:
+    """
+    A single grading run's hold on a sandbox container.
+
+    Use it as a context manager: the container goes back to the pool on
+    exit, or into quarantine if the run was marked as failed or raised.
+    """
+
+    def __init__(
+        self,
+        pool: 'SandboxPool',
+        container_id: str,
+        lock_descriptor: int | None = None,
+    ):
+        self.pool: SandboxPool = pool
+        self.container_id: str = container_id
+        self.lock_descriptor: int | None = lock_descriptor
+        self.leased_at: float = time.monotonic()
+        self.failed: bool = False
+
+    def mark_failed(self):
+        self.failed = True
+
+    def __enter__(self) -> 'SandboxLease':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.pool.release(self, failed=self.failed or exc_type is not None)
+
+
+class SandboxPool:
+    """
+    Hands out sandbox containers to grading runs, least recently used
+    first, and keeps failed containers out of rotation for a while.
+
+    Every container offers `concurrency` slots, so it can be leased by that
+    many grading runs at once (each run works in its own workspace). Runs
+    waiting for a slot get one in the order they asked.
+
+    With a health monitor the pool skips containers whose circuit is open
+    and fails fast when no container is healthy.
+
+    A container due for recycling gets no new runs; once its last run is
+    released the supervisor restarts it and calls `finish_recycle`. With
+    `recycle_after_runs` that happens after every that many runs.
+
+    With `locks` every run also holds its container's lock, so runs of
+    other processes keep the supervisor away from the container, and the
+    runs are counted across all processes.
+    """
+
+    def __init__(
+        self,
+        container_ids: list[str],
+        lease_timeout: float,
+        quarantine_seconds: float,
+        concurrency: int = 1,
+        health: SandboxHealthMonitor | None = None,
+        recycle_after_runs: int = 0,
+        locks: ContainerLocks | None = None,
+    ):
+        if not container_ids:
+            raise ValueError('The sandbox pool needs at least one container.')
+        if concurrency < 1:
+            raise ValueError('The container concurrency must be positive.')
+        self.lease_timeout: float = lease_timeout
+        self.quarantine_seconds: float = quarantine_seconds
+        self.health: SandboxHealthMonitor | None = health
+        self.recycle_after_runs: int = recycle_after_runs
+        self.locks: ContainerLocks | None = locks
+        self._lock = threading.Lock()
+        # Conditions of the `acquire` calls waiting for a slot, in arrival
+        # order. Only the first one takes a slot, and a freed slot wakes it.
+        self._waiters: deque[threading.Condition] = deque()
+        self._idle: deque[str] = deque(
+            container_id
+            for _ in range(concurrency)
+            for container_id in container_ids
+        )
+        self._quarantined: dict[str, float] = {}
+        self._recycling: set[str] = set()
+        self._parked_slots: dict[str, int] = {}
+        self._stats: dict[str, ContainerStats] = {
+            container_id: ContainerStats(container_id)
+            for container_id in container_ids
+        }
+
+    @property
+    def size(self) -> int:
+        return len(self._stats)
+
+    @property
+    def container_ids(self) -> list[str]:
+        return list(self._stats)
+
+    def acquire(self, timeout: float | None = None) -> SandboxLease:
+        if timeout is None:
+            timeout = self.lease_timeout
+        deadline = time.monotonic() + timeout
+
+        waiter = threading.Condition(self._lock)
+        with self._lock:
+            self._waiters.append(waiter)
+            try:
+                while True:
+                    is_first = self._waiters[0] is waiter
+                    if is_first:
+                        self._return_recovered_containers()
+                        slot = self._take_healthy_slot()
+                        if slot is not None:
+                            container_id, lock_descriptor = slot
+                            self._stats[container_id].active_runs += 1
+                            return SandboxLease(
+                                self, container_id, lock_descriptor
+                            )
+
+                    if self.health is not None and not self.health.is_ready():
+                        raise SandboxUnavailable(
+                            'Every sandbox container is unhealthy.'
+                        )
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise SandboxUnavailable(
+                            f'No sandbox container became free within '
+                            f'{timeout} seconds.'
+                        )
+                    if is_first and self._idle:
+                        remaining = min(remaining, UNHEALTHY_RETRY_SECONDS)
+                    if is_first and self._quarantined:
+                        next_recovery = (
+                            min(self._quarantined.values()) - time.monotonic()
+                        )
+                        remaining = min(remaining, max(next_recovery, 0.0))
+                    waiter.wait(remaining)
+            finally:
+                # The next waiter may find another free slot.
+                self._waiters.remove(waiter)
+                self._wake_first_waiter()
+
+    def release(self, lease: SandboxLease, failed: bool = False):
+        container_id = lease.container_id
+        runs_since_recycle = None
+        if self.locks is not None:
+            self.locks.release_run(lease.lock_descriptor)
+            runs_since_recycle = self.locks.count_run(container_id)
+        with self._lock:
+            stats = self._stats[container_id]
+            stats.active_runs -= 1
+            stats.runs += 1
+            stats.busy_seconds += time.monotonic() - lease.leased_at
+            stats.last_released_at = datetime.now(timezone.utc)
+            if runs_since_recycle is None:
+                runs_since_recycle = stats.runs_since_recycle + 1
+            stats.runs_since_recycle = runs_since_recycle
+
+            if failed:
+                stats.failures += 1
+                self._quarantine(container_id)
+            if (
+                self.recycle_after_runs
+                and stats.runs_since_recycle >= self.recycle_after_runs
+            ):
+                self._request_recycle(
+                    container_id, f'{stats.runs_since_recycle} runs'
+                )
+
+            if self._is_parked(container_id):
+                self._parked_slots[container_id] += 1
+            else:
+                self._idle.append(container_id)
+            self._wake_first_waiter()
+
+    def request_recycle(self, container_id: str, reason: str):
+        with self._lock:
+            self._request_recycle(container_id, reason)
+
+    def containers_to_recycle(self) -> list[str]:
+        """Containers due for recycling that no run holds anymore."""
+        with self._lock:
+            return [
+                container_id
+                for container_id in self._recycling
+                if self._stats[container_id].active_runs == 0
+            ]
+
+    def idle_containers(self) -> list[str]:
+        with self._lock:
+            return [
+                container_id
+                for container_id, stats in self._stats.items()
+                if stats.active_runs == 0
+                and container_id not in self._recycling
+            ]
+
+    def recycle_requested_at(self, container_id: str) -> float | None:
+        """The wall-clock time the container was marked for recycling."""
+        with self._lock:
+            return self._stats[container_id].recycle_requested_at
+
+    def finish_recycle(self, container_id: str):
+        """
+        Put a restarted container back into rotation, out of quarantine as
+        well: whatever made its runs fail did not survive the restart.
+        """
+        with self._lock:
+            stats = self._stats[container_id]
+            stats.runs_since_recycle = 0
+            stats.recycles += 1
+            stats.recycling = False
+            stats.recycle_requested_at = None
+            stats.quarantined_until = None
+            self._recycling.discard(container_id)
+            self._quarantined.pop(container_id, None)
+            self._idle.extend(
+                [container_id] * self._parked_slots.pop(container_id, 0)
+            )
+            self._wake_first_waiter()
+
+    def stats(self) -> list[dict]:
+        with self._lock:
+            self._return_recovered_containers()
+            return [stats.as_dict() for stats in self._stats.values()]
+
+    def _wake_first_waiter(self):
+        if self._waiters:
+            self._waiters[0].notify()
+
+    def _take_healthy_slot(self) -> tuple[str, int | None] | None:
+        """
+        An idle slot of a healthy container, with the lock of the container
+        when the pool has `locks`. Containers another process is restarting
+        or sampling are passed over. The lock is taken first, so a
+        half-open circuit gives its single trial only to a run that goes
+        ahead and reports the outcome.
+        """
+        for index, container_id in enumerate(self._idle):
+            lock_descriptor = None
+            if self.locks is not None:
+                lock_descriptor = self.locks.hold_run(container_id)
+                if lock_descriptor is None:
+                    continue
+            if self.health is not None and not self.health.is_available(
+                container_id
+            ):
+                if lock_descriptor is not None:
+                    self.locks.release_run(lock_descriptor)
+                continue
+            del self._idle[index]
+            return container_id, lock_descriptor
+        return None
+
+    def _quarantine(self, container_id: str):
+        until = time.monotonic() + self.quarantine_seconds
+        self._stats[container_id].quarantined_until = until
+        self._quarantined[container_id] = until
+        self._park_idle_slots(container_id)
+
+    def _request_recycle(self, container_id: str, reason: str):
+        if container_id in self._recycling:
+            return
+        logger.info(
+            'Recycling sandbox container %s: %s.', container_id, reason
+        )
+        self._stats[container_id].recycling = True
+        self._stats[container_id].recycle_requested_at = time.time()
+        self._recycling.add(container_id)
+        self._park_idle_slots(container_id)
+
+    def _is_parked(self, container_id: str) -> bool:
+        return (
+            container_id in self._quarantined
+            or container_id in self._recycling
+        )
+
+    def _park_idle_slots(self, container_id: str):
+        idle_slots = self._idle.count(container_id)
+        if idle_slots:
+            self._idle = deque(
+                idle_id for idle_id in self._idle if idle_id != container_id
+            )
+        self._parked_slots[container_id] = (
+            self._parked_slots.get(container_id, 0) + idle_slots
+        )
+
+    def _return_recovered_containers(self):
+        now = time.monotonic()
+        for container_id, until in list(self._quarantined.items()):
+            if until <= now:
+                del self._quarantined[container_id]
+                self._stats[container_id].quarantined_until = None
+                if container_id in self._recycling:
+                    continue
+                self._idle.extend(
+                    [container_id] * self._parked_slots.pop(container_id, 0)
+                )
+
+
+_pool: SandboxPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_sandbox_pool() -> SandboxPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool = SandboxPool(
+                    get_container_ids(),
+                    lease_timeout=settings.SANDBOX_LEASE_TIMEOUT,
+                    quarantine_seconds=settings.SANDBOX_QUARANTINE_SECONDS,
+                    concurrency=settings.SANDBOX_CONTAINER_CONCURRENCY,
+                    health=get_sandbox_health_monitor(),
+                    recycle_after_runs=settings.SANDBOX_RECYCLE_AFTER_RUNS,
+                    locks=ContainerLocks(settings.SANDBOX_LOCK_DIR),
+                )
+                supervisor = SandboxSupervisor(
+                    pool,
+                    get_sandbox_backend(),
+                    pool.locks,
+                    interval=settings.SANDBOX_SUPERVISOR_INTERVAL,
+                    cpu_drift_percent=settings.SANDBOX_RECYCLE_CPU_DRIFT,
+                    memory_drift_bytes=settings.SANDBOX_RECYCLE_MEMORY_DRIFT,
+                )
+                if pool.recycle_after_runs or supervisor.checks_drift:
+                    supervisor.start()
+                _pool = pool
+    return _pool
@@ -0,0 +1,160 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+from auto_graders.sandbox.backends import ResourceUsage
+from auto_graders.sandbox.exceptions import SandboxError
+from auto_graders.sandbox.locks import ContainerLocks
+
+logger = logging.getLogger(__name__)
+
+
+class ContainerBaseline:
+    """Resource use of an idle container right after it was (re)started."""
+
+    def __init__(self, usage: ResourceUsage):
+        self.cpu_percent: float = usage.cpu_percent
+        self.memory_bytes: int = usage.memory_bytes
+
+
+class SandboxSupervisor:
+    """
+    Restarts sandbox containers the pool has marked for recycling, and
+    marks idle containers whose CPU or memory use drifted above their
+    baseline: processes that escaped the kill after a run keep running and
+    slow down every later run in the container.
+
+    Samples are only taken while no run holds the container, and the first
+    sample after a start becomes the baseline. A drift of 0 disables that
+    check. With `locks`, a container is only sampled and restarted while
+    no process of the host runs in it, and one another process restarted
+    after it was marked is not restarted again.
+    """
+
+    def __init__(
+        self,
+        pool,
+        backend,
+        locks: ContainerLocks | None,
+        interval: float,
+        cpu_drift_percent: float,
+        memory_drift_bytes: int,
+    ):
+        self.pool = pool
+        self.backend = backend
+        self.locks: ContainerLocks | None = locks
+        self.interval: float = interval
+        self.cpu_drift_percent: float = cpu_drift_percent
+        self.memory_drift_bytes: int = memory_drift_bytes
+        self._baselines: dict[str, ContainerBaseline] = {}
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def checks_drift(self) -> bool:
+        return bool(self.cpu_drift_percent or self.memory_drift_bytes)
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name='sandbox-supervisor', daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def check_all(self):
+        if self.checks_drift:
+            for container_id in self.pool.idle_containers():
+                with self.exclusive(container_id) as is_idle:
+                    if is_idle:
+                        self.check_drift(container_id)
+        for container_id in self.pool.containers_to_recycle():
+            with self.exclusive(container_id) as is_idle:
+                if is_idle:
+                    self.recycle(container_id)
+
+    @contextmanager
+    def exclusive(self, container_id: str):
+        """Yield whether no process of the host runs in the container."""
+        if self.locks is None:
+            yield True
+            return
+        with self.locks.exclusive(container_id) as is_idle:
+            yield is_idle
+
+    def check_drift(self, container_id: str):
+        try:
+            usage = self.backend.resource_usage(container_id)
+        except SandboxError as err:
+            logger.warning(
+                'Could not sample container %s: %s', container_id, err
+            )
+            return
+
+        baseline = self._baselines.get(container_id)
+        if baseline is None:
+            self._baselines[container_id] = ContainerBaseline(usage)
+            return
+
+        if (
+            self.cpu_drift_percent
+            and usage.cpu_percent
+            > baseline.cpu_percent + self.cpu_drift_percent
+        ):
+            self.pool.request_recycle(
+                container_id,
+                f'idle CPU use {usage.cpu_percent:.1f}% over the '
+                f'{baseline.cpu_percent:.1f}% baseline',
+            )
+        elif (
+            self.memory_drift_bytes
+            and usage.memory_bytes
+            > baseline.memory_bytes + self.memory_drift_bytes
+        ):
+            self.pool.request_recycle(
+                container_id,
+                f'idle memory use {usage.memory_bytes} bytes over the '
+                f'{baseline.memory_bytes} bytes baseline',
+            )
+
+    def recycle(self, container_id: str):
+        """
+        Restart the container. If the restart fails the container stays out
+        of rotation and the next check tries again.
+        """
+        requested_at = self.pool.recycle_requested_at(container_id)
+        if (
+            self.locks is not None
+            and requested_at is not None
+            and self.locks.restarted_at(container_id) > requested_at
+        ):
+            self._baselines.pop(container_id, None)
+            self.pool.finish_recycle(container_id)
+            return
+        try:
+            self.backend.restart(container_id)
+        except SandboxError as err:
+            logger.error(
+                'Could not restart container %s: %s', container_id, err
+            )
+            return
+        if self.locks is not None:
+            self.locks.mark_restarted(container_id)
+        self._baselines.pop(container_id, None)
+        self.pool.finish_recycle(container_id)
+        logger.info('Sandbox container %s recycled.', container_id)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.check_all()
+            except Exception:
+                logger.exception('Sandbox supervisor check failed.')
+            self._stopped.wait(self.interval)
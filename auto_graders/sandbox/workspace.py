@@ -0,0 +1,85 @@
+import io
+import logging
+import tarfile
+import time
+import uuid
+
+from django.conf import settings
+
+from auto_graders.sandbox.backends import get_sandbox_backend
+from auto_graders.sandbox.exceptions import SandboxError
+
+logger = logging.getLogger(__name__)
+
+# Written by the test runner inside the workspace, see
+# auto_graders.runner.json_runner.
+PROCESS_GROUP_FILE_NAME = '.grading-process-group'
+# Kill the run's process group, in case it outlived the `docker exec` that
+# started it, then remove the workspace. A group id of 0 or 1 would signal
+# every process in the container, so it is never used.
+REMOVE_WORKSPACE_SCRIPT = (
+    'group=$(cat "$1/$2" 2>/dev/null) '
+    '&& [ "$group" -gt 1 ] 2>/dev/null '
+    '&& kill -KILL -- "-$group" 2>/dev/null; '
+    'rm -rf "$1"'
+)
+
+
+def build_workspace_archive(directory: str, files: dict[str, str]) -> bytes:
+    buffer = io.BytesIO()
+    modified_at = time.time()
+    with tarfile.open(fileobj=buffer, mode='w') as archive:
+        directory_member = tarfile.TarInfo(directory)
+        directory_member.type = tarfile.DIRTYPE
+        directory_member.mode = 0o755
+        directory_member.mtime = modified_at
+        archive.addfile(directory_member)
+
+        for file_name, content in files.items():
+            data: bytes = content.encode('utf-8')
+            member = tarfile.TarInfo(f'{directory}/{file_name}')
+            member.size = len(data)
+            member.mode = 0o644
+            member.mtime = modified_at
+            archive.addfile(member, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def upload_workspace(container_id: str, files: dict[str, str]) -> str:
+    """
+    Create a uniquely named working directory for one grading run under the
+    tmpfs-backed SANDBOX_WORKSPACE_ROOT of the container and unpack `files`
+    (file name -> content) into it with a single archive upload.
+    """
+    workspace_root: str = settings.SANDBOX_WORKSPACE_ROOT.rstrip('/')
+    directory: str = uuid.uuid4().hex
+    get_sandbox_backend().upload_archive(
+        container_id,
+        workspace_root,
+        build_workspace_archive(directory, files),
+    )
+    return f'{workspace_root}/{directory}'
+
+
+def remove_workspace(container_id: str, workspace: str) -> bool:
+    """
+    Kill whatever the grading run left running in the container and delete
+    its working directory. Called after every run, including the ones that
+    timed out or were cancelled. False when the cleanup could not run.
+    """
+    try:
+        get_sandbox_backend().exec(
+            container_id,
+            [
+                'sh',
+                '-c',
+                REMOVE_WORKSPACE_SCRIPT,
+                'sh',
+                workspace,
+                PROCESS_GROUP_FILE_NAME,
+            ],
+        )
+    except SandboxError as err:
+        logger.warning('Could not remove workspace %s: %s', workspace, err)
+        return False
+    return True
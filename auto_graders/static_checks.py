@@ -0,0 +1,202 @@
+import ast
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+
+RULE_REQUIRE = 'require'
+RULE_FORBID = 'forbid'
+RULE_TYPES = (RULE_REQUIRE, RULE_FORBID)
+
+# What a rule looks up in the index: node types (`While`, `Subscript`),
+# names of called functions (`zip`), names of called methods (`append`) or
+# any attribute access (`lower`).
+RULE_KIND_NODE = 'node'
+RULE_KIND_CALL = 'call'
+RULE_KIND_METHOD = 'method'
+RULE_KIND_ATTRIBUTE = 'attribute'
+RULE_KINDS = (
+    RULE_KIND_NODE,
+    RULE_KIND_CALL,
+    RULE_KIND_METHOD,
+    RULE_KIND_ATTRIBUTE,
+)
+
+STATIC_CHECK_CACHE_SIZE = 1024
+
+
+class SolutionIndex:
+    """
+    Everything the structural checks ask about a solution, collected in a
+    single walk over its AST.
+    """
+
+    def __init__(self, tree: ast.AST):
+        self.node_types: Counter = Counter()
+        self.call_names: Counter = Counter()
+        self.method_names: Counter = Counter()
+        self.attribute_names: Counter = Counter()
+        # Numbers of positional arguments each function was called with.
+        self.call_arities: dict[str, set[int]] = {}
+        self.compare_operators: Counter = Counter()
+
+        for node in ast.walk(tree):
+            self.node_types[type(node).__name__] += 1
+            if isinstance(node, ast.Call):
+                self._add_call(node)
+            elif isinstance(node, ast.Attribute):
+                self.attribute_names[node.attr] += 1
+            elif isinstance(node, ast.Compare):
+                self.compare_operators.update(
+                    type(operator).__name__ for operator in node.ops
+                )
+
+    def _add_call(self, node: ast.Call):
+        if isinstance(node.func, ast.Name):
+            self.call_names[node.func.id] += 1
+            self.call_arities.setdefault(node.func.id, set()).add(
+                len(node.args)
+            )
+        elif isinstance(node.func, ast.Attribute):
+            self.method_names[node.func.attr] += 1
+
+    @classmethod
+    def from_source(cls, source: str) -> 'SolutionIndex':
+        return cls(ast.parse(source))
+
+    def names(self, kind: str) -> Counter:
+        return {
+            RULE_KIND_NODE: self.node_types,
+            RULE_KIND_CALL: self.call_names,
+            RULE_KIND_METHOD: self.method_names,
+            RULE_KIND_ATTRIBUTE: self.attribute_names,
+        }[kind]
+
+    def uses(self, kind: str, *names: str) -> bool:
+        """Whether the solution uses any of `names` of the given kind."""
+        found = self.names(kind)
+        return any(found[name] for name in names)
+
+    def uses_node(self, *node_types: str) -> bool:
+        return self.uses(RULE_KIND_NODE, *node_types)
+
+    def uses_call(self, *call_names: str) -> bool:
+        return self.uses(RULE_KIND_CALL, *call_names)
+
+    def uses_method(self, *method_names: str) -> bool:
+        return self.uses(RULE_KIND_METHOD, *method_names)
+
+    def uses_attribute(self, *attribute_names: str) -> bool:
+        return self.uses(RULE_KIND_ATTRIBUTE, *attribute_names)
+
+    def uses_compare(self, *operators: str) -> bool:
+        return any(self.compare_operators[operator] for operator in operators)
+
+    def calls_with_arguments(self, call_name: str, arguments: int) -> bool:
+        return arguments in self.call_arities.get(call_name, ())
+
+
+class StaticRule:
+    """Requires or forbids any of `names` of the given kind."""
+
+    def __init__(self, rule: str, kind: str, names: tuple, message: str):
+        self.rule: str = rule
+        self.kind: str = kind
+        self.names: tuple[str, ...] = names
+        self.message: str = message
+
+    @property
+    def key(self) -> tuple:
+        return self.rule, self.kind, self.names, self.message
+
+    def is_violated(self, index: SolutionIndex) -> bool:
+        is_used = index.uses(self.kind, *self.names)
+        return is_used if self.rule == RULE_FORBID else not is_used
+
+
+def rule_from_spec(spec: dict) -> StaticRule:
+    """
+    Build a rule from its JSON form, e.g. `{"rule": "forbid", "kind":
+    "method", "names": ["issubset"], "message": "..."}`. `names` may also
+    be a single string. Raises ValueError for a malformed spec.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError(f'A rule must be an object, got {spec!r}.')
+    rule = spec.get('rule')
+    if rule not in RULE_TYPES:
+        raise ValueError(f'"rule" must be one of {", ".join(RULE_TYPES)}.')
+    kind = spec.get('kind')
+    if kind not in RULE_KINDS:
+        raise ValueError(f'"kind" must be one of {", ".join(RULE_KINDS)}.')
+    names = spec.get('names')
+    if isinstance(names, str):
+        names = [names]
+    if (
+        not isinstance(names, list)
+        or not names
+        or not all(isinstance(name, str) and name for name in names)
+    ):
+        raise ValueError('"names" must be a name or a non-empty list of them.')
+    message = spec.get('message') or f'{rule} {kind}: {", ".join(names)}'
+    if not isinstance(message, str):
+        raise ValueError('"message" must be a string.')
+    return StaticRule(rule, kind, tuple(names), message)
+
+
+def rules_from_spec(specs: list) -> list[StaticRule]:
+    if not isinstance(specs, list):
+        raise ValueError('Static rules must be a list.')
+    return [rule_from_spec(spec) for spec in specs]
+
+
+def solution_hash(source: str) -> str:
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+class StaticCheckCache:
+    """
+    Messages of the violated rules by solution hash and rule set, so a
+    resubmitted solution is neither parsed nor walked again.
+    """
+
+    def __init__(self, max_size: int = STATIC_CHECK_CACHE_SIZE):
+        self.max_size: int = max_size
+        self._results: OrderedDict[tuple, tuple[str, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> tuple[str, ...] | None:
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+            return result
+
+    def set(self, key: tuple, result: tuple[str, ...]):
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+
+
+_static_check_cache = StaticCheckCache()
+
+
+def check_solution(source: str, rules: list[StaticRule]) -> list[str]:
+    """
+    Messages of the rules the solution violates. A solution that does not
+    parse violates none: the compilation check reports it.
+    """
+    if not rules:
+        return []
+    key = (solution_hash(source), tuple(rule.key for rule in rules))
+    violated = _static_check_cache.get(key)
+    if violated is None:
+        try:
+            index = SolutionIndex.from_source(source)
+        except (SyntaxError, ValueError):
+            return []
+        violated = tuple(
+            rule.message for rule in rules if rule.is_violated(index)
+        )
+        _static_check_cache.set(key, violated)
+    return list(violated)
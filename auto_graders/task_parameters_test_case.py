@@ -0,0 +1,85 @@
+import pprint
+import textwrap
+from unittest.mock import patch
+
+from auto_graders.constants import BUILTINS_INPUT
+from auto_graders.informative_test_case import InformativeTestCase
+
+TASK_PARAMETERS_TEST_FILE_NAME = 'task_parameters_test.py'
+TASK_PARAMETERS_TEST_TEMPLATE = '''from auto_graders.task_parameters_test_case import (
+    build_task_parameters_test_case,
+)
+
+TestTaskParameters = build_task_parameters_test_case(
+{cases}
+)
+'''
+
+
+def normalize_output(output: str) -> str:
+    """Ignore line endings, trailing spaces and blank lines at the end."""
+    lines = output.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    return '\n'.join(line.rstrip() for line in lines).rstrip('\n')
+
+
+class TaskParametersTestCase(InformativeTestCase):
+    """
+    Checks a stdin/stdout task against its `TaskParameters` rows: every
+    line of `input_params` answers one `input()` call and everything the
+    solution prints has to match `output_params`.
+
+    All cases share the compiled solution and each runs it in a fresh
+    namespace, so globals do not carry over from one case to the next.
+    """
+
+    def run_with_stdin(self, stdin: str) -> str:
+        lines = iter(stdin.split('\n'))
+
+        def read_line(prompt=''):
+            try:
+                return next(lines)
+            except StopIteration:
+                raise EOFError('EOF when reading a line') from None
+
+        with patch(BUILTINS_INPUT, side_effect=read_line):
+            return self.capture_solution_output()
+
+    def check_parameters(self, input_params: str, output_params: str):
+        output = self.run_with_stdin(input_params)
+        self.assertEqual(
+            normalize_output(output), normalize_output(output_params)
+        )
+
+
+def make_parameters_test(number: int, input_params: str, output_params: str):
+    def test(self):
+        self.check_parameters(input_params, output_params)
+
+    input_values = ', '.join(repr(line) for line in input_params.split('\n'))
+    test.__doc__ = (
+        f'Check if the provided solution works with the task parameters '
+        f'#{number}\nINPUT VALUES: {input_values}'
+    )
+    return test
+
+
+def build_task_parameters_test_case(
+    cases: list[tuple[str, str]],
+) -> type[TaskParametersTestCase]:
+    """A test class with one test per (input_params, output_params) case."""
+    tests = {
+        f'test_parameters_{number}': make_parameters_test(
+            number, input_params, output_params
+        )
+        for number, (input_params, output_params) in enumerate(cases, 1)
+    }
+    return type('TestTaskParameters', (TaskParametersTestCase,), tests)
+
+
+def render_task_parameters_test(cases: list[tuple[str, str]]) -> str:
+    """Source of the test file that checks the solution against `cases`."""
+    return TASK_PARAMETERS_TEST_TEMPLATE.format(
+        cases=textwrap.indent(
+            pprint.pformat([tuple(case) for case in cases]), '    '
+        )
+    )
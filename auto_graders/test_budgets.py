@@ -0,0 +1,181 @@
+"""
+CPU-time and peak-memory budgets of a solution run, measured inside the
+sandbox.
+
+CPU time is the user and system time `resource.getrusage` reports for the
+process. The memory peak is the growth of the process' peak resident set
+size: it is reset through /proc/self/clear_refs before the run, so every
+run is measured on its own. `RLIMIT_CPU` and `RLIMIT_AS` stop a runaway
+solution at a multiple of its budget instead of letting it hold the
+sandbox until the test timeout.
+"""
+
+import math
+import os
+import resource
+import signal
+from contextlib import contextmanager
+
+from auto_graders.runner.records import (
+    CPU_TIME_BUDGET_ENV,
+    MEMORY_BUDGET_ENV,
+)
+
+BUDGET_CPU_TIME = 'cpu_time'
+BUDGET_MEMORY = 'memory'
+# How far past its budget a solution may go before the rlimits stop it.
+CPU_TIME_LIMIT_FACTOR = 2
+MEMORY_LIMIT_FACTOR = 2
+MEMORY_LIMIT_SLACK = 64 * 1024 * 1024
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+
+class BudgetExceeded(AssertionError):
+    """A test failure for a solution run that went over its budget."""
+
+    def __init__(
+        self, budget: str, used: float, limit: float, msg: str | None = None
+    ):
+        super().__init__(msg or f'{budget} {used:g} is over {limit:g}')
+        self.budget: dict = {'resource': budget, 'used': used, 'limit': limit}
+        self.operands: dict = {'method': 'assertWithinBudget', **self.budget}
+
+
+class CpuTimeLimitReached(BaseException):
+    """
+    Raised in the solution by SIGXCPU. Not an Exception, so a broad
+    `except Exception` in the solution cannot swallow it.
+    """
+
+
+def raise_cpu_time_limit_reached(signum, frame):
+    raise CpuTimeLimitReached()
+
+
+class SolutionUsage:
+    def __init__(self):
+        self.cpu_time: float = 0.0
+        self.peak_memory: int = 0
+        # The budget whose rlimit stopped the run, if any.
+        self.limit_reached: str | None = None
+
+
+def read_budgets(
+    cpu_time_budget: float | None, memory_budget: int | None
+) -> tuple[float | None, int | None]:
+    """The task's budgets passed in by the host win over the test class'."""
+    cpu_time = os.environ.get(CPU_TIME_BUDGET_ENV)
+    memory = os.environ.get(MEMORY_BUDGET_ENV)
+    return (
+        float(cpu_time) if cpu_time else cpu_time_budget,
+        int(memory) if memory else memory_budget,
+    )
+
+
+def cpu_time() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def peak_resident_memory() -> int:
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def read_statm() -> tuple[int, int] | None:
+    """The process' address space and resident set sizes in bytes."""
+    try:
+        with open('/proc/self/statm') as statm:
+            size, resident = statm.read().split()[:2]
+    except (OSError, ValueError):
+        return None
+    return int(size) * PAGE_SIZE, int(resident) * PAGE_SIZE
+
+
+def reset_peak_resident_memory() -> bool:
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+    except OSError:
+        return False
+    return True
+
+
+@contextmanager
+def soft_rlimit(limit: int, soft: int):
+    previous_soft, hard = resource.getrlimit(limit)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    try:
+        resource.setrlimit(limit, (soft, hard))
+    except (ValueError, OSError):
+        yield
+        return
+    try:
+        yield
+    finally:
+        resource.setrlimit(limit, (previous_soft, hard))
+
+
+@contextmanager
+def cpu_time_limit(budget: float | None):
+    if budget is None:
+        yield
+        return
+    previous_handler = signal.signal(
+        signal.SIGXCPU, raise_cpu_time_limit_reached
+    )
+    soft = math.ceil(cpu_time() + budget * CPU_TIME_LIMIT_FACTOR)
+    try:
+        with soft_rlimit(resource.RLIMIT_CPU, soft):
+            yield
+    finally:
+        signal.signal(signal.SIGXCPU, previous_handler)
+
+
+@contextmanager
+def memory_limit(budget: int | None, address_space: int | None):
+    if budget is None or address_space is None:
+        yield
+        return
+    soft = address_space + budget * MEMORY_LIMIT_FACTOR + MEMORY_LIMIT_SLACK
+    with soft_rlimit(resource.RLIMIT_AS, soft):
+        yield
+
+
+@contextmanager
+def measure_solution(
+    cpu_time_budget: float | None = None, memory_budget: int | None = None
+):
+    """
+    Measure the CPU time and memory peak of the code run in the block.
+    A run stopped by the rlimits of the budgets does not raise: the block
+    ends early with `limit_reached` set on the yielded usage.
+    """
+    usage = SolutionUsage()
+    statm = read_statm()
+    memory_baseline = 0
+    if memory_budget is not None:
+        memory_baseline = statm[1] if statm else 0
+        if not reset_peak_resident_memory():
+            # Only growth above the earlier peak of the process shows.
+            memory_baseline = max(memory_baseline, peak_resident_memory())
+    started_at = cpu_time()
+    try:
+        with (
+            cpu_time_limit(cpu_time_budget),
+            memory_limit(memory_budget, statm[0] if statm else None),
+        ):
+            yield usage
+    except CpuTimeLimitReached:
+        usage.limit_reached = BUDGET_CPU_TIME
+    except MemoryError:
+        if memory_budget is None:
+            raise
+        usage.limit_reached = BUDGET_MEMORY
+    finally:
+        usage.cpu_time = cpu_time() - started_at
+        if memory_budget is not None:
+            usage.peak_memory = max(
+                peak_resident_memory() - memory_baseline, 0
+            )
@@ -1,13 +1,3 @@
-from unittest.mock import patch
-import io
-import ast
-
-from auto_graders.constants import (
-    SOLUTION_FILE_NAME,
-    SYS_STDOUT,
-    BUILTINS_INPUT,
-    COMPILE_MODE,
-)
 from auto_graders.informative_test_case import InformativeTestCase
 
 expected_output_message = "Dynamic list: {}"
@@ -15,31 +5,14 @@ expected_output_message = "Dynamic list: {}"
 
 class TestDynamicListFromInput(InformativeTestCase):
 
-    @patch(SYS_STDOUT, new_callable=io.StringIO)
     def execute_solution_code(self, *args) -> str:
-        with patch(BUILTINS_INPUT, side_effect=[*args]):
-            with open(SOLUTION_FILE_NAME) as solution_file:
-                code = compile(
-                    solution_file.read(), SOLUTION_FILE_NAME, COMPILE_MODE
-                )
-                exec(code)
-        return args[-1].getvalue().strip()
+        return self.run_solution(*args).strip()
 
     def test_if_code_uses_append(self):
         """Check if the provided solution uses 'append' method"""
-        is_use_append = False
-        with open(SOLUTION_FILE_NAME) as solution_file:
-            solution_code = solution_file.read()
-        tree = ast.parse(solution_code)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call) and isinstance(
-                node.func, ast.Attribute
-            ):
-                if node.func.attr == "append":
-                    is_use_append = True
-                    break
         self.assertTrue(
-            is_use_append, msg="The 'append' is not used in the code."
+            self.solution_index().uses_method('append'),
+            msg="The 'append' is not used in the code.",
         )
 
     def test_given_lists_of_numbers_and_exit_at_end(self):
@@ -1,10 +1,8 @@
-import importlib.util
 from unittest.mock import patch
 import io
 from random import randint, uniform
 
 from auto_graders.constants import (
-    SOLUTION_FILE_NAME,
     SYS_STDOUT,
     BUILTINS_INPUT,
 )
@@ -29,11 +27,7 @@ class TestFilterStudents(InformativeTestCase):
         self, mock_stdout, threshold_value, students, expected_names
     ):
         with patch(BUILTINS_INPUT, return_value=threshold_value):
-            spec = importlib.util.spec_from_file_location(
-                SOLUTION_FILE_NAME.replace('.py', ''), SOLUTION_FILE_NAME
-            )
-            solution = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(solution)
+            solution = self.load_solution_module()
 
             # clear output after import solution file
             mock_stdout.truncate(0)
@@ -1,12 +1,3 @@
-from unittest.mock import patch
-import io
-
-from auto_graders.constants import (
-    SOLUTION_FILE_NAME,
-    SYS_STDOUT,
-    BUILTINS_INPUT,
-    COMPILE_MODE,
-)
 from auto_graders.informative_test_case import InformativeTestCase
 
 EXPECTED_MSG = "Modified list of numbers: {}\n"
@@ -15,13 +6,8 @@ EXPECTED_MSG = "Modified list of numbers: {}\n"
 class TestModifyList(InformativeTestCase):
 
     def run_modify_list_test(self, input_values, expected_output):
-        with patch(SYS_STDOUT, new_callable=io.StringIO) as mock_stdout:
-            with patch(BUILTINS_INPUT, return_value=input_values):
-                with open(SOLUTION_FILE_NAME) as f:
-                    code = compile(f.read(), SOLUTION_FILE_NAME, COMPILE_MODE)
-                    exec(code)
-
-        self.assertEqual(mock_stdout.getvalue(), expected_output)
+        output = self.run_solution(input_values, repeat_input=True)
+        self.assertEqual(output, expected_output)
 
     def test_integers(self):
         """Check if the provided solution works with positive integers
@@ -1,12 +1,3 @@
-from unittest.mock import patch
-import io
-
-from auto_graders.constants import (
-    SOLUTION_FILE_NAME,
-    SYS_STDOUT,
-    BUILTINS_INPUT,
-    COMPILE_MODE,
-)
 from auto_graders.informative_test_case import InformativeTestCase
 
 EXPECTED_MSG = '''Sum: {}
@@ -21,13 +12,8 @@ First number raised to the power of the second number: {}
 class TestArithmeticOperations(InformativeTestCase):
 
     def run_arithmetic_test(self, num1, num2, expected_output):
-        with patch(SYS_STDOUT, new_callable=io.StringIO) as mock_stdout:
-            with patch(BUILTINS_INPUT, side_effect=[num1, num2]):
-                with open(SOLUTION_FILE_NAME) as f:
-                    code = compile(f.read(), SOLUTION_FILE_NAME, COMPILE_MODE)
-                    exec(code)
-
-        self.assertEqual(mock_stdout.getvalue(), expected_output)
+        output = self.run_solution(num1, num2)
+        self.assertEqual(output, expected_output)
 
     def test_valid_input(self):
         """Check if the provided solution works with two positive numbers.
@@ -1,13 +1,3 @@
-from unittest.mock import patch
-import io
-import ast
-
-from auto_graders.constants import (
-    SOLUTION_FILE_NAME,
-    SYS_STDOUT,
-    BUILTINS_INPUT,
-    COMPILE_MODE,
-)
 from auto_graders.informative_test_case import InformativeTestCase
 
 expected_output_message = "List of element pairs: {}"
@@ -15,30 +5,14 @@ expected_output_message = "List of element pairs: {}"
 
 class TestPairElementsFromLists(InformativeTestCase):
 
-    @patch(SYS_STDOUT, new_callable=io.StringIO)
     def execute_solution_code(self, *args) -> str:
-        with patch(BUILTINS_INPUT, side_effect=[*args]):
-            with open(SOLUTION_FILE_NAME) as solution_file:
-                code = compile(
-                    solution_file.read(), SOLUTION_FILE_NAME, COMPILE_MODE
-                )
-                exec(code)
-        return args[-1].getvalue().strip()
+        return self.run_solution(*args).strip()
 
     def test_if_code_use_zip(self):
         """Check if the provided solution uses 'zip' method"""
-        is_use_zip = False
-        with open(SOLUTION_FILE_NAME) as solution_file:
-            solution_code = solution_file.read()
-        tree = ast.parse(solution_code)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
-                if node.func.id == "zip":
-                    if len(node.args) == 2:
-                        is_use_zip = True
-                    break
         self.assertTrue(
-            is_use_zip, msg="The zip function is not used in the code."
+            self.solution_index().calls_with_arguments('zip', 2),
+            msg="The zip function is not used in the code.",
         )
 
     def test_given_lists_of_digit_and_characters(self):
@@ -1,9 +1,3 @@
-from importlib import util
-import ast
-
-from auto_graders.constants import (
-    SOLUTION_FILE_NAME,
-)
 from auto_graders.informative_test_case import InformativeTestCase
 
 not_a_subset_output_message = "Set 1 is not a subset of Set 2"
@@ -13,42 +7,23 @@ is_a_subset_output_message = "Set 1 is a subset of Set 2"
 class TestCheckSet1IsSubsetOfSet2(InformativeTestCase):
 
     def execute_solution_code(self, *args) -> str:
-        spec = util.spec_from_file_location('code', SOLUTION_FILE_NAME)
-        code = util.module_from_spec(spec)
-        spec.loader.exec_module(code)
+        code = self.load_solution_module()
         result = code.is_subset(args[0], args[1])
         return result
 
     def test_is_use_issubset(self):
         """Check if the provided solution uses 'issubset' method"""
-        is_use_issubset = False
-        with open(SOLUTION_FILE_NAME) as solution_file:
-            solution_code = solution_file.read()
-        tree = ast.parse(solution_code)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call) and isinstance(
-                node.func, ast.Attribute
-            ):
-                if node.func.attr == "issubset":
-                    is_use_issubset = True
-                    break
         self.assertFalse(
-            is_use_issubset, msg="The issubset is used in the code."
+            self.solution_index().uses_method('issubset'),
+            msg="The issubset is used in the code.",
         )
 
     def test_is_use_gr_or_eq(self):
         """Check if the provided solution uses 'gr' or 'eq' method"""
-        is_use_compare = False
-        with open(SOLUTION_FILE_NAME) as solution_file:
-            solution_code = solution_file.read()
-        tree = ast.parse(solution_code)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Compare):
-                for op in node.ops:
-                    if isinstance(op, ast.GtE) or isinstance(op, ast.LtE):
-                        is_use_compare = True
-                        break
-        self.assertFalse(is_use_compare, msg="Compare is used in the code.")
+        self.assertFalse(
+            self.solution_index().uses_compare('GtE', 'LtE'),
+            msg="Compare is used in the code.",
+        )
 
     def test_if_set1_is_subset_of_set2(self):
         """Check if the provided solution works if the first set is subset of the second
@@ -1,12 +1,3 @@
-from unittest.mock import patch
-import io
-
-from auto_graders.constants import (
-    SOLUTION_FILE_NAME,
-    SYS_STDOUT,
-    BUILTINS_INPUT,
-    COMPILE_MODE,
-)
 from auto_graders.informative_test_case import InformativeTestCase
 
 EXPECTED_MSG = "Lengths of words in the sentence: {}\n"
@@ -16,12 +7,8 @@ class TestSolution(InformativeTestCase):
 
     def run_test(self, test_input, expected_lengths):
         expected_output = EXPECTED_MSG.format(expected_lengths)
-        with patch(BUILTINS_INPUT, return_value=test_input):
-            with patch(SYS_STDOUT, new_callable=io.StringIO) as mock_stdout:
-                with open(SOLUTION_FILE_NAME) as f:
-                    code = compile(f.read(), SOLUTION_FILE_NAME, COMPILE_MODE)
-                    exec(code)
-                self.assertEqual(mock_stdout.getvalue(), expected_output)
+        output = self.run_solution(test_input, repeat_input=True)
+        self.assertEqual(output, expected_output)
 
     def test_normal_case(self):
         """Check if the provided solution works with common sentence
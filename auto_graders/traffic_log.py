@@ -0,0 +1,230 @@
+"""
+Opt-in log of the solutions sent to `/solve/`, replayed against a later
+build with `python manage.py replay_traffic`.
+
+With GRADING_TRAFFIC_LOG_DIR set, every process (e.g. each gunicorn
+worker) appends the solve requests it answered to a gzip-compressed JSON
+Lines file of its own in that directory. A record holds the task, the
+solution with its comments removed, when the request came in, how long it
+took and its outcome; nothing in it names the student. A background thread
+appends the records every GRADING_TRAFFIC_LOG_FLUSH_INTERVAL seconds as a
+gzip member of their own, so a file cut short by a crash keeps all
+batches but the last.
+"""
+
+import atexit
+import glob
+import gzip
+import io
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import tokenize
+import uuid
+
+from django.conf import settings
+from rest_framework import status
+
+from auto_graders.metrics import grading_outcome
+
+logger = logging.getLogger(__name__)
+
+LOG_FILE_PATTERN = '*.jsonl.gz'
+COMMENT_LINE_PATTERN = re.compile(r'^[ \t]*#.*$', re.MULTILINE)
+# An outcome of asynchronous grading is not known when the request is
+# answered.
+QUEUED_OUTCOME = 'queued'
+
+
+def strip_comments(solution_code: str) -> str:
+    """
+    The solution without its comments, which may name the student. Line
+    numbers stay the same. Code that cannot be tokenized only loses its
+    whole-line comments.
+    """
+    try:
+        tokens = [
+            token
+            for token in tokenize.generate_tokens(
+                io.StringIO(solution_code).readline
+            )
+            if token.type != tokenize.COMMENT
+        ]
+        return tokenize.untokenize(tokens)
+    except (tokenize.TokenError, SyntaxError, ValueError):
+        return COMMENT_LINE_PATTERN.sub('', solution_code)
+
+
+def response_outcome(status_code: int, data: dict) -> str:
+    """The outcome of a solve response, named as by `grading_outcome`."""
+    if status_code == status.HTTP_202_ACCEPTED:
+        return QUEUED_OUTCOME
+    if status_code != status.HTTP_200_OK:
+        return str(status_code)
+    return grading_outcome(
+        {'success': 'errors' not in data, 'errors': data.get('errors')}
+    )
+
+
+class TrafficRecorder:
+    """
+    Appends solve records to the log file of this process from a
+    background thread, so the request does not wait for the disk. Records
+    that find GRADING_TRAFFIC_LOG_QUEUE_SIZE unwritten ones ahead of them
+    are dropped with a warning.
+    """
+
+    def __init__(self, directory: str, queue_size: int, flush_interval: float):
+        self.directory: str = directory
+        self.flush_interval: float = flush_interval
+        self.pid: int = os.getpid()
+        # The pid and a random part, so processes never share a file.
+        self.path: str = os.path.join(
+            directory, f'solve-{self.pid}-{uuid.uuid4().hex[:8]}.jsonl.gz'
+        )
+        self._queue: queue.Queue[dict] = queue.Queue(queue_size)
+        self._write_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._run, name='traffic-recorder', daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.write_pending)
+
+    def submit(self, record: dict):
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            logger.warning(
+                'Traffic log queue is full, a solve request of task %s is '
+                'not recorded.',
+                record['task_id'],
+            )
+
+    def write_pending(self):
+        """Append the records submitted so far to the log file."""
+        if self.pid != os.getpid():
+            return
+        with self._write_lock:
+            records: list[dict] = []
+            while True:
+                try:
+                    records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not records:
+                return
+            lines = ''.join(
+                json.dumps(record, ensure_ascii=False) + '\n'
+                for record in records
+            )
+            try:
+                with open(self.path, 'ab') as log_file:
+                    log_file.write(gzip.compress(lines.encode('utf-8')))
+            except OSError:
+                logger.exception(
+                    'Writing %s solve records to %s failed.',
+                    len(records),
+                    self.path,
+                )
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            if self.pid != os.getpid():
+                return
+            self.write_pending()
+
+
+_recorder: TrafficRecorder | None = None
+_recorder_lock = threading.Lock()
+
+
+def get_traffic_recorder() -> TrafficRecorder | None:
+    if not settings.GRADING_TRAFFIC_LOG_DIR:
+        return None
+
+    global _recorder
+    # A process forked from one that recorded starts a file of its own.
+    if _recorder is None or _recorder.pid != os.getpid():
+        with _recorder_lock:
+            if _recorder is None or _recorder.pid != os.getpid():
+                recorder = TrafficRecorder(
+                    settings.GRADING_TRAFFIC_LOG_DIR,
+                    settings.GRADING_TRAFFIC_LOG_QUEUE_SIZE,
+                    settings.GRADING_TRAFFIC_LOG_FLUSH_INTERVAL,
+                )
+                recorder.start()
+                _recorder = recorder
+    return _recorder
+
+
+def record_solve_request(
+    task_id: int,
+    solution_code: str,
+    received_at: float,
+    duration: float,
+    status_code: int,
+    data: dict,
+):
+    """Log a solve request when GRADING_TRAFFIC_LOG_DIR is set."""
+    recorder = get_traffic_recorder()
+    if recorder is None:
+        return
+    recorder.submit(
+        {
+            'received_at': round(received_at, 6),
+            'task_id': task_id,
+            'solution_code': strip_comments(solution_code),
+            'duration': round(duration, 6),
+            'status': status_code,
+            'outcome': response_outcome(status_code, data),
+            'score': data.get('score'),
+        }
+    )
+
+
+def find_log_files(paths: list[str]) -> list[str]:
+    """`paths`, with directories replaced by the log files in them."""
+    log_files: list[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            log_files += sorted(
+                glob.glob(os.path.join(path, LOG_FILE_PATTERN))
+            )
+        else:
+            log_files.append(path)
+    return log_files
+
+
+def read_log_file(path: str) -> list[dict]:
+    """
+    The records of a log file. Reading stops with a warning at a batch cut
+    short, e.g. by a crash or a process still writing.
+    """
+    records: list[dict] = []
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as log_file:
+            for line in log_file:
+                records.append(json.loads(line))
+    except (OSError, EOFError, ValueError) as err:
+        logger.warning(
+            'Reading %s stopped after %s records: %s', path, len(records), err
+        )
+    return records
+
+
+def read_traffic_log(paths: list[str]) -> list[dict]:
+    """The records of all log files in `paths`, in the order they came in."""
+    records: list[dict] = []
+    for path in find_log_files(paths):
+        records += read_log_file(path)
+    records.sort(key=lambda record: record['received_at'])
+    return records
@@ -8,6 +8,10 @@ from auto_graders.views import (
     TaskListCreateView,
     TaskDetailUpdateDeleteView,
     SolveTaskView,
+    GradingJobStatusView,
+    SandboxPoolStatsView,
+    SandboxHealthView,
+    GradingResultCacheStatsView,
     UserProfileView,
     TaskTestsListCreateView,
     TestRetrieveUpdateDestroyView,
@@ -26,6 +30,10 @@ urlpatterns = [
     path('tasks/', TaskListCreateView.as_view()),
     path('tasks/<int:pk>/', TaskDetailUpdateDeleteView.as_view()),
     path('tasks/<int:pk>/solve/', SolveTaskView.as_view()),
+    path(
+        'tasks/<int:pk>/solve/<int:job_id>/',
+        GradingJobStatusView.as_view(),
+    ),
     path('tasks/<int:task_id>/tests/', TaskTestsListCreateView.as_view()),
     path('profile/', UserProfileView.as_view()),
     path(
@@ -34,4 +42,7 @@ urlpatterns = [
     ),
     path('users/', UserListCreateView.as_view()),
     path('users/<int:pk>/', UserDetailUpdateDeleteView.as_view()),
+    path('sandbox/stats/', SandboxPoolStatsView.as_view()),
+    path('sandbox/health/', SandboxHealthView.as_view()),
+    path('grading/cache/stats/', GradingResultCacheStatsView.as_view()),
 ]
@@ -1,10 +1,10 @@
-import subprocess
 from datetime import datetime
-import tempfile
 import os
-import re
+import time
+import uuid
 
 from rest_framework import status
+from django.conf import settings
 from django.contrib.auth.base_user import BaseUserManager
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
@@ -12,10 +12,53 @@ from rest_framework_simplejwt.exceptions import TokenError
 from django.utils.deprecation import MiddlewareMixin
 from rest_framework.request import Request
 
+from auto_graders.grading_trace import (
+    current_grading_trace,
+    trace_exec_result,
+    trace_runner_usage,
+    trace_stage,
+)
+from auto_graders.metrics import track_in_progress
+from auto_graders.runner.records import (
+    ISOLATION_SHARED,
+    STATUS_ERROR,
+    STATUS_FAILED,
+    STATUS_OVER_BUDGET,
+    STATUS_TIMED_OUT,
+    parse_records,
+)
+from auto_graders.sandbox import (
+    CONTAINER_APP_PATH,
+    ExecResult,
+    SandboxError,
+    SandboxTimeout,
+    SandboxUnavailable,
+    execute_test_run,
+    get_sandbox_health_monitor,
+    get_sandbox_pool,
+)
+from auto_graders.task_parameters_test_case import (
+    TASK_PARAMETERS_TEST_FILE_NAME,
+    render_task_parameters_test,
+)
+from auto_graders.test_budgets import BUDGET_CPU_TIME
+
 
 SOLUTION_FILE_NAME = "solution.py"
-CONTAINER_APP_PATH = "/usr/src/app/"
-CONTAINER_ID = 'task_tests_env'
+MEBIBYTE = 1024 * 1024
+# A test may take at most this share of the run timeout, so that a test
+# that hangs is stopped and reported before the whole run is.
+TEST_TIMEOUT_SHARE = 0.5
+SERVICE_UNAVAILABLE_RESULT = {
+    'success': False,
+    'errors': 'Service unavailable',
+    'status_code': status.HTTP_503_SERVICE_UNAVAILABLE,
+}
+GATEWAY_TIMEOUT_RESULT = {
+    'success': False,
+    'errors': 'Gateway Timeout',
+    'status_code': status.HTTP_504_GATEWAY_TIMEOUT,
+}
 
 
 def load_tests_from_file(test_file_path: str) -> str:
@@ -23,69 +66,110 @@ def load_tests_from_file(test_file_path: str) -> str:
         return test_file.read()
 
 
-def parse_test_results(output: str) -> tuple:
-    total_tests_pattern: re.Pattern[str] = re.compile(r"Ran (\d+) test")
-    total_tests_match: re.Match[str] | None = total_tests_pattern.search(
-        output
-    )
-    total_tests: int = (
-        int(total_tests_match.group(1)) if total_tests_match else 0
-    )
+def describe_failed_test(
+    record: dict, test_timeout: float | None = None
+) -> dict:
+    details: dict = {'test': record['description'] or record['name']}
+    if record.get('input_values'):
+        details['input_values'] = record['input_values']
 
-    failed_tests_pattern: re.Pattern[str] = re.compile(r"FAILED \(.*=(\d+)\)")
-    failed_tests_match: re.Match[str] | None = failed_tests_pattern.search(
-        output
-    )
-    failed_tests: int = (
-        int(failed_tests_match.group(1)) if failed_tests_match else 0
-    )
+    assertion: dict | None = record.get('assertion')
+    if record['status'] == STATUS_TIMED_OUT:
+        details['timed_out'] = True
+        details['failure'] = (
+            f'Timed out after '
+            f'{test_timeout or settings.SANDBOX_TEST_TIMEOUT:g} seconds'
+        )
+    elif record['status'] == STATUS_OVER_BUDGET and record.get('budget'):
+        details['budget'] = record['budget']['resource']
+        details['failure'] = describe_budget(record['budget'])
+    elif assertion and assertion['method'] == 'assertEqual':
+        details['failure'] = f"{assertion['first']} != {assertion['second']}"
+    elif assertion:
+        expected = 'true' if assertion['method'] == 'assertTrue' else 'false'
+        details['failure'] = f"{assertion['expr']} is not {expected}"
+    elif record.get('error_type'):
+        message: str = (record.get('message') or '').split('\n', 1)[0]
+        details['failure'] = f"{record['error_type']}: {message}"
+    else:
+        details['failure'] = 'Unexpected success'
 
-    comparison_pattern: re.Pattern[str] = re.compile(
-        r"AssertionError: (.*?) != (.*?)(?:\n.*)+?\s+:\s(.*)\nINPUT VALUES: (.*)"
-    )
+    solution_frame: dict | None = record.get('solution_frame')
+    if solution_frame:
+        details['solution_line'] = (
+            f"{SOLUTION_FILE_NAME}:{solution_frame['line']}: "
+            f"{solution_frame['source']}"
+        )
+    return details
 
-    boolean_pattern: re.Pattern[str] = re.compile(
-        r"AssertionError: (False|True) is not (true|false) : (.*)"
-    )
 
-    runtime_err_pattern: re.Pattern[str] = re.compile(
-        r'ERROR: (.*?) \(.*?\)(?:\n.*?)+?File "solution\.py".*?\n(.*?)\n.*?\n.*?Error: (.*)'
+def describe_budget(budget: dict) -> str:
+    if budget['resource'] == BUDGET_CPU_TIME:
+        return (
+            f"Used {budget['used']:.3f} seconds of CPU time, "
+            f"the budget is {budget['limit']:g} seconds"
+        )
+    return (
+        f"Used {budget['used'] / MEBIBYTE:.1f} MiB of memory, "
+        f"the budget is {budget['limit'] / MEBIBYTE:g} MiB"
     )
 
-    comparison_fails: list = comparison_pattern.findall(output)
-    boolean_fails: list = boolean_pattern.findall(output)
-    runtime_fails: list = runtime_err_pattern.findall(output)
 
-    failed_details: list = (
+def parse_test_results(
+    output: str, record_token: str, test_timeout: float | None = None
+) -> tuple:
+    """
+    Read the records of the structured test runner. When the run was cut
+    short, the tests its start record announced but it never reported count
+    as failed. The last two values are the number of failed tests that only
+    went over their budgets and whether the run got as far as its summary
+    record.
+    """
+    start, test_records, summary = parse_records(output, record_token)
+    if summary is not None:
+        trace_runner_usage(summary)
+    failed_records: list[dict] = [
+        record
+        for record in test_records
+        if record['status']
+        in (STATUS_FAILED, STATUS_ERROR, STATUS_TIMED_OUT, STATUS_OVER_BUDGET)
+    ]
+    total_tests: int = len(test_records)
+    failed_tests: int = len(failed_records)
+    over_budget_tests: int = sum(
+        record['status'] == STATUS_OVER_BUDGET for record in failed_records
+    )
+    if summary is not None:
+        total_tests = max(summary['tests_run'], total_tests)
+    elif start is not None and start['tests'] > total_tests:
+        failed_tests += start['tests'] - total_tests
+        total_tests = start['tests']
+
+    return (
+        total_tests,
+        failed_tests,
         [
-            {
-                "test": failed[2],
-                "input_values": failed[3],
-                "failure": f"{failed[0]} != {failed[1]}",
-            }
-            for failed in comparison_fails
-        ]
-        + [
-            {
-                "test": failed[2],
-                "failure": f"{failed[0]} != {failed[1]}",
-            }
-            for failed in boolean_fails
-        ]
-        + [
-            {
-                "test": failed[0],
-                "failure": f"{failed[2]}: {failed[1].strip()}",
-            }
-            for failed in runtime_fails
-        ]
+            describe_failed_test(record, test_timeout)
+            for record in failed_records
+        ],
+        over_budget_tests,
+        summary is not None,
     )
 
-    return total_tests, failed_tests, failed_details
-
 
-def calculate_grade(total_tests: int, failed_tests: int) -> int:
-    failed_percentage = (failed_tests / total_tests) * 100
+def calculate_grade(
+    total_tests: int, failed_tests: int, over_budget_tests: int = 0
+) -> int:
+    """
+    Tests failed only for going over their budgets count with the weight
+    GRADING_BUDGET_FAILURE_WEIGHT.
+    """
+    weighted_failures = (
+        failed_tests
+        - over_budget_tests
+        + over_budget_tests * settings.GRADING_BUDGET_FAILURE_WEIGHT
+    )
+    failed_percentage = (weighted_failures / total_tests) * 100
 
     if failed_percentage > 80:
         return 5
@@ -99,13 +183,12 @@ def calculate_grade(total_tests: int, failed_tests: int) -> int:
         return 1
 
 
-def is_solution_code_compilable(solution_file_temp_path):
+def is_solution_code_compilable(solution_code: str) -> tuple:
     is_compilable = True
     error = None
 
     try:
-        with open(solution_file_temp_path) as f:
-            compile(f.read(), solution_file_temp_path, 'exec')
+        compile(solution_code, SOLUTION_FILE_NAME, 'exec')
     except SyntaxError as err:
         is_compilable = False
         error = f"{err.msg}: '{err.text}'"
@@ -113,125 +196,206 @@ def is_solution_code_compilable(solution_file_temp_path):
     return is_compilable, error
 
 
-def run_tests_in_isolated_env(test_file_paths, solution_code):
-    with tempfile.TemporaryDirectory() as tempdir:
-        container_id: str = CONTAINER_ID
-        try:
-            subprocess.check_call(
-                ['docker', 'exec', container_id, 'ls', '-l'],
-                stdout=subprocess.DEVNULL,
-            )
-        except subprocess.CalledProcessError:
-            return {
-                'success': False,
-                'errors': 'Service unavailable',
-                'status_code': status.HTTP_503_SERVICE_UNAVAILABLE,
-            }
-
-        test_docker_file_paths: list[str] = []
-        for test_file_path in test_file_paths:
-            temp_test_file_path: str = os.path.join(
-                tempdir, os.path.basename(test_file_path)
-            )
-            test_code: str = load_tests_from_file(test_file_path)
-            with open(temp_test_file_path, 'w') as temp_test_file:
-                temp_test_file.write(test_code)
-            file_name = os.path.basename(test_file_path)
-            docker_file_path = f'{CONTAINER_APP_PATH}{file_name}'
-            test_docker_file_paths.append(docker_file_path)
-            subprocess.run(
-                [
-                    'docker',
-                    'cp',
-                    temp_test_file_path,
-                    f'{container_id}:{docker_file_path}',
-                ]
-            )
-
-        solution_file_temp_path: str = os.path.join(
-            tempdir, SOLUTION_FILE_NAME
-        )
-        with open(solution_file_temp_path, 'w') as solution_file:
-            solution_file.write(solution_code)
-        docker_file_path = f'{CONTAINER_APP_PATH}{SOLUTION_FILE_NAME}'
-        test_docker_file_paths.append(docker_file_path)
-        subprocess.run(
-            [
-                'docker',
-                'cp',
-                solution_file_temp_path,
-                f'{container_id}:{docker_file_path}',
-            ]
+def collect_workspace_files(
+    test_file_paths: list[str],
+    solution_code: str,
+    parameter_cases: list[tuple[str, str]] | None = None,
+) -> dict[str, str]:
+    """
+    The files of a sandbox run. `parameter_cases` add a generated test file
+    that checks the solution against each (stdin, expected stdout) case.
+    """
+    files: dict[str, str] = {
+        os.path.basename(test_file_path): load_tests_from_file(test_file_path)
+        for test_file_path in test_file_paths
+    }
+    if parameter_cases:
+        files[TASK_PARAMETERS_TEST_FILE_NAME] = render_task_parameters_test(
+            parameter_cases
         )
+    files[SOLUTION_FILE_NAME] = solution_code
+    return files
+
+
+def build_failed_test_result(
+    total_tests: int,
+    failed_tests: int,
+    failed_details: list[dict],
+    over_budget_tests: int,
+    is_finished: bool,
+) -> dict:
+    errors = {
+        "general_info": f"{total_tests - failed_tests}/{total_tests} tests passed.",
+        "failed_tests": failed_details,
+    }
+    if over_budget_tests:
+        errors['over_budget_tests'] = over_budget_tests
+    if not is_finished:
+        errors['general_info'] += " The test run was interrupted."
+    return {
+        'success': False,
+        'score': calculate_grade(total_tests, failed_tests, over_budget_tests),
+        'errors': errors,
+    }
+
+
+def run_tests_in_isolated_env(
+    test_file_paths,
+    solution_code,
+    test_workers=1,
+    test_isolation=ISOLATION_SHARED,
+    parameter_cases=None,
+    run_timeout=None,
+    test_budgets=None,
+):
+    with trace_stage('compile_check'):
+        is_executable_code, error = is_solution_code_compilable(solution_code)
+    if not is_executable_code:
+        return {
+            'success': False,
+            'errors': {
+                'general_info': 'compilation error',
+                'error': error,
+            },
+        }
 
-        is_executable_code, error = is_solution_code_compilable(
-            solution_file_temp_path
+    try:
+        with (
+            trace_stage('lease'),
+            track_in_progress('grading_sandbox_waiting'),
+        ):
+            lease = get_sandbox_pool().acquire()
+    except SandboxUnavailable:
+        return dict(SERVICE_UNAVAILABLE_RESULT)
+
+    health = get_sandbox_health_monitor()
+    trace = current_grading_trace()
+    if trace is not None:
+        trace.container_id = lease.container_id
+    with lease, track_in_progress('grading_sandbox_runs_in_flight'):
+        result = run_tests_in_container(
+            lease.container_id,
+            collect_workspace_files(
+                test_file_paths, solution_code, parameter_cases
+            ),
+            test_workers,
+            test_isolation,
+            run_timeout,
+            test_budgets,
         )
-        if not is_executable_code:
-            delete_copied_files(test_docker_file_paths)
-            return {
-                'success': False,
-                'errors': {
-                    'general_info': 'compilation error',
-                    'error': error,
-                },
-            }
-
-        try:
-            result: subprocess.CompletedProcess[str] = subprocess.run(
-                [
-                    'docker',
-                    'exec',
-                    container_id,
-                    'python3',
-                    '-m',
-                    'unittest',
-                    'discover',
-                    '-s',
-                    '.',
-                    '-p',
-                    '*_test.py',
-                ],
-                capture_output=True,
-                text=True,
-                timeout=20,
-            )
-
-            stdout: str = result.stdout
-            stderr: str = result.stderr
-
-            total_tests, failed_tests, failed_details = parse_test_results(
-                stdout + stderr
-            )
-
-            if result.returncode == 0:
-                return {'success': True, 'score': 1}
-            else:
-                errors = {
-                    "general_info": f"{total_tests - failed_tests}/{total_tests} tests passed.",
-                    "failed_tests": failed_details,
-                }
-                return {
-                    'success': False,
-                    'score': calculate_grade(failed_tests, total_tests),
-                    'errors': errors,
-                }
-
-        except subprocess.TimeoutExpired:
+        # A run that timed out was killed, the container is fine: only
+        # sandbox failures take it out of rotation.
+        if result.get('status_code') == status.HTTP_503_SERVICE_UNAVAILABLE:
+            health.report_failure(lease.container_id)
+            lease.mark_failed()
+        else:
+            health.report_success(lease.container_id)
+        return result
+
+
+def run_tests_in_container(
+    container_id: str,
+    files: dict[str, str],
+    test_workers: int = 1,
+    test_isolation: str = ISOLATION_SHARED,
+    run_timeout: float | None = None,
+    test_budgets: dict | None = None,
+):
+    """
+    Every test is limited to SANDBOX_TEST_TIMEOUT seconds inside the runner.
+    If the whole run still exceeds `run_timeout` (SANDBOX_RUN_TIMEOUT by
+    default), the tests reported before it was stopped are graded and the
+    rest count as failed. The per-test limit is at most half the run
+    timeout, so a test that hangs is reported as timed out even with a
+    short learned run timeout. The result's `duration` is the wall-clock
+    time of the run in seconds.
+
+    With `test_workers` above 1 the tests run in that many processes, at
+    most SANDBOX_MAX_TEST_WORKERS. `test_isolation` runs every test in a
+    forked child (`fork`) or a fresh interpreter (`process`) instead of
+    sharing the runner's interpreter. `test_budgets` hold every run of the
+    solution to `cpu_time` seconds and `memory` bytes.
+    """
+    run_timeout = run_timeout or settings.SANDBOX_RUN_TIMEOUT
+    test_timeout = min(
+        settings.SANDBOX_TEST_TIMEOUT, run_timeout * TEST_TIMEOUT_SHARE
+    )
+    record_token: str = uuid.uuid4().hex
+    run_timed_out = False
+    started_at = time.monotonic()
+    try:
+        result: ExecResult = execute_test_run(
+            container_id,
+            files,
+            timeout=run_timeout,
+            record_token=record_token,
+            test_timeout=test_timeout,
+            test_workers=min(test_workers, settings.SANDBOX_MAX_TEST_WORKERS),
+            test_isolation=test_isolation,
+            test_budgets=test_budgets,
+        )
+    except SandboxTimeout as err:
+        if not err.stopped:
+            # The run may still be going: the container has to be left
+            # alone like one that failed.
+            return dict(SERVICE_UNAVAILABLE_RESULT)
+        if err.result is None:
             return {
-                'success': False,
-                'errors': 'Gateway Timeout',
-                'status_code': status.HTTP_504_GATEWAY_TIMEOUT,
+                **GATEWAY_TIMEOUT_RESULT,
+                'duration': time.monotonic() - started_at,
             }
-        finally:
-            delete_copied_files(test_docker_file_paths)
+        result = err.result
+        run_timed_out = True
+    except SandboxError:
+        return dict(SERVICE_UNAVAILABLE_RESULT)
+    duration = time.monotonic() - started_at
+    trace_exec_result(result)
+
+    with trace_stage('parse_results'):
+        (
+            total_tests,
+            failed_tests,
+            failed_details,
+            over_budget_tests,
+            is_finished,
+        ) = parse_test_results(result.stdout, record_token, test_timeout)
+    if run_timed_out and not total_tests:
+        return {**GATEWAY_TIMEOUT_RESULT, 'duration': duration}
+    if is_finished:
+        # The summary is written last; only leftover processes holding the
+        # output open can have kept the run going after it.
+        run_timed_out = False
+
+    if is_finished and (result.exit_code == 0 or not failed_tests):
+        test_result = {'success': True, 'score': 1}
+    elif not total_tests:
+        test_result = {
+            'success': False,
+            'score': 5,
+            'errors': {
+                "general_info": "The test run was interrupted.",
+                "failed_tests": failed_details,
+            },
+        }
+    else:
+        test_result = build_failed_test_result(
+            total_tests,
+            failed_tests,
+            failed_details,
+            over_budget_tests,
+            is_finished,
+        )
 
+    if run_timed_out:
+        test_result['timed_out'] = True
+        test_result['errors']['timed_out'] = True
 
-def delete_copied_files(file_names: list[str]):
-    for docker_file in file_names:
-        subprocess.run(
-            ['docker', 'exec', CONTAINER_ID, 'rm', '-rf', docker_file]
-        )
+    if result.truncated:
+        test_result['output_truncated'] = True
+        if 'errors' in test_result:
+            test_result['errors']['output_truncated'] = True
+    test_result['duration'] = duration
+    return test_result
 
 
 class UserManager(BaseUserManager):
@@ -1,7 +1,10 @@
-from django.db import transaction
+import hmac
+import time
+
+from django.conf import settings
 from django.contrib.auth import authenticate, logout
 from django.db.models import QuerySet
-from django.http import Http404
+from django.http import Http404, HttpResponse
 from rest_framework import status, serializers, generics
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.request import Request
@@ -21,7 +24,15 @@ from rest_framework.permissions import (
     AllowAny,
 )
 from auto_graders.permissions import IsAdminOrModerator, IsOwner
-from auto_graders.models import Task, TaskTests, User, Submission
+from auto_graders.choices.grading_job_status_choices import (
+    GradingJobStatusEnum,
+)
+from auto_graders.grading import (
+    enqueue_grading_job,
+    grade_solution,
+    grade_solution_from_cache,
+)
+from auto_graders.models import GradingJob, Task, TaskTests, User
 from auto_graders.serializers import (
     TaskSerializer,
     SubmissionSerializer,
@@ -32,7 +43,14 @@ from auto_graders.serializers import (
     UserProfileSerializer,
     UserLoginSerializer,
 )
-from auto_graders.utils import run_tests_in_isolated_env, set_jwt_cookies
+from auto_graders.metrics import render_metrics
+from auto_graders.result_cache import get_grading_result_cache
+from auto_graders.sandbox import (
+    get_sandbox_health_monitor,
+    get_sandbox_pool,
+)
+from auto_graders.traffic_log import record_solve_request
+from auto_graders.utils import set_jwt_cookies
 
 
 class TaskListCreateView(ListCreateAPIView):
@@ -96,13 +114,32 @@ class TaskDetailUpdateDeleteView(RetrieveUpdateDestroyAPIView):
 
 
 class SolveTaskView(APIView):
+    """
+    Grade a solution of the task.
+    Example of request:
+    {
+        "solution_code": "print(sum(map(int, input().split())))"
+    }
+
+    NOTE: With GRADING_ASYNC enabled a solution that breaks no static rule
+    and is not in the grading result cache shared with the workers
+    (GRADING_RESULT_CACHE_URL) is queued for a grading worker
+    (`python manage.py grading_worker`) and the response is 202 Accepted:
+    {
+        "job_id": 17,
+        "status": "queued",
+        "status_url": "/api/v1/tasks/1/solve/17/"
+    }
+
+    With GRADING_TRAFFIC_LOG_DIR set, graded solutions are also written to
+    the traffic log replayed by `python manage.py replay_traffic`.
+    """
+
+    permission_classes = [IsAuthenticated]
 
     def post(self, request: Request, *args, **kwargs) -> Response:
         task: Task = get_object_or_404(Task, pk=kwargs['pk'])
         solution_code: str = request.data.get('solution_code')
-        task_tests: list[TaskTests] = TaskTests.objects.filter(
-            task__exact=task
-        ).all()
 
         submission: SubmissionSerializer = SubmissionSerializer(
             data=request.data
@@ -115,75 +152,220 @@ class SolveTaskView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-        with transaction.atomic():
-            tests_file_path: list[str] = [
-                test.file_path for test in task_tests
-            ]
+        received_at = time.time()
+        started_at = time.perf_counter()
+        response = self.grade(request, task, solution_code)
+        record_solve_request(
+            task.id,
+            solution_code,
+            received_at,
+            time.perf_counter() - started_at,
+            response.status_code,
+            response.data,
+        )
+        return response
 
-            test_result: dict[str, str | bool] = run_tests_in_isolated_env(
-                tests_file_path, solution_code
+    def grade(
+        self, request: Request, task: Task, solution_code: str
+    ) -> Response:
+        if settings.GRADING_ASYNC:
+            cached_response = grade_solution_from_cache(
+                task, request.user, solution_code
             )
+            if cached_response is not None:
+                response_data, response_status = cached_response
+                return Response(data=response_data, status=response_status)
 
-            if (
-                test_result.get('status_code')
-                == status.HTTP_503_SERVICE_UNAVAILABLE
-            ):
-                return Response(
-                    data={
-                        'message': "В данный момент мы не можем обработать Ваш запрос :( Мы работаем над этой проблемой.",
-                        'errors': "Service unavailable.",
-                    },
-                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
-                )
+            job: GradingJob = enqueue_grading_job(
+                task, request.user, solution_code
+            )
+            return Response(
+                data={
+                    'job_id': job.id,
+                    'status': job.status,
+                    'status_url': request.build_absolute_uri(f'{job.id}/'),
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
 
-            if (
-                test_result.get('status_code')
-                == status.HTTP_504_GATEWAY_TIMEOUT
-            ):
-                return Response(
-                    data={
-                        'message': "Запрос превысил максимально допустимое время выполнения. "
-                        "Возможно присутствует вечный цикл в решении задачи. "
-                        "Пожалуйста, попробуйте позже.",
-                        'errors': "Gateway Timeout.",
-                    },
-                    status=status.HTTP_504_GATEWAY_TIMEOUT,
-                )
+        response_data, response_status = grade_solution(
+            task, request.user, solution_code
+        )
+        return Response(data=response_data, status=response_status)
 
-            score = test_result['score']
 
-            if test_result['success']:
-                user: User = request.user
-                if Submission.objects.filter(
-                    task=task, user__id=user.id
-                ).exists():
-                    return Response(
-                        data={
-                            "message": f"{user.first_name} {user.last_name} has already solved this task."
-                        }
-                    )
-                submission.save(
-                    task=task,
-                    user=user,
-                    score=score,
-                )
+class GradingJobStatusView(APIView):
+    """
+    Status of a queued solution.
+    Example of response while the job waits or runs:
+    {
+        "job_id": 17,
+        "status": "queued" | "running"
+    }
 
-                return Response(
-                    data={
-                        'message': 'Задание выполнено верно!',
-                        'score': score,
-                    },
-                    status=status.HTTP_200_OK,
-                )
-            else:
-                return Response(
-                    data={
-                        'message': 'Задание не выполнено.',
-                        'score': score,
-                        'errors': test_result['errors'],
-                    },
-                    status=status.HTTP_200_OK,
-                )
+    Once the job is done the response has the same body and HTTP status as
+    a synchronous solve request, plus the job fields:
+    {
+        "job_id": 17,
+        "status": "done",
+        "message": "Задание выполнено верно!",
+        "score": 1
+    }
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request: Request, *args, **kwargs) -> Response:
+        job: GradingJob = get_object_or_404(
+            GradingJob,
+            pk=kwargs['job_id'],
+            task__id=kwargs['pk'],
+            user__id=request.user.id,
+        )
+        job_data = {'job_id': job.id, 'status': job.status}
+
+        if job.status != GradingJobStatusEnum.DONE.value:
+            return Response(data=job_data, status=status.HTTP_200_OK)
+        return Response(
+            data={**job_data, **job.response_data},
+            status=job.response_status,
+        )
+
+
+class SandboxPoolStatsView(APIView):
+    """
+    Per-container statistics of the grading sandbox pool of this worker.
+
+    Example of response:
+    [
+        {
+            "container_id": "task_tests_env_1",
+            "runs": 42,
+            "failures": 1,
+            "busy_seconds": 31.754,
+            "active_runs": 0,
+            "quarantined": false,
+            "quarantine_seconds_left": 0.0,
+            "last_released_at": "2024-09-02T10:15:04.120000Z"
+        },
+        ...
+    ]
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request: Request) -> Response:
+        return Response(get_sandbox_pool().stats(), status=status.HTTP_200_OK)
+
+
+class GradingResultCacheStatsView(APIView):
+    """
+    Hit rate of the grading result cache of this worker. Misses count only
+    solutions that went to the sandbox.
+
+    Example of response:
+    {
+        "hits": 12,
+        "misses": 30,
+        "stores": 29,
+        "hit_rate": 0.286,
+        "max_entries": 1024
+    }
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request: Request) -> Response:
+        result_cache = get_grading_result_cache()
+        if result_cache is None:
+            return Response(
+                data={"message": "The grading result cache is disabled."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(
+            data={
+                **result_cache.stats(),
+                'max_entries': settings.GRADING_RESULT_CACHE_SIZE,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class SandboxHealthView(APIView):
+    """
+    Cached health of the grading sandbox for load balancers. Reads the state
+    kept by the background health monitor, so it never probes a container.
+    Responds 503 when the circuit of every container is open.
+
+    Example of response:
+    {
+        "ready": true,
+        "containers": [
+            {
+                "container_id": "task_tests_env_1",
+                "healthy": true,
+                "circuit": "closed",
+                "consecutive_failures": 0,
+                "checked_at": "2024-09-02T10:15:04.120000Z",
+                "probe_seconds": 0.041
+            },
+            ...
+        ]
+    }
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request: Request) -> Response:
+        health = get_sandbox_health_monitor()
+        is_ready: bool = health.is_ready()
+        return Response(
+            data={'ready': is_ready, 'containers': health.stats()},
+            status=(
+                status.HTTP_200_OK
+                if is_ready
+                else status.HTTP_503_SERVICE_UNAVAILABLE
+            ),
+        )
+
+
+class MetricsView(APIView):
+    """
+    Request, grading and sandbox metrics in the Prometheus text format.
+    Requires the METRICS_TOKEN bearer token when one is configured.
+
+    Example of response:
+    # HELP grading_results_total Graded solutions by outcome: ...
+    # TYPE grading_results_total counter
+    grading_results_total{outcome="pass"} 42
+    grading_results_total{outcome="compilation_error"} 3
+    ...
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request: Request) -> HttpResponse:
+        if settings.METRICS_TOKEN and not hmac.compare_digest(
+            request.headers.get('Authorization', ''),
+            f'Bearer {settings.METRICS_TOKEN}',
+        ):
+            raise PermissionDenied('A valid metrics token is required.')
+        queued_jobs = GradingJob.objects.filter(
+            status=GradingJobStatusEnum.QUEUED.value
+        ).count()
+        return HttpResponse(
+            render_metrics(
+                {
+                    'grading_jobs_queued': (
+                        'Grading jobs waiting for a worker.',
+                        queued_jobs,
+                    )
+                }
+            ),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
 
 
 class TaskTestsListCreateView(ListCreateAPIView):
@@ -22,6 +22,8 @@ from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework.permissions import AllowAny
 
+from auto_graders.views import MetricsView
+
 schema_view = get_schema_view(
     info=openapi.Info(
         title='Auto Graders Open API',
@@ -41,6 +43,7 @@ schema_view = get_schema_view(
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/", include('auto_graders.urls')),
+    path('metrics', MetricsView.as_view()),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=1000)),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=1000)),
 ]